@@ -0,0 +1,263 @@
+# Admission control for expensive endpoints
+# Routes are grouped into cost classes (match, generate, parse). A class
+# admits at most `concurrency` requests at once per worker process; more
+# wait in a bounded FIFO queue for up to ADMISSION_QUEUE_TIMEOUT_SECONDS.
+# A full queue or an expired wait gets an immediate 503 with Retry-After
+# estimated from recent service times, before the request body is read.
+# Each caller (verified session user, else client address) also has a token
+# bucket per class: ADMISSION_RATE_BURST requests at once, refilled at the
+# class's per-minute rate; an empty bucket is a 429 with Retry-After. The
+# client address has its own bucket ADMISSION_ADDRESS_RATE_FACTOR times as
+# large, so minting new sessions does not reset the limit. Routes outside
+# every class (/api/user/me, polling, downloads) are never queued, so they
+# stay fast while expensive work is capped; a route that sometimes does
+# expensive work (regenerating an evicted download) holds a slot via admit().
+
+from starlette.responses import JSONResponse
+from app import instrumentation
+from app.api.session import verify_token
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Set, Tuple
+import asyncio
+import math
+import time
+
+MAX_RETRY_AFTER = 120
+MAX_BUCKETS = 10000  # Least recently seen callers beyond this start over with a full bucket
+
+ADMISSIONS = instrumentation.counter(
+    "job_hunter_admission_total",
+    "Requests to cost-classed routes by outcome (admitted, queued, queue_full, timeout, rate_limited)",
+    ("cost_class", "outcome")
+)
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, message: str, retry_after: int, outcome: str):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.outcome = outcome
+
+    def response(self) -> JSONResponse:
+        return JSONResponse(
+            status_code=self.status_code,
+            content={"error": str(self), "retry_after": self.retry_after},
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+@dataclass
+class CostClass:
+    name: str
+    concurrency: int
+    queue_size: int
+    rate_per_minute: float = 0.0  # Per caller; 0: unlimited
+
+# ============ Concurrency ============
+
+class CostLimiter:
+    """Concurrency slots for one cost class, with a bounded FIFO of waiters"""
+
+    def __init__(self, cost: CostClass, queue_timeout: float):
+        self.cost = cost
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.service_seconds = 1.0  # Moving average of how long a request holds a slot
+        self._waiters: deque = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until a request joining now would likely get a slot"""
+        rounds = (len(self._waiters) + 1) / max(1, self.cost.concurrency)
+        return max(1, min(MAX_RETRY_AFTER, math.ceil(self.service_seconds * rounds)))
+
+    async def acquire(self) -> bool:
+        """Hold a slot; True if that meant waiting. Raises Rejected"""
+        if self.active < self.cost.concurrency and not self._waiters:
+            self.active += 1
+            return False
+        if len(self._waiters) >= self.cost.queue_size:
+            raise Rejected(503, f"Server busy: too many {self.cost.name} requests queued", self.retry_after(), "queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                self.release()  # Granted as the wait ended: pass the slot on
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise Rejected(503, f"Server busy: timed out waiting for a {self.cost.name} slot", self.retry_after(), "timeout")
+            raise
+        return True
+
+    def release(self, held_seconds: Optional[float] = None):
+        if held_seconds is not None:
+            self.service_seconds += 0.2 * (held_seconds - self.service_seconds)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # The slot passes straight to the next waiter
+                return
+        self.active -= 1
+
+# ============ Rate limits ============
+
+class TokenBuckets:
+    """Token bucket per caller: burst tokens, refilled at rate_per_minute"""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60
+        self.burst = max(1, burst)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()  # key -> (tokens, updated)
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated) * self.rate)
+
+    def wait(self, key: str) -> float:
+        """Seconds until key has a token; 0 if it has one now"""
+        tokens = self._tokens(key, time.monotonic())
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def take(self, key: str) -> float:
+        """0 if a token was taken, else seconds until one is available"""
+        now = time.monotonic()
+        tokens = self._tokens(key, now)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets.pop(key, None)
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > MAX_BUCKETS:
+            self._buckets.popitem(last=False)
+        return wait
+
+# ============ Controller ============
+
+class AdmissionController:
+    """Limiters and rate limits for every cost class"""
+
+    def __init__(self, classes: Iterable[CostClass], queue_timeout: float = 15.0, burst: int = 5, address_factor: float = 4.0):
+        self.limiters: Dict[str, CostLimiter] = {}
+        self.buckets: Dict[str, TokenBuckets] = {}
+        self.address_buckets: Dict[str, TokenBuckets] = {}
+        for cost in classes:
+            self.limiters[cost.name] = CostLimiter(cost, queue_timeout)
+            if cost.rate_per_minute > 0:
+                self.buckets[cost.name] = TokenBuckets(cost.rate_per_minute, burst)
+                self.address_buckets[cost.name] = TokenBuckets(
+                    cost.rate_per_minute * address_factor, math.ceil(burst * address_factor)
+                )
+
+    def check_rate(self, name: str, caller: str, address: str):
+        """Take a token from both the caller's and the address's bucket, or neither"""
+        if name not in self.buckets:
+            return
+        pairs = [(self.buckets[name], caller), (self.address_buckets[name], address)]
+        wait = max(buckets.wait(key) for buckets, key in pairs)
+        if wait:
+            raise Rejected(429, f"Rate limit exceeded for {name} requests", min(MAX_RETRY_AFTER, math.ceil(wait)), "rate_limited")
+        for buckets, key in pairs:
+            buckets.take(key)
+
+    async def acquire(self, name: str, scope, slot: bool = True) -> bool:
+        """
+        Rate limit the caller, then (if slot) hold a slot of class name.
+        True if that meant waiting. Raises Rejected
+        """
+        waited = False
+        try:
+            self.check_rate(name, caller_key(scope), address_key(scope))
+            if slot:
+                with instrumentation.timer("admission_wait", source=name):
+                    waited = await self.limiters[name].acquire()
+        except Rejected as e:
+            ADMISSIONS.inc(cost_class=name, outcome=e.outcome)
+            raise
+        ADMISSIONS.inc(cost_class=name, outcome="queued" if waited else "admitted")
+        return waited
+
+    @asynccontextmanager
+    async def admit(self, name: str, scope):
+        """Hold a slot of class name for the block. Raises Rejected"""
+        await self.acquire(name, scope)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.limiters[name].release(time.monotonic() - started)
+
+    def active(self) -> Dict[Tuple[str], int]:
+        return {(name,): limiter.active for name, limiter in self.limiters.items()}
+
+    def queued(self) -> Dict[Tuple[str], int]:
+        return {(name,): limiter.queued for name, limiter in self.limiters.items()}
+
+def address_key(scope) -> str:
+    """Client address; every caller behind it shares one address bucket"""
+    client = scope.get("client")
+    return f"addr:{client[0]}" if client else "addr:unknown"
+
+def caller_key(scope) -> str:
+    """
+    User of a verified session token, else the client address. Never the
+    X-User-Id header: a client could name a new user per request and get
+    a fresh bucket every time.
+    """
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            auth = value.decode("latin-1")
+            user_id = verify_token(auth[7:].strip()) if auth.lower().startswith("bearer ") else None
+            if user_id:
+                return f"user:{user_id}"
+            break
+    return address_key(scope)
+
+# ============ Middleware ============
+
+class AdmissionMiddleware:
+    """ASGI middleware admitting requests to cost-classed routes"""
+
+    def __init__(
+        self,
+        app,
+        controller: AdmissionController,
+        routes: Dict[Tuple[str, str], str],
+        rate_only: Optional[Set[Tuple[str, str]]] = None
+    ):
+        self.app = app
+        self.controller = controller
+        self.routes = routes  # (method, path) -> cost class
+        self.rate_only = rate_only or set()  # Routes that are rate limited but not queued
+
+    async def __call__(self, scope, receive, send):
+        name = self.routes.get((scope["method"], scope["path"])) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+
+        slot = (scope["method"], scope["path"]) not in self.rate_only
+        try:
+            await self.controller.acquire(name, scope, slot=slot)
+        except Rejected as e:
+            await e.response()(scope, receive, send)
+            return
+        if not slot:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.controller.limiters[name]
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.monotonic() - started)
@@ -0,0 +1,149 @@
+# Response compression
+# Brotli (when the brotli package is installed) or gzip for JSON and text
+# responses of at least COMPRESSION_MIN_BYTES, negotiated from
+# Accept-Encoding. A 500-job match response shrinks roughly tenfold. Bodies
+# sent in one message (regular JSON responses) are compressed in one go;
+# streamed bodies are compressed chunk by chunk with a flush after each, so
+# clients still see every chunk as it is produced. Server-Sent Events and
+# NDJSON progress streams, already-encoded responses and file downloads
+# (which negotiate their own stored variants, see downloads.py) pass through.
+
+from app import instrumentation
+from typing import List, Optional, Tuple
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+STREAMING_TYPES = ("text/event-stream", "application/x-ndjson")
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Preferred supported coding in an Accept-Encoding header, or None"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding:
+            accepted[coding.strip()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for coding in (("br", "gzip") if brotli else ("gzip",)):
+        if accepted.get(coding, wildcard) > 0:
+            return coding
+    return None
+
+class _Compressor:
+    """Incremental br/gzip encoder"""
+
+    def __init__(self, coding: str, gzip_level: int, brotli_quality: int):
+        self.coding = coding
+        if coding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gz = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        if self.coding == "br":
+            out = self._br.process(data)
+            return out + (self._br.finish() if final else self._br.flush())
+        out = self._gz.compress(data)
+        return out + self._gz.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+class CompressionMiddleware:
+    """ASGI middleware compressing JSON/text responses the client accepts"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        coding = negotiate(accept) if accept else None
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def compressing_send(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start = message
+                passthrough = not self._compressible(message)
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                # First body message decides: small single-message bodies go out as they are
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(coding, self.gzip_level, self.brotli_quality)
+                if not more_body:
+                    with instrumentation.timer("compress"):
+                        body = compressor.compress(body, final=True)
+                    await send({**start, "headers": _encoded_headers(start["headers"], coding, len(body))})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**start, "headers": _encoded_headers(start["headers"], coding, None)})
+            await send({
+                "type": "http.response.body",
+                "body": compressor.compress(body, final=not more_body),
+                "more_body": more_body,
+            })
+
+        await self.app(scope, receive, compressing_send)
+
+    @staticmethod
+    def _compressible(start) -> bool:
+        if start["status"] != 200:
+            return False
+        content_type = ""
+        for name, value in start.get("headers", []):
+            name = name.lower()
+            if name in (b"content-encoding", b"etag"):
+                return False  # Already encoded, or a download negotiating its own variants
+            if name == b"content-type":
+                content_type = value.decode("latin-1").lower()
+        return content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith(STREAMING_TYPES)
+
+def _encoded_headers(headers, coding: str, length: Optional[int]) -> List[Tuple[bytes, bytes]]:
+    """Headers with Content-Encoding and Vary set; Content-Length replaced, or dropped when streaming"""
+    out = []
+    vary = None
+    for name, value in headers:
+        lower = name.lower()
+        if lower == b"content-length":
+            continue
+        if lower == b"vary":
+            vary = value
+            continue
+        out.append((name, value))
+    out.append((b"content-encoding", coding.encode()))
+    out.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+    if length is not None:
+        out.append((b"content-length", str(length).encode()))
+    return out
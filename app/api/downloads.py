@@ -0,0 +1,264 @@
+# Generated document downloads
+# Files are served with a strong ETag (SHA-256 of the bytes, computed once
+# per file version), Cache-Control and If-None-Match -> 304, single byte
+# ranges for resumable downloads, and stored gzip (or brotli) variants for
+# text formats. Names only resolve to regular files directly inside
+# GENERATED_DOCS_DIR. Files are stored as <content hash>.<ext>; the
+# recorded display name is sent in Content-Disposition.
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response
+from app.config import config
+from collections import OrderedDict
+from mimetypes import guess_type
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+import anyio
+import gzip
+import hashlib
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Text formats worth compressing; PDF/DOCX are already compressed
+COMPRESSIBLE_EXTENSIONS = (".html", ".txt", ".json")
+MIN_COMPRESS_BYTES = 512
+
+# Content-Encoding -> stored variant suffix, in preference order
+ENCODINGS = (("br", ".br"), ("gzip", ".gz")) if brotli else (("gzip", ".gz"),)
+VARIANT_SUFFIXES = (".gz", ".br")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+MAX_CACHED_ETAGS = 4096
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+# ============ Path resolution ============
+
+def resolve_download(filename: str) -> Optional[str]:
+    """Path of a regular file directly in GENERATED_DOCS_DIR, or None"""
+    if not filename or filename.startswith(".") or "\x00" in filename:
+        return None
+    if os.path.basename(filename) != filename or "\\" in filename:
+        return None
+    if filename.endswith(VARIANT_SUFFIXES):
+        return None  # Compressed variants are negotiated, not addressed
+    root = os.path.realpath(config.GENERATED_DOCS_DIR)
+    path = os.path.realpath(os.path.join(root, filename))
+    if os.path.dirname(path) != root or not os.path.isfile(path):
+        return None  # Also rejects symlinks pointing outside the directory
+    return path
+
+# ============ Entity tags ============
+
+_etags: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+async def content_etag(path: str, stat_result: os.stat_result) -> str:
+    """Strong ETag from the file's SHA-256, cached until size or mtime changes"""
+    cached = _etags.get(path)
+    if cached and cached[:2] == (stat_result.st_size, stat_result.st_mtime_ns):
+        _etags.move_to_end(path)
+        return cached[2]
+    etag = f'"{await anyio.to_thread.run_sync(_file_digest, path)}"'
+    _etags[path] = (stat_result.st_size, stat_result.st_mtime_ns, etag)
+    while len(_etags) > MAX_CACHED_ETAGS:
+        _etags.popitem(last=False)
+    return etag
+
+def etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match comparison (weak, per RFC 9110)"""
+    if header.strip() == "*":
+        return True
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+# ============ Content negotiation ============
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+def _write_variant(path: str, variant_path: str, encoding: str) -> bool:
+    """Compress path into variant_path atomically; False when not worth it"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if encoding == "br":
+        compressed = brotli.compress(data, quality=11)
+    else:
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(compressed) >= len(data):
+        return False
+    temp_path = f"{variant_path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(compressed)
+    os.replace(temp_path, variant_path)
+    return True
+
+async def compressed_variant(path: str, stat_result: os.stat_result, accept_encoding: str) -> Optional[Tuple[str, str]]:
+    """(variant path, encoding) for a text file the client can decode, created on first use"""
+    if not path.endswith(COMPRESSIBLE_EXTENSIONS) or stat_result.st_size < MIN_COMPRESS_BYTES:
+        return None
+    accepted = _accepted_encodings(accept_encoding)
+    for encoding, suffix in ENCODINGS:
+        if encoding not in accepted:
+            continue
+        variant_path = path + suffix
+        try:
+            if os.stat(variant_path).st_mtime_ns >= stat_result.st_mtime_ns:
+                return variant_path, encoding
+        except FileNotFoundError:
+            pass
+        if await anyio.to_thread.run_sync(_write_variant, path, variant_path, encoding):
+            return variant_path, encoding
+        return None  # Incompressible; another encoding won't do better
+    return None
+
+# ============ Ranges ============
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Single "bytes=" range as inclusive (start, end). None means serve the
+    whole file (malformed or multi-range); RangeNotSatisfiable means 416.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec or size == 0:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if start >= size:
+                raise RangeNotSatisfiable()
+            if start > end:
+                return None
+        else:
+            length = int(last)
+            if length == 0:
+                raise RangeNotSatisfiable()
+            start, end = max(0, size - length), size - 1
+    except ValueError:
+        return None
+    return start, min(end, size - 1)
+
+class FileRangeResponse(FileResponse):
+    """206 Partial Content for bytes start..end (inclusive) of a file"""
+
+    def __init__(self, path: str, start: int, end: int, stat_result: os.stat_result, headers: Dict[str, str], **kwargs):
+        headers = {
+            **headers,
+            "content-range": f"bytes {start}-{end}/{stat_result.st_size}",
+            "content-length": str(end - start + 1),
+        }
+        super().__init__(path, status_code=206, headers=headers, stat_result=stat_result, **kwargs)
+        self.start = start
+        self.end = end
+
+    async def __call__(self, scope, receive, send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = self.end - self.start + 1
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+# ============ Response ============
+
+def content_disposition(name: str) -> str:
+    """attachment header for a display name; RFC 5987 filename* when not plain ASCII"""
+    quoted = quote(name, safe="")
+    if quoted != name:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{name}"'
+
+async def download_response(request: Request, filename: str, download_name: Optional[str] = None) -> Response:
+    """Conditional, range-aware, compressed-when-possible file response, saved as download_name"""
+    path = resolve_download(filename)
+    if path is None:
+        return JSONResponse(status_code=404, content={"error": "File not found"})
+
+    stat_result = os.stat(path)
+    media_type = guess_type(path)[0] or "application/octet-stream"
+    headers = {
+        "cache-control": f"private, max-age={config.DOWNLOAD_CACHE_MAX_AGE_SECONDS}",
+        "accept-ranges": "bytes",
+    }
+    if download_name:
+        headers["content-disposition"] = content_disposition(download_name)
+    compressible = path.endswith(COMPRESSIBLE_EXTENSIONS)
+    if compressible:
+        headers["vary"] = "Accept-Encoding"
+
+    etag = await content_etag(path, stat_result)
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and if_range and if_range.strip() != etag:
+        range_header = None  # Resource changed since the client's partial copy
+
+    # Ranges apply to the identity encoding only
+    variant = None
+    if compressible and not range_header:
+        variant = await compressed_variant(path, stat_result, request.headers.get("accept-encoding", ""))
+    if variant:
+        etag = f'{etag[:-1]}-{variant[1]}"'  # Each representation has its own ETag
+    headers["etag"] = etag
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if variant:
+        variant_path, encoding = variant
+        headers["content-encoding"] = encoding
+        return FileResponse(
+            variant_path, headers=headers, media_type=media_type,
+            stat_result=os.stat(variant_path), method=request.method
+        )
+
+    if range_header:
+        try:
+            byte_range = parse_range(range_header, stat_result.st_size)
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={**headers, "content-range": f"bytes */{stat_result.st_size}"})
+        if byte_range:
+            return FileRangeResponse(
+                path, *byte_range, stat_result=stat_result, headers=headers,
+                media_type=media_type, method=request.method
+            )
+
+    return FileResponse(path, headers=headers, media_type=media_type, stat_result=stat_result, method=request.method)
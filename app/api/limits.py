@@ -0,0 +1,51 @@
+# Request body size limits for upload routes
+# Enforced while the body is being received: the Content-Length header is
+# checked up front and chunked bodies are counted as they arrive, so an
+# oversized upload is rejected before it is spooled to memory or disk.
+
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from typing import Dict
+
+# Multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+class UploadTooLarge(HTTPException):
+    def __init__(self, limit: int):
+        super().__init__(status_code=413, detail=f"Upload exceeds {limit // (1024 * 1024)} MB")
+
+class UploadSizeLimitMiddleware:
+    """ASGI middleware capping request bodies per path"""
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits  # path -> max body bytes
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            response = JSONResponse(
+                status_code=413,
+                content={"status": "error", "message": UploadTooLarge(limit).detail}
+            )
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside request.form(); FastAPI turns it into a 413
+                    raise UploadTooLarge(limit)
+            return message
+
+        await self.app(scope, limited_receive, send)
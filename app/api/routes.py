@@ -1,26 +1,86 @@
-from fastapi import FastAPI, UploadFile, File, Depends, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, RedirectResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import config
-from app.database.database import get_db, init_db, get_db_session
+from app import instrumentation, profiling
+from app.serialization import FastJSONResponse, json_response
+from app.database.database import init_db, close_db, get_async_db, AsyncSessionLocal, engine
+from app.api.session import UserSession, sessions, get_user_session, issue_token, check_secret_key, request_user_id
+from app.api.limits import UploadSizeLimitMiddleware, UploadTooLarge, MULTIPART_OVERHEAD
+from app.api.compression import CompressionMiddleware
+from app.api.admission import AdmissionController, AdmissionMiddleware, CostClass, Rejected
+from app.api.downloads import download_response
 from app.database.models import User, Job, SavedJob, GeneratedDocument
-from app.resume.parser import ResumeParser
+from app.resume import pdf_text, bulk
+from app.database.schemas import (
+    SaveJobRequest, BulkGenerateRequest, BulkGenerateResponse, JobSearchResponse, JobMatchResponse
+)
+from app.database import history, parse_cache
 from app.resume.models import ResumeData, JobPreferences
-from app.scraper.job_scraper import JobScraper
+from app.scraper.job_scraper import JobScraper, job_filter_clauses
 from app.matching.job_matcher import JobMatcher
+from app.matching.tasks import MatchTaskQueue, MatchQueueFull, ACTIVE
+from app.matching.profile import (
+    MatchingProfile, ProfileCache, build_profile, build_profiles, store_profile, load_profile, preference_filters
+)
 from app.generation.resume_tailor import ResumeTailor
+from app.generation.templating import RESUME_TEMPLATES, DEFAULT_RESUME_TEMPLATE
+from app.generation.service import DocumentGenerator, GenerationResult
+from app.generation import documents, zip_stream
+from app.generation.storage import storage
+from app.generation.render_pool import renderer, RenderJob, RenderQueueFull
 from app.generation.cover_letter import CoverLetterGenerator
-import tempfile
+from app.generation.llm import ollama
+from app.generation.llm_scheduler import llm_scheduler, BULK
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from contextlib import nullcontext
+import asyncio
+import time
+import uuid
 import os
-from typing import Optional
+from typing import List, Optional
+from datetime import datetime
 import json
 
 # Initialize FastAPI
 app = FastAPI(
     title="AI Job Hunter (Free)",
     description="Job hunting with local LLMs",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
+)
+
+# Concurrency limits, wait queues and per-caller rate limits for expensive
+# routes; added before CORS so 429/503 rejections still carry CORS headers
+admission = AdmissionController(
+    [
+        CostClass("match", config.ADMISSION_MATCH_CONCURRENCY, config.ADMISSION_MATCH_QUEUE, config.ADMISSION_MATCH_RATE_PER_MINUTE),
+        CostClass("generate", config.ADMISSION_GENERATE_CONCURRENCY, config.ADMISSION_GENERATE_QUEUE, config.ADMISSION_GENERATE_RATE_PER_MINUTE),
+        CostClass("parse", config.ADMISSION_PARSE_CONCURRENCY, config.ADMISSION_PARSE_QUEUE, config.ADMISSION_PARSE_RATE_PER_MINUTE),
+    ],
+    queue_timeout=config.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    burst=config.ADMISSION_RATE_BURST,
+    address_factor=config.ADMISSION_ADDRESS_RATE_FACTOR
 )
+if config.ADMISSION_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission,
+        routes={
+            ("POST", "/api/jobs/match"): "match",
+            ("POST", "/api/jobs/search"): "match",
+            ("POST", "/api/match-tasks"): "match",
+            ("POST", "/api/resume/generate"): "generate",
+            ("POST", "/api/cover-letter/generate"): "generate",
+            ("POST", "/api/cover-letter/stream"): "generate",
+            ("POST", "/api/documents/bulk-generate"): "generate",
+            ("POST", "/api/resume/upload"): "parse",
+            ("POST", "/api/resume/bulk-upload"): "parse",
+        },
+        # Bounded by MatchTaskQueue and the BULK_* limits instead of a slot
+        rate_only={("POST", "/api/match-tasks"), ("POST", "/api/resume/bulk-upload")}
+    )
 
 # CORS
 app.add_middleware(
@@ -30,92 +90,280 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized uploads while they are being received
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits={
+        "/api/resume/upload": bulk.max_file_bytes() + MULTIPART_OVERHEAD,
+        "/api/resume/bulk-upload": int(config.BULK_MAX_UPLOAD_MB * 1024 * 1024),
+    }
+)
+
+# br/gzip for JSON and text bodies above COMPRESSION_MIN_BYTES
+if config.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=config.COMPRESSION_MIN_BYTES,
+        gzip_level=config.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=config.COMPRESSION_BROTLI_QUALITY
+    )
+
+# Profile requests that send X-Profile with the admin token
+profiling_enabled = config.PROFILING_ENABLED and bool(config.PROFILING_TOKEN)
+if profiling_enabled:
+    app.add_middleware(
+        profiling.ProfilingMiddleware,
+        interval=config.PROFILE_SAMPLE_INTERVAL_MS / 1000,
+        keep=config.PROFILE_KEEP
+    )
+
+# Stage timings and HTTP metrics; added last so it is outermost and totals include the other middleware
+if instrumentation.enabled:
+    app.add_middleware(
+        instrumentation.InstrumentationMiddleware,
+        server_timing_header=config.SERVER_TIMING_HEADER
+    )
+
+@app.exception_handler(UploadTooLarge)
+async def upload_too_large_handler(request, exc: UploadTooLarge):
+    return JSONResponse(status_code=413, content={"status": "error", "message": exc.detail})
+
 # Initialize services
-parser = ResumeParser()
 scraper = JobScraper()
 matcher = None  # Will initialize after startup
 tailor = ResumeTailor()
 letter_gen = CoverLetterGenerator()
+generator = DocumentGenerator(tailor, letter_gen, renderer, llm=llm_scheduler)
+profiles = ProfileCache(config.PROFILE_CACHE_SIZE)
+match_tasks = MatchTaskQueue(
+    scraper,
+    backend=config.MATCH_WORKER_BACKEND,
+    concurrency=config.MATCH_CONCURRENCY,
+    queue_size=config.MATCH_QUEUE_SIZE,
+    result_ttl=config.MATCH_RESULT_TTL_SECONDS,
+    candidates=config.MATCH_CANDIDATES,
+    retention_hours=config.MATCH_TASK_RETENTION_HOURS,
+    heartbeat_seconds=config.MATCH_TASK_HEARTBEAT_SECONDS
+)
+
+instrumentation.gauge("job_hunter_render_queue_depth", "PDF renders waiting for a worker", lambda: renderer.stats()["queued"])
+instrumentation.gauge("job_hunter_llm_queue_depth", "LLM requests waiting for a generation slot", llm_scheduler.queue_depth)
+instrumentation.gauge("job_hunter_match_queue_depth", "Match tasks waiting for a worker", match_tasks.queue_depth)
+instrumentation.gauge("job_hunter_generated_docs_bytes", "Bytes used by generated documents", lambda: storage.used_bytes)
+instrumentation.gauge("job_hunter_admission_active", "Requests holding a slot, per cost class", admission.active, ("cost_class",))
+instrumentation.gauge("job_hunter_admission_queued", "Requests waiting for a slot, per cost class", admission.queued, ("cost_class",))
+instrumentation.gauge("job_hunter_process_resident_bytes", "Resident memory of this worker", lambda: instrumentation.process_memory()["rss"])
+instrumentation.gauge("job_hunter_process_proportional_bytes", "This worker's resident memory with shared pages split between sharers (PSS)", lambda: instrumentation.process_memory()["pss"])
+instrumentation.gauge("job_hunter_process_unique_bytes", "Memory private to this worker (USS)", lambda: instrumentation.process_memory()["uss"])
 
-# Store current user data
-current_user_resume = None
-current_user_id = None
+preloaded = False  # Set in workers forked from a master that ran preload()
 
-def ensure_user_loaded():
-    """Recover user session from DB if global state is lost"""
-    global current_user_resume, current_user_id
+async def get_matching_profile(db: AsyncSession, session: UserSession) -> Optional[MatchingProfile]:
+    """Cached profile, else the one stored on the User row, else build and store it"""
+    profile = profiles.get(session.user_id)
+    if (profile and profile.model_name == matcher.model_name
+            and profile.updated_at == session.profile_updated_at):
+        return profile
     
-    if current_user_resume and current_user_id:
-        return True
-        
-    try:
-        db = get_db_session()
-        # Get latest user
-        user = db.query(User).order_by(User.created_at.desc()).first()
-        if user and user.resume_data:
-            current_user_resume = ResumeData(**user.resume_data)
-            current_user_id = user.id
-            db.close()
-            return True
-        db.close()
-    except Exception as e:
-        print(f"Error restoring user session: {e}")
-        
-    return False
+    user = await db.get(User, session.user_id)
+    if not user or not user.resume_data:
+        return None
+    
+    profile = load_profile(user, matcher.model_name)
+    if profile is None:
+        # Rows from before profiles existed, or a changed embedding model;
+        # encoding is CPU-bound, so off the event loop
+        profile = await asyncio.get_running_loop().run_in_executor(
+            None, build_profile, matcher, user.id, ResumeData(**user.resume_data), user.preferences
+        )
+        store_profile(user, profile)
+        await db.commit()
+        sessions.store(user)
+    
+    profiles.put(profile)
+    return profile
+
+async def purge_parse_cache():
+    async with AsyncSessionLocal() as db:
+        purged = await parse_cache.purge_stale(db)
+    if purged:
+        print(f"Discarded {purged} cached resume parses from older parser versions")
+
+def preload():
+    """
+    Called by a prefork master (gunicorn.conf.py) before it forks workers:
+    schema setup and task recovery run once instead of in every worker, and
+    the embedding model is loaded into pages the workers share copy-on-write.
+    No connections or threads are left open to cross the fork.
+    """
+    global matcher, preloaded
+    check_secret_key()
+    print("Initializing application (preload)...")
+    init_db()
+    
+    async def maintenance():
+        await purge_parse_cache()
+        await match_tasks.recover()
+        await close_db()
+    
+    asyncio.run(maintenance())
+    engine.dispose()
+    print("Loading AI models (first-time download may take a moment)...")
+    matcher = JobMatcher(config.OLLAMA_EMBEDDING_MODEL)
+    preloaded = True
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database and AI models"""
     global matcher
-    print("Initializing application...")
-    init_db()
+    if not preloaded:
+        check_secret_key()
+        print("Initializing application...")
+        init_db()
+        await purge_parse_cache()
     
-    # Try to restore session
-    if ensure_user_loaded():
-        print(f"Restored session for user: {current_user_id}")
-        
-    print("Loading AI models (first-time download may take a moment)...")
-    matcher = JobMatcher(config.OLLAMA_EMBEDDING_MODEL)
+    print(f"Starting {config.RENDER_WORKERS} PDF render workers...")
+    await renderer.start()
+    await storage.start()
+    await llm_scheduler.start()
+    
+    if matcher is None:
+        print("Loading AI models (first-time download may take a moment)...")
+        matcher = JobMatcher(config.OLLAMA_EMBEDDING_MODEL)
+    await match_tasks.start(matcher, recover=not preloaded)
     print("Ready to serve requests!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled database connections and worker processes"""
+    await match_tasks.stop(grace=config.MATCH_SHUTDOWN_GRACE_SECONDS)
+    await storage.stop()
+    await renderer.stop()
+    await llm_scheduler.stop()
+    await ollama.close()
+    await close_db()
+    pdf_text.shutdown_pool()
+
 @app.get("/health")
 async def health():
     return {"status": "ok", "message": "AI Job Hunter is running"}
 
+@app.get("/metrics")
+async def metrics():
+    """Counters and stage histograms in the Prometheus text format"""
+    if not instrumentation.enabled:
+        return JSONResponse(status_code=404, content={"error": "Metrics are disabled"})
+    return PlainTextResponse(instrumentation.render(), media_type="text/plain; version=0.0.4")
+
+def profiling_denied(request: Request) -> Optional[JSONResponse]:
+    if not profiling_enabled:
+        return JSONResponse(status_code=404, content={"error": "Profiling is disabled"})
+    if not profiling.token_matches(request.headers.get("x-profile-token")):
+        return JSONResponse(status_code=403, content={"error": "Invalid X-Profile-Token"})
+    return None
+
+@app.get("/api/admin/profiles")
+async def list_profiles(request: Request):
+    """Stored request profiles, newest first"""
+    denied = profiling_denied(request)
+    if denied:
+        return denied
+    return {"profiles": profiling.list_profiles()}
+
+@app.get("/api/admin/profiles/{name}")
+async def get_profile(name: str, request: Request):
+    """Download a profile (open .speedscope.json files at https://www.speedscope.app)"""
+    denied = profiling_denied(request)
+    if denied:
+        return denied
+    path = profiling.resolve_profile(name)
+    if not path:
+        return JSONResponse(status_code=404, content={"error": "Profile not found"})
+    media_type = "application/json" if name.endswith(".json") else "text/plain" if name.endswith(".txt") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=name)
+
 @app.post("/api/resume/upload")
-async def upload_resume(file: UploadFile = File(...)):
+async def upload_resume(request: Request, file: UploadFile = File(...), db: AsyncSession = Depends(get_async_db)):
     """Upload and parse resume"""
-    global current_user_resume, current_user_id
-    
     try:
-        # Save temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
+        # Body size was capped by UploadSizeLimitMiddleware while receiving;
+        # the same bytes feed hashing, the parse cache and the parser
+        content = await file.read(bulk.max_file_bytes() + 1)
+        if len(content) > bulk.max_file_bytes():
+            return JSONResponse(
+                status_code=413,
+                content={"status": "error", "message": f"File exceeds {config.MAX_UPLOAD_MB:g} MB"}
+            )
+        
+        # Identical bytes under the same parser version parse identically
+        digest = parse_cache.content_hash(content)
+        cached = await parse_cache.lookup(db, digest)
         
-        # Parse resume
-        current_user_resume = parser.parse_resume(tmp_path)
+        # Dedup only ever returns the caller's own account: holding a copy of
+        # someone's file must not hand out a session for their user
+        caller_id = request_user_id(request)
+        if cached and config.RESUME_DEDUP_USERS and caller_id:
+            user = await db.get(User, caller_id)
+            if user and user.resume_data == cached.resume_data:
+                await db.commit()
+                sessions.store(user)
+                return {
+                    "status": "success",
+                    "message": "Resume already uploaded",
+                    "user_id": user.id,
+                    "session_token": issue_token(user.id),
+                    "resume": user.resume_data,
+                    "cached": True
+                }
+        
+        loop = asyncio.get_running_loop()
+        if cached:
+            resume = ResumeData(**cached.resume_data)
+        else:
+            # Parse straight from memory in the PDF pool, as bulk ingestion
+            # does, so a slow file never stalls this worker's event loop
+            timeout = config.BULK_PARSE_TIMEOUT_SECONDS
+            try:
+                parsed = await asyncio.wait_for(
+                    loop.run_in_executor(pdf_text.get_pool(), bulk.parse_resume_bytes, content, timeout),
+                    timeout + 5 if timeout > 0 else None
+                )
+            except (asyncio.TimeoutError, TimeoutError):
+                return JSONResponse(
+                    status_code=422,
+                    content={"status": "error", "message": f"Parsing exceeded {timeout:g}s"}
+                )
+            resume = ResumeData(**parsed)
         
         # Save to database
-        db = get_db_session()
         user = User(
-            resume_data=current_user_resume.model_dump(),
+            resume_data=resume.model_dump(),
             preferences={}
         )
         db.add(user)
-        db.commit()
-        current_user_id = user.id
-        db.close()
+        await db.flush()
         
-        # Clean up
-        os.unlink(tmp_path)
+        if cached:
+            cached.user_id = cached.user_id or user.id
+        else:
+            await parse_cache.store(db, digest, user.resume_data, user.id)
+        
+        # Precompute the matching profile so /api/jobs/match starts from vectors
+        if matcher:
+            profile = await loop.run_in_executor(None, build_profile, matcher, user.id, resume, user.preferences)
+            store_profile(user, profile)
+            profiles.put(profile)
+        
+        await db.commit()
+        sessions.store(user)
         
         return {
             "status": "success",
             "message": "Resume parsed successfully",
             "user_id": user.id,
-            "resume": current_user_resume.model_dump()
+            "session_token": issue_token(user.id),
+            "resume": resume.model_dump(),
+            "cached": cached is not None
         }
     
     except Exception as e:
@@ -124,25 +372,152 @@ async def upload_resume(file: UploadFile = File(...)):
             content={"status": "error", "message": str(e)}
         )
 
+async def save_bulk_batch(batch: List[bulk.ParseOutcome]) -> List[dict]:
+    """
+    Insert one batch of parsed resumes in a single transaction, with batched
+    profile embeddings. Fresh parses are added to the parse cache.
+    """
+    users = [
+        User(id=str(uuid.uuid4()), resume_data=outcome.resume, preferences={})
+        for outcome in batch
+    ]
+    
+    if matcher:
+        items = [(user.id, ResumeData(**user.resume_data), user.preferences) for user in users]
+        # Encoding is CPU-bound; keep the event loop streaming progress
+        built = await asyncio.get_running_loop().run_in_executor(None, build_profiles, matcher, items)
+        for user, profile in zip(users, built):
+            store_profile(user, profile)
+    
+    async with AsyncSessionLocal() as db:
+        db.add_all(users)
+        stored = set()
+        for outcome, user in zip(batch, users):
+            # The same file twice in one upload is parsed twice but cached once
+            if not outcome.cached and outcome.content_hash not in stored:
+                stored.add(outcome.content_hash)
+                await parse_cache.store(db, outcome.content_hash, outcome.resume, user.id)
+        await db.commit()
+    
+    events = []
+    for outcome, user in zip(batch, users):
+        sessions.store(user)
+        events.append({
+            "file": outcome.file_name,
+            "status": "success",
+            "user_id": user.id,
+            "session_token": issue_token(user.id),
+            "full_name": outcome.resume.get("full_name"),
+            "email": outcome.resume.get("email"),
+            "cached": outcome.cached
+        })
+    return events
+
+@app.post("/api/resume/bulk-upload")
+async def bulk_upload_resumes(files: List[UploadFile] = File(...)):
+    """
+    Ingest many resumes (PDFs and/or zip archives of PDFs) in one request.
+    Streams newline-delimited JSON: one event per file, then a summary.
+    """
+    uploads = [(upload.filename or "upload.pdf", upload.file) for upload in files]
+    
+    async def events():
+        started = time.perf_counter()
+        succeeded = failed = 0
+        batch: List[bulk.ParseOutcome] = []
+        cache_db = AsyncSessionLocal()
+        
+        async def lookup(digest: str):
+            entry = await parse_cache.lookup(cache_db, digest)
+            if entry is None:
+                return None
+            user_id = entry.user_id
+            if config.RESUME_DEDUP_USERS and not await parse_cache.dedup_user(cache_db, entry):
+                user_id = None
+            return entry.resume_data, user_id
+        
+        async def flush():
+            nonlocal succeeded, failed
+            try:
+                results = await save_bulk_batch(batch)
+                succeeded += len(results)
+            except Exception as e:
+                failed += len(batch)
+                results = [
+                    {"file": outcome.file_name, "status": "error", "message": f"Could not save: {e}"}
+                    for outcome in batch
+                ]
+            batch.clear()
+            return results
+        
+        try:
+            async for outcome in bulk.parse_files(bulk.iter_upload_files(uploads), lookup=lookup):
+                if outcome.status != "parsed":
+                    failed += 1
+                    yield json.dumps({"file": outcome.file_name, "status": outcome.status, "message": outcome.error}) + "\n"
+                    continue
+                
+                if config.RESUME_DEDUP_USERS and outcome.cached_user_id:
+                    # Already ingested. No session token: the file alone must not grant its user's account
+                    succeeded += 1
+                    yield json.dumps({
+                        "file": outcome.file_name,
+                        "status": "duplicate",
+                        "user_id": outcome.cached_user_id,
+                        "full_name": outcome.resume.get("full_name"),
+                        "email": outcome.resume.get("email"),
+                        "cached": True
+                    }) + "\n"
+                    continue
+                
+                batch.append(outcome)
+                if len(batch) >= config.BULK_BATCH_SIZE:
+                    await cache_db.commit()  # Hit counters
+                    for event in await flush():
+                        yield json.dumps(event) + "\n"
+            
+            if batch:
+                for event in await flush():
+                    yield json.dumps(event) + "\n"
+            await cache_db.commit()
+        finally:
+            await cache_db.close()
+        
+        elapsed = time.perf_counter() - started
+        yield json.dumps({
+            "status": "done",
+            "succeeded": succeeded,
+            "failed": failed,
+            "seconds": round(elapsed, 2),
+            "resumes_per_second": round(succeeded / elapsed, 2) if elapsed > 0 else None
+        }) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
 @app.post("/api/preferences/set")
-async def set_preferences(preferences: JobPreferences):
+async def set_preferences(
+    preferences: JobPreferences,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
+):
     """Set job search preferences"""
-    global current_user_id
     try:
-        ensure_user_loaded()
-        
-        if not current_user_id:
+        if not session:
             return JSONResponse(
                 status_code=400,
                 content={"error": "Please upload resume first"}
             )
         
-        db = get_db_session()
-        user = db.query(User).filter(User.id == current_user_id).first()
+        user = await db.get(User, session.user_id)
         if user:
             user.preferences = preferences.model_dump()
-            db.commit()
-        db.close()
+            if user.profile_embedding:
+                # Filters change, the embedding does not
+                user.profile_filters = preference_filters(user.preferences)
+                user.profile_updated_at = datetime.utcnow()
+            await db.commit()
+            profiles.invalidate(user.id)
+            sessions.store(user)
         
         return {"status": "success", "message": "Preferences saved"}
     
@@ -150,59 +525,64 @@ async def set_preferences(preferences: JobPreferences):
         return JSONResponse(status_code=500, content={"error": str(e)})
 
 @app.get("/api/user/me")
-async def get_current_user():
+async def get_current_user(session: Optional[UserSession] = Depends(get_user_session)):
     """Get current user data"""
-    global current_user_id, current_user_resume
     try:
-        ensure_user_loaded()
-        
-        if not current_user_id:
+        if not session:
             return JSONResponse(
                 status_code=404,
                 content={"error": "No active session"}
             )
-            
-        db = get_db_session()
-        user = db.query(User).filter(User.id == current_user_id).first()
         
-        response_data = {
-            "id": user.id,
-            "resume": user.resume_data,
-            "preferences": user.preferences
+        return {
+            "id": session.user_id,
+            "resume": session.resume.model_dump(),
+            "preferences": session.preferences
         }
-        db.close()
-        
-        return response_data
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 
-@app.post("/api/jobs/search")
+@app.post("/api/jobs/search", response_model=JobSearchResponse)
 async def search_jobs(
     query: str,
     location: str = "India",
     job_type: Optional[str] = None,
     experience_level: Optional[str] = None,
-    limit: int = 50
+    min_salary: Optional[int] = None,
+    max_salary: Optional[int] = None,
+    salary_currency: Optional[str] = None,
+    include_unspecified: bool = True,
+    limit: int = 50,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Search for jobs"""
+    """Search for jobs; job_type/experience_level accept comma-separated values"""
     try:
         print(f"Searching for: {query} in {location}")
-        jobs = scraper.search_all_sources(
-            query=query,
-            location=location,
-            job_type=job_type,
-            experience_level=experience_level,
-            limit=limit
+        # Blocking HTTP and source delays run off the event loop
+        jobs = await asyncio.get_running_loop().run_in_executor(
+            None, scraper.search_all_sources, query, location, job_type, experience_level, limit
         )
         
         # Save to database
-        scraper.save_jobs_to_db(jobs)
+        await scraper.save_jobs_to_db(db, jobs)
         
-        return {
+        # Structured filters run against the normalized columns
+        clauses = job_filter_clauses(
+            job_types=job_type.split(',') if job_type else None,
+            experience_levels=experience_level.split(',') if experience_level else None,
+            min_salary=min_salary,
+            max_salary=max_salary,
+            salary_currency=salary_currency,
+            include_unspecified=include_unspecified
+        )
+        jobs = await scraper.filter_jobs(db, jobs, clauses)
+        
+        # Already in the JobSearchResponse shape; skips per-value re-encoding
+        return json_response({
             "status": "success",
             "total": len(jobs),
             "jobs": jobs
-        }
+        }, JobSearchResponse)
     
     except Exception as e:
         return JSONResponse(
@@ -210,14 +590,16 @@ async def search_jobs(
             content={"error": str(e)}
         )
 
-@app.post("/api/jobs/match")
-async def match_jobs(query: str, limit: int = 10):
+@app.post("/api/jobs/match", response_model=JobMatchResponse)
+async def match_jobs(
+    query: str,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
+):
     """Find and rank jobs matching resume"""
-    global matcher, current_user_resume
     try:
-        ensure_user_loaded()
-        
-        if not current_user_resume:
+        if not session:
             return JSONResponse(
                 status_code=400,
                 content={"error": "Please upload resume first"}
@@ -229,47 +611,25 @@ async def match_jobs(query: str, limit: int = 10):
                 content={"error": "AI model not initialized"}
             )
         
-        # Search jobs
-        print(f"Searching for: {query}")
-        # Search jobs
-        print(f"Searching for: {query}")
-        # Fetch generous amount to ensure we don't cut off sources like RemoteOK 
-        # that are appended after LinkedIn fills the quota
-        candidates_limit = 500 
-        jobs = scraper.search_all_sources(query, limit=candidates_limit)
-        
-        if not jobs:
-            return {"total": 0, "jobs": []}
-        
-        # Prepare resume text
-        resume_text = f"{current_user_resume.summary} {' '.join(current_user_resume.technical_skills)}"
+        # Precomputed resume embedding and skills
+        profile = await get_matching_profile(db, session)
+        if not profile:
+            return JSONResponse(
+                status_code=400,
+                content={"error": "Please upload resume first"}
+            )
         
-        # Rank all candidates
-        print("Ranking jobs by match (this may take a moment)...")
-        all_ranked = matcher.rank_jobs(
-            resume_text,
-            current_user_resume.technical_skills,
-            jobs
-        )
+        print(f"Searching for: {query}")
+        result_jobs = await match_tasks.pipeline(query, profile)
+        if not result_jobs:
+            return {"status": "success", "total": 0, "jobs": []}
         
         # User requested to see ALL fetched jobs, sorted by score
-        # We simply return the full list
-        
-        # Format response
-        result_jobs = []
-        for item in all_ranked:
-            result_jobs.append({
-                'job': item['job'],
-                'match_score': item['match']['match_score'],
-                'recommendation': item['match']['recommendation'],
-                'matched_skills': item['match']['matched_skills']
-            })
-        
-        return {
+        return json_response({
             "status": "success",
             "total": len(result_jobs),
             "jobs": result_jobs
-        }
+        }, JobMatchResponse)
     
     except Exception as e:
         import traceback
@@ -279,50 +639,172 @@ async def match_jobs(query: str, limit: int = 10):
             content={"error": str(e)}
         )
 
+SSE_KEEPALIVE_SECONDS = 15  # Comment lines that keep idle proxies from closing the stream
+
+def match_task_response(task: dict, **extra) -> dict:
+    return {
+        **task,
+        **extra,
+        "status_url": f"/api/match-tasks/{task['task_id']}",
+        "events_url": f"/api/match-tasks/{task['task_id']}/events",
+    }
+
+@app.post("/api/match-tasks")
+async def submit_match_task(
+    query: str,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
+):
+    """
+    Run /api/jobs/match in the background. Returns 202 with status_url
+    (poll; has "jobs" once done) and events_url (SSE progress). A recent
+    result for the same query comes back at once with cached=true.
+    """
+    if not session:
+        return JSONResponse(status_code=400, content={"error": "Please upload resume first"})
+    if not matcher:
+        return JSONResponse(status_code=500, content={"error": "AI model not initialized"})
+    
+    profile = await get_matching_profile(db, session)
+    if not profile:
+        return JSONResponse(status_code=400, content={"error": "Please upload resume first"})
+    
+    try:
+        task, cached = await match_tasks.submit(db, session.user_id, query, profile)
+    except MatchQueueFull as e:
+        return JSONResponse(status_code=503, content={"error": str(e)}, headers={"Retry-After": "10"})
+    return FastJSONResponse(
+        status_code=200 if task["status"] == "done" else 202,
+        content=match_task_response(task, cached=cached)
+    )
+
+@app.get("/api/match-tasks/{task_id}")
+async def get_match_task(
+    task_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
+):
+    """Status, stage and progress counts; the ranked jobs once status is done"""
+    task = await match_tasks.get(db, task_id, session.user_id) if session else None
+    if task is None:
+        return JSONResponse(status_code=404, content={"error": "Match task not found"})
+    return FastJSONResponse(match_task_response(task))
+
+@app.delete("/api/match-tasks/{task_id}")
+async def cancel_match_task(
+    task_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
+):
+    """Cancel a queued or running task (finished tasks are returned unchanged)"""
+    task = await match_tasks.cancel(db, task_id, session.user_id) if session else None
+    if task is None:
+        return JSONResponse(status_code=404, content={"error": "Match task not found"})
+    return FastJSONResponse(match_task_response(task))
+
+@app.get("/api/match-tasks/{task_id}/events")
+async def match_task_events(
+    task_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
+):
+    """
+    Server-Sent Events: "progress" on every stage and count change, then
+    one of "done" (with total; fetch status_url for the jobs), "failed" or
+    "cancelled".
+    """
+    if not session:
+        return JSONResponse(status_code=404, content={"error": "Match task not found"})
+    listener = match_tasks.subscribe(task_id, session.user_id)
+    if listener is None:
+        task = await match_tasks.get(db, task_id, session.user_id)
+        if task is None:
+            return JSONResponse(status_code=404, content={"error": "Match task not found"})
+        summary = {k: v for k, v in task.items() if k != "jobs"}
+        if task["status"] in ACTIVE:
+            # Running in another worker process
+            listener = match_tasks.follow(task_id, summary)
+        else:
+            # Already finished: a single final event
+            listener = asyncio.Queue()
+            listener.put_nowait((task["status"], summary))
+    
+    async def events():
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(listener.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_event(event, match_task_response(data))
+                if event not in ("progress", "queued", "running"):
+                    break
+        finally:
+            match_tasks.unsubscribe(task_id, listener)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def document_response(result: GenerationResult) -> dict:
+    return {
+        "status": "success",
+        "message": "Resume generated",
+        "download_url": result.download_url,
+        "file_path": result.file_path,
+        "file_name": result.document.file_name,
+        "cached": result.cached
+    }
+
 @app.post("/api/resume/generate")
 async def generate_tailored_resume(
     job_title: str,
-    output_format: str = "pdf"
+    output_format: str = "pdf",
+    template: str = DEFAULT_RESUME_TEMPLATE,
+    wait: bool = True,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
 ):
-    """Generate tailored resume"""
-    global current_user_resume, current_user_id
+    """
+    Generate tailored resume.
+    Identical inputs return the previously generated file. PDFs render in
+    the worker pool: wait=false returns 202 with a job id to poll at
+    /api/render-jobs/{job_id}; wait=true awaits the render.
+    """
     try:
-        ensure_user_loaded()
-        
-        if not current_user_resume:
+        if not session:
             return JSONResponse(
                 status_code=400,
                 content={"error": "Please upload resume first"}
             )
         
-        # Generate HTML
-        html = tailor.generate_resume_html(current_user_resume, job_title)
-        
-        # Create output directory
-        os.makedirs("generated_docs", exist_ok=True)
+        if template not in RESUME_TEMPLATES:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"Unknown template '{template}'. Available: {', '.join(RESUME_TEMPLATES)}"}
+            )
         
-        # Export
-        filename = f"{current_user_id}_resume_{job_title.replace(' ', '_')}"
-        if output_format == "pdf":
-            try:
-                output_path = f"generated_docs/{filename}.pdf"
-                tailor.html_to_pdf(html, output_path)
-            except Exception as e:
-                print(f"PDF generation failed, falling back to HTML: {e}")
-                # Fallback to HTML
-                output_path = f"generated_docs/{filename}.html"
-                with open(output_path, "w", encoding="utf-8") as f:
-                    f.write(html)
-        else:
-            output_path = f"generated_docs/{filename}.docx"
-            tailor.html_to_docx(html, output_path)
+        try:
+            result = await generator.resume(
+                db, session.user_id, session.resume, job_title, template, output_format, wait=wait
+            )
+        except RenderQueueFull as e:
+            return JSONResponse(
+                status_code=503,
+                content={"error": str(e)},
+                headers={"Retry-After": "5"}
+            )
         
-        return {
-            "status": "success",
-            "message": "Resume generated (PDF unavailable, using HTML)" if output_path.endswith('.html') else "Resume generated",
-            "download_url": f"/api/downloads/{os.path.basename(output_path)}",
-            "file_path": output_path
-        }
+        if result.error:
+            return JSONResponse(status_code=500, content={"error": result.error})
+        if result.document is None:
+            # Still rendering, or rendered to the HTML fallback
+            status_code = 200 if result.job.finished else 202
+            return JSONResponse(status_code=status_code, content=render_job_response(result.job))
+        return document_response(result)
     
     except Exception as e:
         return JSONResponse(
@@ -330,42 +812,67 @@ async def generate_tailored_resume(
             content={"error": str(e)}
         )
 
+def render_job_response(job: RenderJob) -> dict:
+    """Status payload for a render job, with the download once finished"""
+    payload = job.to_dict()
+    payload["status_url"] = f"/api/render-jobs/{job.id}"
+    if job.status == "done":
+        payload["download_url"] = f"/api/downloads/{os.path.basename(job.result_path)}"
+        payload["message"] = "Resume generated (PDF unavailable, using HTML)" if job.fallback else "Resume generated"
+    return payload
+
+@app.get("/api/render-jobs/{job_id}")
+async def get_render_job(job_id: str, wait: float = 0):
+    """Poll a render job; wait=N blocks up to N seconds for it to finish"""
+    job = renderer.get(job_id)
+    if not job:
+        return JSONResponse(status_code=404, content={"error": "Unknown or expired render job"})
+    if wait > 0 and not job.finished:
+        await renderer.wait(job, min(wait, config.RENDER_TIMEOUT_SECONDS + 10))
+    return render_job_response(job)
+
+COVER_LETTER_MODES = ("template", "llm")
+
+def cover_letter_response(result: GenerationResult) -> dict:
+    return {
+        "status": "success",
+        "content": result.content,
+        "download_url": result.download_url,
+        "cached": result.cached,
+        "source": result.source,
+        "fallback": result.fallback
+    }
+
 @app.post("/api/cover-letter/generate")
 async def generate_cover_letter(
     job_title: str,
     company_name: str,
-    job_description: str = ""
+    job_description: str = "",
+    mode: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
 ):
-    """Generate cover letter"""
-    global current_user_resume, current_user_id
+    """
+    Generate cover letter (identical inputs on the same day return the stored file).
+    mode=llm writes it with the local model (default: COVER_LETTER_MODE).
+    """
     try:
-        ensure_user_loaded()
-        
-        if not current_user_resume:
+        if not session:
             return JSONResponse(
                 status_code=400,
                 content={"error": "Please upload resume first"}
             )
+        if mode is not None and mode not in COVER_LETTER_MODES:
+            return JSONResponse(
+                status_code=400,
+                content={"error": f"Unknown mode '{mode}'. Available: {', '.join(COVER_LETTER_MODES)}"}
+            )
         
-        # Generate
-        content = letter_gen.generate(
-            current_user_resume,
-            job_title,
-            company_name,
-            job_description
+        result = await generator.cover_letter(
+            db, session.user_id, session.resume, job_title, company_name, job_description, mode=mode
         )
         
-        # Save
-        os.makedirs("generated_docs", exist_ok=True)
-        filename = f"{current_user_id}_cover_letter_{company_name.replace(' ', '_')}.txt"
-        output_path = f"generated_docs/{filename}"
-        letter_gen.save_to_file(content, output_path)
-        
-        return {
-            "status": "success",
-            "content": content,
-            "download_url": f"/api/downloads/{filename}"
-        }
+        return cover_letter_response(result)
     
     except Exception as e:
         return JSONResponse(
@@ -373,18 +880,277 @@ async def generate_cover_letter(
             content={"error": str(e)}
         )
 
-@app.get("/api/downloads/{filename}")
-async def download_file(filename: str):
-    """Download generated document"""
+@app.get("/api/llm/stats")
+async def llm_stats():
+    """LLM scheduler queue depth, wait times, coalescing and cache counters"""
+    return llm_scheduler.stats()
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/cover-letter/stream")
+async def stream_cover_letter(
+    job_title: str,
+    company_name: str,
+    job_description: str = "",
+    session: Optional[UserSession] = Depends(get_user_session)
+):
+    """
+    LLM cover letter as Server-Sent Events: "token" events while the model
+    writes, then "done" with the full content and download_url. On timeout
+    the template letter is used and "done" has fallback=true (replace any
+    streamed text with its content).
+    """
+    if not session:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Please upload resume first"}
+        )
+    
+    async def events():
+        tokens: asyncio.Queue = asyncio.Queue()
+        async with AsyncSessionLocal() as db:
+            task = asyncio.create_task(generator.cover_letter(
+                db, session.user_id, session.resume, job_title, company_name, job_description,
+                mode="llm", on_token=tokens.put
+            ))
+            task.add_done_callback(lambda _: tokens.put_nowait(None))
+            try:
+                while True:
+                    token = await tokens.get()
+                    if token is None:
+                        break
+                    yield sse_event("token", {"text": token})
+                result = task.result()
+                if result.cached:
+                    yield sse_event("token", {"text": result.content})
+                yield sse_event("done", cover_letter_response(result))
+            except Exception as e:
+                yield sse_event("error", {"error": str(e)})
+            finally:
+                task.cancel()  # Client went away: stop generating
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/documents/bulk-generate")
+async def bulk_generate_documents(
+    request: BulkGenerateRequest,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
+):
+    """
+    Tailored resume (and cover letter) for each job id, rendered in parallel.
+    archive=true streams a zip as documents complete; otherwise returns
+    per-document results.
+    """
+    if not session:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Please upload resume first"}
+        )
+    if request.template not in RESUME_TEMPLATES:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"Unknown template '{request.template}'. Available: {', '.join(RESUME_TEMPLATES)}"}
+        )
+    
+    job_ids = list(dict.fromkeys(request.job_ids))
+    if len(job_ids) > config.BULK_GENERATE_MAX_JOBS:
+        return JSONResponse(
+            status_code=400,
+            content={"error": f"At most {config.BULK_GENERATE_MAX_JOBS} jobs per request"}
+        )
+    
+    jobs = {job.id: job for job in (await db.scalars(select(Job).where(Job.id.in_(job_ids)))).all()}
+    
+    # Keep the render queue from overflowing; workers set the real parallelism
+    slots = asyncio.Semaphore(max(1, renderer.workers * 2))
+    
+    async def generate_one(job_id: str, doc_type: str) -> dict:
+        entry = {"job_id": job_id, "doc_type": doc_type}
+        job = jobs.get(job_id)
+        if job is None:
+            return {**entry, "error": "Job not found"}
+        try:
+            async with slots, AsyncSessionLocal() as task_db:
+                if doc_type == "resume":
+                    result = await generator.resume(
+                        task_db, session.user_id, session.resume, job.title,
+                        request.template, request.output_format, job_id=job_id
+                    )
+                else:
+                    result = await generator.cover_letter(
+                        task_db, session.user_id, session.resume, job.title,
+                        job.company or "", job.description or "", job_id=job_id, priority=BULK
+                    )
+        except Exception as e:
+            return {**entry, "error": str(e)}
+        if result.error or result.file_path is None:
+            return {**entry, "error": result.error or "Render did not finish in time"}
+        name = result.document.file_name if result.document else os.path.basename(result.file_path)
+        return {
+            **entry,
+            "file_path": result.file_path,
+            "file_name": name,
+            "download_url": result.download_url,
+            "cached": result.cached
+        }
+    
+    doc_types = ["resume", "cover_letter"] if request.include_cover_letters else ["resume"]
+    tasks = [asyncio.ensure_future(generate_one(job_id, doc_type)) for job_id in job_ids for doc_type in doc_types]
+    
+    if not request.archive:
+        files = await asyncio.gather(*tasks)
+        failed = sum(1 for f in files if f.get("error"))
+        return BulkGenerateResponse(
+            status="success" if not failed else "partial",
+            total=len(files),
+            generated=len(files) - failed,
+            failed=failed,
+            files=files
+        )
+    
+    async def archive():
+        results = []
+        try:
+            async for chunk in zip_stream.stream_zip(tasks, results):
+                yield chunk
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(
+        archive(),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="documents.zip"'}
+    )
+
+@app.post("/api/applications")
+async def save_job_status(
+    request: SaveJobRequest,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
+):
+    """Shortlist, apply to or reject a job, storing the computed match"""
     try:
-        file_path = f"generated_docs/{filename}"
-        if os.path.exists(file_path):
-            return FileResponse(file_path)
-        else:
+        if not session:
+            return JSONResponse(
+                status_code=400,
+                content={"error": "Please upload resume first"}
+            )
+        
+        try:
+            job_data = request.job.model_dump() if request.job else None
+            job = await history.get_or_create_job(db, request.job_id, job_data)
+            if not job:
+                return JSONResponse(
+                    status_code=404,
+                    content={"error": "Job not found"}
+                )
+            
+            saved = await history.upsert_saved_job(
+                db,
+                user_id=session.user_id,
+                job_id=job.id,
+                status=request.status,
+                match_score=request.match_score,
+                matched_skills=request.matched_skills,
+                missing_skills=request.missing_skills
+            )
+            await db.commit()
+            
+            return {
+                "status": "success",
+                "saved_job": history.serialize_saved_job(saved, job)
+            }
+        except ValueError as e:
+            await db.rollback()
+            return JSONResponse(status_code=400, content={"error": str(e)})
+    
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+@app.get("/api/applications")
+async def get_application_history(
+    status: Optional[str] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
+):
+    """List saved jobs newest first; status is a comma-separated filter"""
+    try:
+        if not session:
             return JSONResponse(
                 status_code=404,
-                content={"error": "File not found"}
+                content={"error": "No active session"}
             )
+        
+        statuses = [s.strip() for s in status.split(',') if s.strip()] if status else None
+        limit = max(1, min(limit, 100))
+        
+        try:
+            rows, next_cursor = await history.list_saved_jobs(
+                db, session.user_id, statuses=statuses, limit=limit, cursor=cursor
+            )
+            total = await history.count_saved_jobs(db, session.user_id, statuses=statuses)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"error": str(e)})
+        
+        return {
+            "total": total,
+            "saved_jobs": [history.serialize_saved_job(saved, job) for saved, job in rows],
+            "next_cursor": next_cursor
+        }
+    
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+@app.get("/api/downloads/{filename}")
+@app.head("/api/downloads/{filename}")
+async def download_file(
+    filename: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    session: Optional[UserSession] = Depends(get_user_session)
+):
+    """
+    Download generated document (ETag/304, byte ranges, compressed text formats).
+    Documents evicted by the storage quota are regenerated for their owner,
+    under the generate admission limits; anyone else gets 410.
+    """
+    try:
+        document = await documents.find_by_file_name(db, filename)
+        if document is not None:
+            if os.path.exists(document.file_path):
+                await storage.touch(db, document)
+                if os.path.basename(document.file_path) != filename:
+                    # An HTML fallback since replaced by the rendered PDF
+                    return RedirectResponse(f"/api/downloads/{os.path.basename(document.file_path)}", status_code=307)
+            else:
+                if session is None or session.user_id != document.user_id:
+                    return JSONResponse(status_code=410, content={"error": "File expired; generate the document again"})
+                try:
+                    async with admission.admit("generate", request.scope) if config.ADMISSION_ENABLED else nullcontext():
+                        result = await generator.regenerate(db, document)
+                except Rejected as e:
+                    return e.response()
+                except RenderQueueFull as e:
+                    return JSONResponse(status_code=503, content={"error": str(e)}, headers={"Retry-After": "5"})
+                if result is None:
+                    return JSONResponse(status_code=404, content={"error": "File not found"})
+                if result.error:
+                    return JSONResponse(status_code=500, content={"error": result.error})
+                if not result.file_path:
+                    return JSONResponse(status_code=503, content={"error": "Document is being regenerated"}, headers={"Retry-After": "5"})
+                if os.path.basename(result.file_path) != filename:
+                    # Inputs now produce a different file (template edit, new date, HTML fallback)
+                    return RedirectResponse(result.download_url, status_code=307)
+        return await download_response(request, filename, document.file_name if document else None)
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 
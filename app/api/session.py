@@ -0,0 +1,156 @@
+# Per-request user sessions
+# Replaces the single global current_user_resume/current_user_id: each request
+# names its user (signed token; X-User-Id header in development) and reads that user's
+# resume/preferences through a bounded, TTL-revalidated LRU cache.
+
+from fastapi import Request, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.database.database import get_async_db
+from app.database.models import User
+from app.resume.models import ResumeData
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+import hashlib
+import hmac
+import threading
+import time
+
+DEFAULT_SECRET_KEY = "change-me"
+
+@dataclass
+class UserSession:
+    user_id: str
+    resume: ResumeData
+    preferences: dict
+    version: Optional[datetime]  # users.updated_at when loaded
+    profile_updated_at: Optional[datetime]
+    checked_at: float  # time.monotonic() of the last DB (re)validation
+
+def issue_token(user_id: str) -> str:
+    """Signed session token handed out at resume upload"""
+    signature = hmac.new(config.SECRET_KEY.encode(), user_id.encode(), hashlib.sha256).hexdigest()
+    return f"{user_id}.{signature}"
+
+def verify_token(token: str) -> Optional[str]:
+    """User id from a token issued by issue_token, or None if forged"""
+    user_id, _, signature = token.rpartition(".")
+    if not user_id:
+        return None
+    expected = hmac.new(config.SECRET_KEY.encode(), user_id.encode(), hashlib.sha256).hexdigest()
+    return user_id if hmac.compare_digest(signature, expected) else None
+
+def check_secret_key():
+    """
+    Run at startup. With the default SECRET_KEY anyone can forge session
+    tokens, so it is refused outside development; the unauthenticated
+    X-User-Id header lets anyone act as any user, so it is flagged loudly.
+    """
+    insecure = config.SECRET_KEY in ("", DEFAULT_SECRET_KEY)
+    if insecure and config.APP_ENV != "development":
+        raise RuntimeError(
+            f"SECRET_KEY is unset or the default with APP_ENV={config.APP_ENV}; session tokens could be forged. "
+            "Set SECRET_KEY to a random value (python -c \"import secrets; print(secrets.token_hex(32))\")"
+        )
+    if insecure:
+        print("WARNING: SECRET_KEY is the default - session tokens can be forged. Development only.")
+    if config.ALLOW_USER_ID_HEADER:
+        print("WARNING: ALLOW_USER_ID_HEADER is on - any client can act as any user with X-User-Id. "
+              "Development/single-user installs only.")
+
+def request_user_id(request: Request) -> Optional[str]:
+    """Identify the caller: Bearer token first, then the X-User-Id header"""
+    auth = request.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        return verify_token(auth[7:].strip())
+    if config.ALLOW_USER_ID_HEADER:
+        return request.headers.get("x-user-id") or None
+    return None
+
+class SessionCache:
+    """
+    Bounded LRU of UserSession keyed by user id.
+    Local writes invalidate immediately. Writes made by other workers are
+    picked up once an entry is older than the TTL: it is then revalidated
+    against users.updated_at (one indexed column) and only reloaded if the
+    row changed.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 30.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, UserSession]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, user_id: str) -> Optional[UserSession]:
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if session is not None:
+                self._sessions.move_to_end(user_id)
+            return session
+
+    def _put(self, session: UserSession):
+        with self._lock:
+            self._sessions[session.user_id] = session
+            self._sessions.move_to_end(session.user_id)
+            while len(self._sessions) > self.max_size:
+                self._sessions.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._sessions.pop(user_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    async def load(self, db: AsyncSession, user_id: str) -> Optional[UserSession]:
+        """Session for user_id, hitting the DB only on miss or expired TTL"""
+        session = self._get(user_id)
+        now = time.monotonic()
+
+        if session is not None:
+            if now - session.checked_at < self.ttl_seconds:
+                return session
+            version = await db.scalar(select(User.updated_at).where(User.id == user_id))
+            if version is not None and version == session.version:
+                session.checked_at = now
+                return session
+            self.invalidate(user_id)
+
+        user = await db.get(User, user_id)
+        if not user or not user.resume_data:
+            return None
+        return self.store(user)
+
+    def store(self, user: User) -> UserSession:
+        """Cache a freshly loaded or written User row"""
+        session = UserSession(
+            user_id=user.id,
+            resume=ResumeData(**user.resume_data),
+            preferences=user.preferences or {},
+            version=user.updated_at,
+            profile_updated_at=user.profile_updated_at,
+            checked_at=time.monotonic()
+        )
+        self._put(session)
+        return session
+
+sessions = SessionCache(config.SESSION_CACHE_SIZE, config.SESSION_CACHE_TTL_SECONDS)
+
+async def get_user_session(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[UserSession]:
+    """FastAPI dependency: the calling user's session, or None if unknown"""
+    user_id = request_user_id(request)
+
+    if user_id is None and config.SINGLE_USER_MODE:
+        # Local single-user installs: fall back to the latest upload
+        user_id = await db.scalar(select(User.id).order_by(User.created_at.desc()).limit(1))
+
+    if user_id is None:
+        return None
+    return await sessions.load(db, user_id)
@@ -8,17 +8,116 @@ class Config:
     OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "mistral")
     OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     OLLAMA_EMBEDDING_MODEL = os.getenv("OLLAMA_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # How long Ollama keeps the model loaded between requests
+    OLLAMA_MAX_TOKENS = int(os.getenv("OLLAMA_MAX_TOKENS", "600"))  # num_predict cap per generation
+    OLLAMA_FIRST_TOKEN_TIMEOUT_SECONDS = float(os.getenv("OLLAMA_FIRST_TOKEN_TIMEOUT_SECONDS", "20"))
+    OLLAMA_TIMEOUT_SECONDS = float(os.getenv("OLLAMA_TIMEOUT_SECONDS", "90"))  # Whole generation
+    OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "4"))
+    COVER_LETTER_MODE = os.getenv("COVER_LETTER_MODE", "template")  # template, llm (falls back to template)
+    LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "1"))  # Generations sent to Ollama at once (see OLLAMA_NUM_PARALLEL)
+    LLM_QUEUE_SIZE = int(os.getenv("LLM_QUEUE_SIZE", "100"))
+    LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))  # Longer waits fall back to the template
+    LLM_RESULT_CACHE = os.getenv("LLM_RESULT_CACHE", "true").lower() == "true"
     
     # Database
     DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./job_hunter.db")
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")  # Derived from DATABASE_URL if empty
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
     
     # Job Scraping
     JOB_SCRAPE_LIMIT = int(os.getenv("JOB_SCRAPE_LIMIT", "50"))
     SCRAPE_INTERVAL_HOURS = int(os.getenv("SCRAPE_INTERVAL_HOURS", "6"))
     
+    # Resume parsing
+    PDF_BACKEND = os.getenv("PDF_BACKEND", "auto")  # auto, pypdfium2, pdfminer, pypdf2
+    PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "50"))  # 0 = no cap
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "16"))
+    PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 1)))
+    MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "10"))  # Per resume file
+    RESUME_DEDUP_USERS = os.getenv("RESUME_DEDUP_USERS", "false").lower() == "true"  # Re-upload of identical bytes by the same signed-in user keeps that user; bulk reports duplicates
+    
+    # Bulk ingestion
+    BULK_MAX_FILES = int(os.getenv("BULK_MAX_FILES", "500"))
+    BULK_MAX_UPLOAD_MB = float(os.getenv("BULK_MAX_UPLOAD_MB", "200"))  # Whole request
+    BULK_PARSE_TIMEOUT_SECONDS = float(os.getenv("BULK_PARSE_TIMEOUT_SECONDS", "30"))  # Per file; single uploads too
+    BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "32"))  # Users per transaction / embedding batch
+    
+    # Matching
+    PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "256"))
+    # Generous, so sources appended after LinkedIn (RemoteOK) aren't cut off
+    MATCH_CANDIDATES = int(os.getenv("MATCH_CANDIDATES", "500"))
+    MATCH_WORKER_BACKEND = os.getenv("MATCH_WORKER_BACKEND", "asyncio")  # asyncio (threads) or process (own model per worker)
+    MATCH_CONCURRENCY = int(os.getenv("MATCH_CONCURRENCY", "2"))  # Match tasks running at once
+    MATCH_QUEUE_SIZE = int(os.getenv("MATCH_QUEUE_SIZE", "50"))
+    MATCH_RESULT_TTL_SECONDS = float(os.getenv("MATCH_RESULT_TTL_SECONDS", "900"))  # Reuse a (user, query) result this long
+    MATCH_TASK_RETENTION_HOURS = float(os.getenv("MATCH_TASK_RETENTION_HOURS", "24"))
+    MATCH_TASK_HEARTBEAT_SECONDS = float(os.getenv("MATCH_TASK_HEARTBEAT_SECONDS", "10"))  # Tasks silent for 3 intervals count as interrupted
+    MATCH_SHUTDOWN_GRACE_SECONDS = float(os.getenv("MATCH_SHUTDOWN_GRACE_SECONDS", "20"))  # Running tasks finish first; keep below WORKER_GRACEFUL_TIMEOUT_SECONDS
+    
+    # Document generation
+    GENERATED_DOCS_DIR = os.getenv("GENERATED_DOCS_DIR", "generated_docs")
+    TEMPLATE_BYTECODE_CACHE = os.getenv("TEMPLATE_BYTECODE_CACHE", "true").lower() == "true"
+    TEMPLATE_BYTECODE_CACHE_DIR = os.getenv("TEMPLATE_BYTECODE_CACHE_DIR", "")  # Empty: system temp dir
+    TEMPLATE_AUTO_RELOAD = os.getenv("TEMPLATE_AUTO_RELOAD", "false").lower() == "true"  # Enable while editing templates
+    RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))  # PDF render processes = max concurrent renders
+    RENDER_QUEUE_SIZE = int(os.getenv("RENDER_QUEUE_SIZE", "100"))
+    RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "60"))
+    RENDER_JOB_TTL_SECONDS = float(os.getenv("RENDER_JOB_TTL_SECONDS", "3600"))  # How long finished jobs can be polled
+    BULK_GENERATE_MAX_JOBS = int(os.getenv("BULK_GENERATE_MAX_JOBS", "100"))
+    DOWNLOAD_CACHE_MAX_AGE_SECONDS = int(os.getenv("DOWNLOAD_CACHE_MAX_AGE_SECONDS", "86400"))  # Revalidated by ETag after
+    GENERATED_DOCS_QUOTA_MB = float(os.getenv("GENERATED_DOCS_QUOTA_MB", "1024"))  # 0: unlimited
+    STORAGE_SWEEP_INTERVAL_SECONDS = float(os.getenv("STORAGE_SWEEP_INTERVAL_SECONDS", "600"))
+    STORAGE_ORPHAN_GRACE_SECONDS = float(os.getenv("STORAGE_ORPHAN_GRACE_SECONDS", "3600"))  # Unrecorded files younger than this are kept
+    
     # API
     API_HOST = os.getenv("API_HOST", "0.0.0.0")
     API_PORT = int(os.getenv("API_PORT", "8000"))
+    COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"  # br/gzip for JSON and text responses
+    COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))  # Smaller bodies are sent as they are
+    COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))  # 0-11; above ~5 costs more CPU than it saves bytes
+    VALIDATE_RESPONSES = os.getenv("VALIDATE_RESPONSES", "false").lower() == "true"  # Check job payloads against schemas.py (development)
+    
+    # Production server (gunicorn.conf.py, python run.py --production)
+    API_WORKERS = int(os.getenv("API_WORKERS", "2"))  # Each holds its own render pool and match queue
+    PRELOAD_MODEL = os.getenv("PRELOAD_MODEL", "true").lower() == "true"  # Load the embedding model once, before forking workers
+    WORKER_TIMEOUT_SECONDS = int(os.getenv("WORKER_TIMEOUT_SECONDS", "120"))  # Unresponsive workers are killed and replaced
+    WORKER_GRACEFUL_TIMEOUT_SECONDS = int(os.getenv("WORKER_GRACEFUL_TIMEOUT_SECONDS", "30"))  # In-flight work on restart/stop
+    WORKER_MAX_REQUESTS = int(os.getenv("WORKER_MAX_REQUESTS", "0"))  # Recycle workers after this many requests; 0: never
+    WORKER_MAX_REQUESTS_JITTER = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", "50"))  # Staggers recycling across workers
+    
+    # Admission control for expensive routes (per worker process)
+    ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "15"))  # Longest wait for a slot, then 503
+    ADMISSION_RATE_BURST = int(os.getenv("ADMISSION_RATE_BURST", "5"))  # Requests a caller can send at once per class
+    ADMISSION_ADDRESS_RATE_FACTOR = float(os.getenv("ADMISSION_ADDRESS_RATE_FACTOR", "4"))  # A client address gets this many callers' worth; new sessions do not reset it
+    ADMISSION_MATCH_CONCURRENCY = int(os.getenv("ADMISSION_MATCH_CONCURRENCY", "2"))  # /api/jobs/match and /api/jobs/search
+    ADMISSION_MATCH_QUEUE = int(os.getenv("ADMISSION_MATCH_QUEUE", "8"))
+    ADMISSION_MATCH_RATE_PER_MINUTE = float(os.getenv("ADMISSION_MATCH_RATE_PER_MINUTE", "12"))  # Per caller, also /api/match-tasks; 0: unlimited
+    ADMISSION_GENERATE_CONCURRENCY = int(os.getenv("ADMISSION_GENERATE_CONCURRENCY", "4"))  # Resume and cover letter generation
+    ADMISSION_GENERATE_QUEUE = int(os.getenv("ADMISSION_GENERATE_QUEUE", "16"))
+    ADMISSION_GENERATE_RATE_PER_MINUTE = float(os.getenv("ADMISSION_GENERATE_RATE_PER_MINUTE", "30"))
+    ADMISSION_PARSE_CONCURRENCY = int(os.getenv("ADMISSION_PARSE_CONCURRENCY", "2"))  # Resume uploads
+    ADMISSION_PARSE_QUEUE = int(os.getenv("ADMISSION_PARSE_QUEUE", "8"))
+    ADMISSION_PARSE_RATE_PER_MINUTE = float(os.getenv("ADMISSION_PARSE_RATE_PER_MINUTE", "20"))
+    
+    # Observability
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"  # /metrics and stage timers
+    SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "true").lower() == "true"  # Per-request stage breakdown
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"  # X-Profile requests, admin only
+    PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")  # Required in X-Profile-Token; empty disables profiling
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+    PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))  # Newest profiles kept on disk
+    
+    # Sessions
+    APP_ENV = os.getenv("APP_ENV", "development")  # development, production (default for run.py --production / gunicorn)
+    SECRET_KEY = os.getenv("SECRET_KEY", "change-me")  # Signs session tokens; the default is refused outside development
+    ALLOW_USER_ID_HEADER = os.getenv("ALLOW_USER_ID_HEADER", "false").lower() == "true"  # Unauthenticated X-User-Id; development/single-user only
+    SINGLE_USER_MODE = os.getenv("SINGLE_USER_MODE", "false").lower() == "true"  # Anonymous requests use latest user
+    SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "1024"))
+    SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "30"))
     
     # Job Preferences
     DEFAULT_LOCATION = os.getenv("DEFAULT_LOCATION", "Bangalore")
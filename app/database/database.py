@@ -1,17 +1,63 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.dialects import postgresql, sqlite
 from app.config import config
 from app.database.models import Base
+from app.serialization import dumps_str, loads
+from typing import AsyncIterator
 import os
 
+def to_async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its asyncio driver"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
 # Create SQLite database
 engine = create_engine(
     config.DATABASE_URL,
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    json_serializer=dumps_str,
+    json_deserializer=loads
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API routes.
+# aiosqlite defaults to NullPool (a new connection + thread per session),
+# so pool connections explicitly.
+async_engine = create_async_engine(
+    config.ASYNC_DATABASE_URL or to_async_url(config.DATABASE_URL),
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    # JSON columns (match task results) hold job dicts with datetimes
+    json_serializer=dumps_str,
+    json_deserializer=loads
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+if async_engine.dialect.name == "sqlite":
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets pooled readers run alongside a writer
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
 def get_db():
     db = SessionLocal()
     try:
@@ -19,11 +65,51 @@ def get_db():
     finally:
         db.close()
 
+# INSERT ... ON CONFLICT per dialect
+UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+def upsert_insert(db: AsyncSession):
+    """insert() supporting on_conflict_do_nothing/do_update for db's dialect"""
+    return UPSERT_DIALECTS[db.get_bind().dialect.name]
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one AsyncSession per request, rolled back on error"""
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+def sync_schema(bind):
+    """
+    Bring an existing database up to date with the models.
+    create_all() only creates missing tables, so columns and indexes
+    added to existing tables are applied here (SQLite has no migrations).
+    """
+    inspector = inspect(bind)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing_columns = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(dialect=bind.dialect)
+                bind.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+        for index in table.indexes:
+            index.create(bind, checkfirst=True)
+
 def init_db():
     """Create database tables"""
     Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        sync_schema(conn)
     print("Database initialized successfully")
 
+async def close_db():
+    """Dispose pooled async connections on shutdown"""
+    await async_engine.dispose()
+
 def get_db_session():
     """Get database session"""
     return SessionLocal()
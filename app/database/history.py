@@ -0,0 +1,177 @@
+# Application history - persisted shortlist/apply/reject decisions
+# Reads only touch saved_jobs/jobs, so listing never re-scrapes or re-embeds.
+
+from sqlalchemy import and_, or_, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import upsert_insert
+from app.database.models import SavedJob, Job
+from typing import List, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+
+VALID_STATUSES = ("shortlisted", "applied", "rejected")
+
+def encode_cursor(saved_job: SavedJob) -> str:
+    """Opaque keyset cursor pointing at the last row of a page"""
+    raw = json.dumps([saved_job.created_at.isoformat(), saved_job.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor; raises ValueError on malformed input"""
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), row_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+async def get_or_create_job(db: AsyncSession, job_id: str, job_data: Optional[dict] = None) -> Optional[Job]:
+    """
+    Resolve a job id to a stored Job.
+    Match results are transient, so the caller may pass the job payload
+    to store it on first save (deduplicated by URL).
+    """
+    job = await db.get(Job, job_id)
+    if job or not job_data:
+        return job
+
+    if job_data.get('url'):
+        job = await db.scalar(select(Job).where(Job.url == job_data['url']))
+        if job:
+            return job
+
+    # A concurrent first save of the same job may insert it first (same id or url)
+    insert = upsert_insert(db)
+    await db.execute(
+        insert(Job)
+        .values(
+            id=job_id,
+            title=job_data.get('title'),
+            company=job_data.get('company'),
+            description=job_data.get('description'),
+            location=job_data.get('location'),
+            job_type=job_data.get('job_type') or 'not specified',
+            url=job_data.get('url') or None,
+            source=job_data.get('source'),
+            salary=job_data.get('salary'),
+            posted_date=job_data.get('posted_date') or datetime.now(),
+            experience_level=job_data.get('experience_level') or 'not specified',
+            parsed_data=json.dumps(job_data, default=str)
+        )
+        .on_conflict_do_nothing()
+    )
+    job = await db.get(Job, job_id)
+    if job is None and job_data.get('url'):
+        job = await db.scalar(select(Job).where(Job.url == job_data['url']))
+    return job
+
+async def upsert_saved_job(
+    db: AsyncSession,
+    user_id: str,
+    job_id: str,
+    status: str,
+    match_score: float,
+    matched_skills: List[str],
+    missing_skills: List[str]
+) -> SavedJob:
+    """
+    Record a status for (user, job), updating the existing row if present.
+    One INSERT ... ON CONFLICT DO UPDATE, so two concurrent saves of the
+    same job cannot both insert and trip the unique index.
+    """
+    if status not in VALID_STATUSES:
+        raise ValueError(f"Invalid status '{status}', expected one of {', '.join(VALID_STATUSES)}")
+
+    values = dict(
+        status=status,
+        match_score=match_score,
+        matched_skills=matched_skills,
+        missing_skills=missing_skills
+    )
+    insert = upsert_insert(db)
+    await db.execute(
+        insert(SavedJob)
+        .values(user_id=user_id, job_id=job_id, **values)
+        .on_conflict_do_update(
+            index_elements=["user_id", "job_id"],
+            set_=dict(values, updated_at=datetime.utcnow())
+        )
+    )
+    return await db.scalar(
+        select(SavedJob)
+        .where(SavedJob.user_id == user_id, SavedJob.job_id == job_id)
+        .execution_options(populate_existing=True)
+    )
+
+async def list_saved_jobs(
+    db: AsyncSession,
+    user_id: str,
+    statuses: Optional[List[str]] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None
+) -> Tuple[List[Tuple[SavedJob, Optional[Job]]], Optional[str]]:
+    """
+    One page of a user's history, newest first.
+    Keyset pagination on (created_at, id) keeps each page an index range
+    scan no matter how deep the client pages.
+    """
+    query = select(SavedJob, Job).outerjoin(Job, Job.id == SavedJob.job_id).where(
+        SavedJob.user_id == user_id
+    )
+
+    if statuses:
+        query = query.where(SavedJob.status.in_(statuses))
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.where(or_(
+            SavedJob.created_at < created_at,
+            and_(SavedJob.created_at == created_at, SavedJob.id < row_id)
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(
+        query.order_by(SavedJob.created_at.desc(), SavedJob.id.desc()).limit(limit + 1)
+    )
+    rows = [tuple(row) for row in result.all()]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][0])
+
+    return rows, next_cursor
+
+async def count_saved_jobs(db: AsyncSession, user_id: str, statuses: Optional[List[str]] = None) -> int:
+    """Total rows matching the same filters as list_saved_jobs"""
+    query = select(func.count()).select_from(SavedJob).where(SavedJob.user_id == user_id)
+    if statuses:
+        query = query.where(SavedJob.status.in_(statuses))
+    return await db.scalar(query)
+
+def serialize_saved_job(saved: SavedJob, job: Optional[Job] = None) -> dict:
+    """Flatten a SavedJob (and its Job) into the SavedJobSchema shape"""
+    return {
+        'id': saved.id,
+        'user_id': saved.user_id,
+        'job_id': saved.job_id,
+        'status': saved.status,
+        'match_score': saved.match_score or 0.0,
+        'matched_skills': saved.matched_skills or [],
+        'missing_skills': saved.missing_skills or [],
+        'created_at': saved.created_at,
+        'updated_at': saved.updated_at,
+        'job': {
+            'id': job.id,
+            'title': job.title or '',
+            'company': job.company or '',
+            'description': job.description or '',
+            'location': job.location or '',
+            'job_type': job.job_type,
+            'url': job.url or '',
+            'source': job.source or '',
+            'salary': job.salary,
+            'posted_date': job.posted_date,
+            'experience_level': job.experience_level
+        } if job else None
+    }
@@ -0,0 +1,37 @@
+# LLM result cache - identical prompts to the same model and options reuse
+# the stored text instead of running the model again. Keyed by a hash of
+# (model, prompt hash, options), so the prompt itself is never stored.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.models import LLMResult
+from datetime import datetime
+from typing import Dict, Optional
+import hashlib
+import json
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+def cache_key(model: str, prompt: str, options: Dict) -> str:
+    canonical = json.dumps(
+        {"model": model, "prompt": prompt_hash(prompt), "options": options},
+        sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+async def lookup(db: AsyncSession, key: str) -> Optional[LLMResult]:
+    """Cached result for key (counts the hit; the caller commits)"""
+    entry = await db.get(LLMResult, key)
+    if entry is not None:
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_hit_at = datetime.utcnow()
+    return entry
+
+async def store(db: AsyncSession, key: str, model: str, prompt: str, options: Dict, response: str) -> LLMResult:
+    """Record a completed generation; the caller commits"""
+    entry = await db.get(LLMResult, key)
+    if entry is None:
+        entry = LLMResult(cache_key=key, model=model, prompt_hash=prompt_hash(prompt), options=options, hit_count=0)
+        db.add(entry)
+    entry.response = response
+    return entry
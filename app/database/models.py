@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, JSON, Float, Integer, Text, Boolean
+from sqlalchemy import Column, String, DateTime, JSON, Float, Integer, Text, Boolean, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 import uuid
@@ -12,6 +12,12 @@ class User(Base):
     email = Column(String, unique=True, index=True, nullable=True)
     resume_data = Column(JSON)  # Parsed resume as JSON
     preferences = Column(JSON)  # Job search preferences
+    # Precomputed matching profile (see app/matching/profile.py)
+    profile_embedding = Column(LargeBinary, nullable=True)  # float32 resume embedding
+    profile_model = Column(String, nullable=True)  # Embedding model that produced it
+    profile_skills = Column(JSON, nullable=True)  # Deduplicated technical skills
+    profile_filters = Column(JSON, nullable=True)  # Preference filters
+    profile_updated_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -23,17 +29,27 @@ class Job(Base):
     company = Column(String, index=True)
     description = Column(Text)
     location = Column(String, index=True)
-    job_type = Column(String)  # remote, hybrid, on-site
+    job_type = Column(String, index=True)  # remote, hybrid, on-site
     url = Column(String, unique=True)
     source = Column(String)  # indeed, github, stackoverflow, linkedin
-    salary = Column(String, nullable=True)
+    salary = Column(String, nullable=True)  # Display string, e.g. "USD 120,000 - 150,000"
+    salary_min = Column(Integer, nullable=True, index=True)  # Annualized, in salary_currency
+    salary_max = Column(Integer, nullable=True, index=True)
+    salary_currency = Column(String, nullable=True)
     posted_date = Column(DateTime, nullable=True)
-    experience_level = Column(String)  # entry, mid, senior
+    experience_level = Column(String, index=True)  # entry, mid, senior
     parsed_data = Column(JSON)  # Structured job data
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class SavedJob(Base):
     __tablename__ = "saved_jobs"
+    __table_args__ = (
+        # History listing: WHERE user_id = ? [AND status IN (...)] ORDER BY created_at DESC
+        Index("ix_saved_jobs_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_saved_jobs_user_created", "user_id", "created_at"),
+        # One row per (user, job); status changes update it in place
+        Index("uq_saved_jobs_user_job", "user_id", "job_id", unique=True),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, index=True)
@@ -43,14 +59,74 @@ class SavedJob(Base):
     matched_skills = Column(JSON)
     missing_skills = Column(JSON)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class GeneratedDocument(Base):
     __tablename__ = "generated_documents"
+    __table_args__ = (
+        # Content-addressed cache lookup (see app/generation/documents.py)
+        Index("uq_generated_documents_content_hash", "content_hash", unique=True),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, index=True)
     job_id = Column(String, index=True)
     doc_type = Column(String)  # resume, cover_letter
     file_path = Column(String)
-    file_name = Column(String)
+    file_name = Column(String)  # Display name for downloads
+    content_hash = Column(String, nullable=True)  # SHA-256 of the generation inputs
+    template = Column(String, nullable=True)
+    output_format = Column(String, nullable=True)  # pdf, docx, txt
+    file_size = Column(Integer, nullable=True)
+    generation_inputs = Column(JSON, nullable=True)  # Resume + parameters, for regeneration after eviction
+    last_accessed_at = Column(DateTime, default=datetime.utcnow, index=True)  # LRU order for the storage quota
+    evicted_at = Column(DateTime, nullable=True)  # File removed by the quota; row kept for regeneration
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ParsedResume(Base):
+    """Parse cache: identical PDF bytes + parser version -> stored ResumeData"""
+    __tablename__ = "parsed_resumes"
+    
+    content_hash = Column(String, primary_key=True)  # SHA-256 of the uploaded bytes
+    parser_version = Column(String, primary_key=True)  # See app/resume/parser.py PARSER_VERSION
+    resume_data = Column(JSON)
+    user_id = Column(String, nullable=True, index=True)  # First user created from this file (dedup)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_hit_at = Column(DateTime, nullable=True)
+
+class LLMResult(Base):
+    """LLM result cache: (model, prompt hash, options) -> generated text"""
+    __tablename__ = "llm_results"
+    
+    cache_key = Column(String, primary_key=True)  # SHA-256 over model, prompt hash and options
+    model = Column(String, index=True)
+    prompt_hash = Column(String)  # SHA-256 of the prompt
+    options = Column(JSON)
+    response = Column(Text)
+    hit_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_hit_at = Column(DateTime, nullable=True)
+
+class MatchTask(Base):
+    """Background match run (see app/matching/tasks.py): progress, then the ranked result"""
+    __tablename__ = "match_tasks"
+    __table_args__ = (
+        # Result reuse by (user, query)
+        Index("ix_match_tasks_user_query_created", "user_id", "query_key", "created_at"),
+    )
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String)
+    query = Column(String)
+    query_key = Column(String)  # Normalized query
+    status = Column(String, default="queued", index=True)  # queued, running, done, failed, cancelled
+    stage = Column(String, nullable=True)  # scraping, saving, filtering, embedding, ranking
+    progress = Column(JSON)  # scraped, candidates, embedded counts
+    result = Column(JSON, nullable=True)  # Ranked jobs, as /api/jobs/match returns them
+    error = Column(Text, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    owner = Column(String, nullable=True)  # Worker process that accepted it: host:pid:instance
+    heartbeat_at = Column(DateTime, nullable=True)  # Refreshed by the owner while queued or running
@@ -0,0 +1,57 @@
+# Parsed resume cache - identical uploads skip PDF extraction and heuristics
+# Keyed by SHA-256 of the file bytes and the parser version; entries written
+# by another parser version (or PDF backend) are never served and are purged
+# at startup.
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import upsert_insert
+from app.database.models import ParsedResume, User
+from app.resume import pdf_text
+from app.resume.parser import PARSER_VERSION
+from datetime import datetime
+from typing import Optional
+import hashlib
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def parser_version() -> str:
+    """Parser logic version plus the PDF backend, since backends extract text differently"""
+    return f"{PARSER_VERSION}/{pdf_text.select_backend()}"
+
+async def lookup(db: AsyncSession, digest: str) -> Optional[ParsedResume]:
+    """Cached parse for these bytes under the current parser version (counts the hit)"""
+    entry = await db.get(ParsedResume, (digest, parser_version()))
+    if entry is not None:
+        entry.hit_count = (entry.hit_count or 0) + 1
+        entry.last_hit_at = datetime.utcnow()
+    return entry
+
+async def store(db: AsyncSession, digest: str, resume_data: dict, user_id: Optional[str] = None):
+    """
+    Record a fresh parse; the caller commits. Two uploads of the same new
+    file both miss lookup() and both store: the first insert wins and the
+    second is a no-op instead of a primary key violation.
+    """
+    insert = upsert_insert(db)
+    await db.execute(
+        insert(ParsedResume)
+        .values(
+            content_hash=digest, parser_version=parser_version(),
+            resume_data=resume_data, user_id=user_id, hit_count=0
+        )
+        .on_conflict_do_nothing(index_elements=["content_hash", "parser_version"])
+    )
+
+async def dedup_user(db: AsyncSession, entry: ParsedResume) -> Optional[User]:
+    """The user previously created from the same file, if it still exists"""
+    if not entry.user_id:
+        return None
+    return await db.get(User, entry.user_id)
+
+async def purge_stale(db: AsyncSession) -> int:
+    """Drop entries written by other parser versions"""
+    result = await db.execute(delete(ParsedResume).where(ParsedResume.parser_version != parser_version()))
+    await db.commit()
+    return result.rowcount or 0
@@ -49,6 +49,7 @@ class JobPreferencesSchema(BaseModel):
     locations: List[str] = []
     min_salary: Optional[int] = None
     max_salary: Optional[int] = None
+    salary_currency: Optional[str] = None  # e.g. INR, USD; None matches any
     industries: List[str] = []
     required_skills: List[str] = []
     nice_to_have_skills: List[str] = []
@@ -63,6 +64,9 @@ class JobSchema(BaseModel):
     url: str
     source: str
     salary: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    salary_currency: Optional[str] = None
     posted_date: Optional[datetime] = None
     experience_level: Optional[str] = None
 
@@ -84,10 +88,17 @@ class JobMatchDetailSchema(BaseModel):
     job: JobSchema
     match: JobMatchSchema
 
+class JobMatchResultSchema(BaseModel):
+    job: JobSchema
+    match_score: float
+    recommendation: str
+    matched_skills: List[str]
+    missing_skills: List[str]
+
 class JobMatchResponse(BaseModel):
     status: str
     total: int
-    jobs: List[JobMatchDetailSchema]
+    jobs: List[JobMatchResultSchema]  # Highest match_score first
 
 # ============ Document Generation Schemas ============
 
@@ -112,6 +123,14 @@ class CoverLetterResponse(BaseModel):
 
 # ============ Application Status Schemas ============
 
+class SaveJobRequest(BaseModel):
+    job_id: str
+    status: str  # shortlisted, applied, rejected
+    match_score: float = 0.0
+    matched_skills: List[str] = []
+    missing_skills: List[str] = []
+    job: Optional[JobSchema] = None  # Transient match result, stored if not yet in DB
+
 class SavedJobSchema(BaseModel):
     id: str
     user_id: str
@@ -121,10 +140,13 @@ class SavedJobSchema(BaseModel):
     matched_skills: List[str]
     missing_skills: List[str]
     created_at: datetime
+    updated_at: Optional[datetime] = None
+    job: Optional[JobSchema] = None
 
 class ApplicationHistoryResponse(BaseModel):
     total: int
     saved_jobs: List[SavedJobSchema]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= for the next page
 
 # ============ API Error Schemas ============
 
@@ -143,13 +165,16 @@ class HealthResponse(BaseModel):
 class BulkGenerateRequest(BaseModel):
     job_ids: List[str]
     output_format: str = "pdf"
+    template: str = "ats"
+    include_cover_letters: bool = True
+    archive: bool = False  # Stream a zip instead of returning download URLs
 
 class BulkGenerateResponse(BaseModel):
     status: str
     total: int
     generated: int
     failed: int
-    files: List[dict]  # List of {job_id, file_path, download_url}
+    files: List[dict]  # List of {job_id, doc_type, file_path, download_url} or {job_id, doc_type, error}
 
 class BatchJobSearchRequest(BaseModel):
     queries: List[str]
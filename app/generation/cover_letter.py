@@ -53,8 +53,9 @@ class CoverLetterGenerator:
         achievement2 = "demonstrated leadership and technical proficiency"
         
         if resume.work_experience:
-            exp = resume.work_experience
-            achievement1 = exp.description.split('\n')[:100] if exp.description else achievement1
+            exp = resume.work_experience[0]
+            first_line = exp.description.split('\n')[0].strip() if exp.description else ""
+            achievement1 = first_line[:100].rstrip('.').lower() if first_line else achievement1
         
         # Build context
         context = {
@@ -64,7 +65,7 @@ class CoverLetterGenerator:
             'company_name': company_name,
             'years_exp': resume.years_of_experience,
             'primary_skills': ', '.join(resume.technical_skills[:2]) if resume.technical_skills else 'software development',
-            'current_company': resume.work_experience.company if resume.work_experience else 'my current position',
+            'current_company': resume.work_experience[0].company if resume.work_experience else 'my current position',
             'achievement1': achievement1,
             'achievement2': achievement2,
             'company_interest': f"of its reputation and involvement in {job_title}",
@@ -79,8 +80,39 @@ class CoverLetterGenerator:
         letter = self.TEMPLATE.format(**context)
         return letter
     
+    def build_prompt(
+        self,
+        resume: ResumeData,
+        job_title: str,
+        company_name: str,
+        job_description: str = ""
+    ) -> str:
+        """Prompt for LLM-written cover letters (same facts the template uses)"""
+        experience = "\n".join(
+            f"- {exp.job_title} at {exp.company} ({exp.duration}): {(exp.description or '').strip()[:300]}"
+            for exp in resume.work_experience[:3]
+        ) or "- (none listed)"
+        
+        return f"""Write a concise, professional cover letter (under 350 words) for the candidate below.
+Use only facts given here; do not invent employers, degrees or numbers.
+Start with the candidate's contact details and today's date ({datetime.now().strftime("%B %d, %Y")}),
+address it to the Hiring Manager, and sign it with the candidate's name. Output only the letter.
+
+Position: {job_title} at {company_name}
+Job description: {job_description[:1500] or "(not provided)"}
+
+Candidate: {resume.full_name}
+Contact: {resume.email} | {resume.phone} | {resume.location}
+Years of experience: {resume.years_of_experience}
+Summary: {resume.summary or "(none)"}
+Technical skills: {', '.join(resume.technical_skills[:15]) or "(none listed)"}
+Soft skills: {', '.join(resume.soft_skills[:8]) or "(none listed)"}
+Experience:
+{experience}
+"""
+    
     def save_to_file(self, content: str, output_path: str):
         """Save cover letter to file"""
-        with open(output_path, 'w') as f:
+        with open(output_path, 'w', encoding='utf-8') as f:
             f.write(content)
         return output_path
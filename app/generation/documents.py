@@ -0,0 +1,109 @@
+# Generated document cache - content-addressed files recorded in GeneratedDocument
+# A document is identified by a hash of everything that determines its bytes
+# (resume data, job inputs, template, format, generator version), so a repeat
+# request returns the existing file instead of rendering again.
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.database.models import GeneratedDocument
+from app.generation.storage import storage
+from datetime import datetime
+from typing import Optional
+import hashlib
+import json
+import os
+
+# Bump when generator code changes output; template edits are picked up by digest
+GENERATOR_VERSION = "2"
+
+def document_key(doc_type: str, resume: dict, **inputs) -> str:
+    """SHA-256 over canonical JSON of the generation inputs"""
+    payload = {
+        "generator_version": GENERATOR_VERSION,
+        "doc_type": doc_type,
+        "resume": resume,
+        "inputs": inputs,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def document_path(key: str, extension: str) -> str:
+    """Where a document with this key lives on disk"""
+    return os.path.join(config.GENERATED_DOCS_DIR, f"{key}.{extension}")
+
+def display_name(*parts: str, extension: str) -> str:
+    """Human-readable file name, e.g. for Content-Disposition"""
+    return "_".join(part.replace(" ", "_") for part in parts if part) + f".{extension}"
+
+async def find_document(db: AsyncSession, key: str) -> Optional[GeneratedDocument]:
+    """
+    Recorded document for key whose file still exists (the hit counts as an
+    access). Rows whose file is gone are marked evicted and kept, so
+    generating again rewrites the same row.
+    """
+    # populate_existing: a render callback may have rewritten the row since this session loaded it
+    document = await db.scalar(
+        select(GeneratedDocument)
+        .where(GeneratedDocument.content_hash == key)
+        .execution_options(populate_existing=True)
+    )
+    if document is None:
+        return None
+    if not os.path.exists(document.file_path):
+        if document.evicted_at is None:
+            document.evicted_at = datetime.utcnow()
+            await db.commit()
+        return None
+    await storage.touch(db, document)
+    return document
+
+async def find_by_file_name(db: AsyncSession, file_name: str) -> Optional[GeneratedDocument]:
+    """
+    Document whose key file_name carries (present or evicted). Its current
+    file may have another extension: an HTML fallback since replaced by the PDF.
+    """
+    key, _, extension = file_name.partition(".")
+    if "." in extension:
+        return None  # Compressed variants (<key>.txt.gz) are not documents
+    return await db.scalar(select(GeneratedDocument).where(GeneratedDocument.content_hash == key))
+
+async def record_document(
+    db: AsyncSession,
+    key: str,
+    user_id: str,
+    doc_type: str,
+    file_path: str,
+    file_name: str,
+    template: Optional[str] = None,
+    output_format: Optional[str] = None,
+    job_id: Optional[str] = None,
+    inputs: Optional[dict] = None
+) -> GeneratedDocument:
+    """
+    Insert (or refresh) the row for a freshly written document and commit.
+    inputs (resume + parameters) let the document be regenerated after eviction.
+    Users with identical inputs share the row; its user_id and job_id stay
+    those of whoever generated it first.
+    """
+    document = await db.scalar(select(GeneratedDocument).where(GeneratedDocument.content_hash == key))
+    replaced = 0  # Bytes of a still-counted file this write overwrote
+    if document is None:
+        document = GeneratedDocument(content_hash=key, user_id=user_id, job_id=job_id)
+        db.add(document)
+    elif document.file_path and document.file_path != file_path:
+        storage.discard(document.file_path)  # The HTML fallback this PDF replaces
+    elif document.evicted_at is None:
+        replaced = document.file_size or 0
+    document.doc_type = doc_type
+    document.file_path = file_path
+    document.file_name = file_name
+    document.template = template
+    document.output_format = output_format
+    document.file_size = os.path.getsize(file_path)
+    document.generation_inputs = inputs
+    document.last_accessed_at = datetime.utcnow()
+    document.evicted_at = None
+    await db.commit()
+    storage.added(document.file_size - replaced)
+    return document
@@ -0,0 +1,160 @@
+# DOCX resumes built directly from ResumeData
+# python-docx spends most of its time loading the default template,
+# resolving style names and inserting elements one by one, so each thread
+# keeps one styled base document: builds clear its body and append clones
+# of prebuilt prototype paragraphs (style already set) with the text filled in.
+
+from docx import Document
+from docx.oxml.ns import qn
+from docx.shared import Pt, Inches, RGBColor
+from typing import Dict, List, Optional
+import copy
+import threading
+
+# Layout per resume template; two-column renders single-column for ATS parsing
+LAYOUTS = {
+    "ats": {"font_size": 11, "name_size": 16, "heading_size": 12, "margin": 0.6, "max_bullets": 5},
+    "compact": {"font_size": 9.5, "name_size": 13, "heading_size": 10, "margin": 0.4, "max_bullets": 3},
+    "two-column": {"font_size": 10, "name_size": 16, "heading_size": 11, "margin": 0.5, "max_bullets": 5},
+}
+
+class _Base:
+    """A styled document plus prototype paragraphs, reused by one thread"""
+
+    def __init__(self, layout: Dict):
+        self.document = Document()
+        styles = self.document.styles
+
+        normal = styles["Normal"]
+        normal.font.name = "Arial"
+        normal.font.size = Pt(layout["font_size"])
+        normal.paragraph_format.space_after = Pt(2)
+        normal.paragraph_format.space_before = Pt(0)
+
+        title = styles["Title"]
+        title.font.name = "Arial"
+        title.font.size = Pt(layout["name_size"])
+        title.font.bold = True
+        title.font.color.rgb = RGBColor(0, 0, 0)
+        title.paragraph_format.space_after = Pt(2)
+
+        heading = styles["Heading 2"]
+        heading.font.name = "Arial"
+        heading.font.size = Pt(layout["heading_size"])
+        heading.font.bold = True
+        heading.font.color.rgb = RGBColor(0, 0, 0)
+        heading.paragraph_format.space_before = Pt(8)
+        heading.paragraph_format.space_after = Pt(3)
+
+        bullet = styles["List Bullet"]
+        bullet.font.name = "Arial"
+        bullet.font.size = Pt(layout["font_size"])
+        bullet.paragraph_format.space_after = Pt(1)
+
+        for section in self.document.sections:
+            section.left_margin = section.right_margin = Inches(layout["margin"])
+            section.top_margin = section.bottom_margin = Inches(layout["margin"])
+
+        # Prototype paragraphs, cloned per line instead of built run by run
+        self.prototypes = {}
+        for style in ("Normal", "Title", "Heading 2", "List Bullet"):
+            self.prototypes[style] = self._prototype(styles[style].style_id, bold=False)
+        self.prototypes["line"] = self._prototype(None, bold=True, trailing_run=True)
+        self.layout = layout
+        self.reset()
+
+    def _prototype(self, style_id: Optional[str], bold: bool, trailing_run: bool = False):
+        paragraph = self.document.add_paragraph()
+        if style_id and style_id != "Normal":
+            paragraph._p.style = style_id
+        paragraph.add_run("x").bold = bold or None
+        if trailing_run:
+            paragraph.add_run("x")
+        for text in paragraph._p.iter(qn("w:t")):
+            text.set(qn("xml:space"), "preserve")
+        return paragraph._p
+
+    def reset(self):
+        """Empty the body, keeping section properties (page size, margins)"""
+        body = self.document.element.body
+        for child in list(body):
+            if child.tag != qn("w:sectPr"):
+                body.remove(child)
+        self.section = body.find(qn("w:sectPr"))
+
+    def add(self, style: str, *texts: str):
+        """Append a clone of a prototype paragraph with its runs set to texts"""
+        paragraph = copy.deepcopy(self.prototypes[style])
+        runs = paragraph.findall(qn("w:r"))
+        for run, text in zip(runs, texts):
+            run.find(qn("w:t")).text = text
+        for run in runs[len(texts):]:
+            paragraph.remove(run)
+        self.section.addprevious(paragraph)
+
+_local = threading.local()
+
+def _base(template: str) -> _Base:
+    bases = getattr(_local, "bases", None)
+    if bases is None:
+        bases = _local.bases = {}
+    base = bases.get(template)
+    if base is None:
+        base = bases[template] = _Base(LAYOUTS.get(template, LAYOUTS["ats"]))
+    return base
+
+def build_resume_docx(context: Dict, output_path: str, template: Optional[str] = None) -> str:
+    """
+    Write a resume DOCX from ResumeTailor.build_context() output:
+    name, contact line, then headed sections with bulleted details.
+    """
+    base = _base(template or "ats")
+    base.reset()
+    max_bullets = base.layout["max_bullets"]
+
+    base.add("Title", context["full_name"])
+    contact = " | ".join(part for part in (context.get("email"), context.get("phone"), context.get("location")) if part)
+    if contact:
+        base.add("Normal", contact)
+
+    if context.get("summary"):
+        base.add("Heading 2", "Professional Summary")
+        base.add("Normal", context["summary"])
+
+    if context.get("technical_skills"):
+        base.add("Heading 2", "Technical Skills")
+        base.add("Normal", context["technical_skills_text"])
+
+    if context.get("soft_skills"):
+        base.add("Heading 2", "Core Competencies")
+        base.add("Normal", context["soft_skills_text"])
+
+    experience: List[Dict] = context.get("work_experience") or []
+    if experience:
+        base.add("Heading 2", "Professional Experience")
+        for exp in experience:
+            details = " | ".join(part for part in (exp["company"], exp["duration"]) if part)
+            base.add("line", exp["job_title"] or "", *([f" | {details}"] if details else []))
+            for bullet in exp["bullets"][:max_bullets]:
+                base.add("List Bullet", bullet.strip(" •-*"))
+
+    education = context.get("education") or []
+    if education:
+        base.add("Heading 2", "Education")
+        for edu in education:
+            degree = edu.degree if not edu.field else f"{edu.degree} in {edu.field}"
+            details = " | ".join(part for part in (edu.school, edu.year) if part)
+            if edu.gpa:
+                details = f"{details} (GPA: {edu.gpa})" if details else f"GPA: {edu.gpa}"
+            base.add("line", degree, *([f" | {details}"] if details else []))
+
+    certifications = context.get("certifications") or []
+    if certifications:
+        base.add("Heading 2", "Certifications & Achievements")
+        for cert in certifications:
+            base.add("List Bullet", cert)
+
+    base.document.core_properties.title = f"{context['full_name']} - Resume"
+    base.document.core_properties.author = context["full_name"]
+    base.document.save(output_path)
+    return output_path
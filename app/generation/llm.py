@@ -0,0 +1,150 @@
+# Ollama client for local LLM generation
+# One pooled httpx.AsyncClient per process reuses connections across
+# requests and talks to /api/generate with streaming on, so callers get
+# tokens as the model produces them. keep_alive keeps the model loaded
+# between requests; num_predict plus a character cap bound the output, and
+# separate first-token / total deadlines turn a stalled model into an error
+# the caller can fall back from.
+
+from app.config import config
+from typing import AsyncIterator, Dict, Optional
+import asyncio
+import httpx
+import json
+
+# Character cap on top of num_predict, in case the server ignores it
+MAX_CHARS_PER_TOKEN = 8
+
+class LLMUnavailable(Exception):
+    """Ollama unreachable, returned an error, or missed a deadline"""
+
+class OllamaClient:
+    """Streaming /api/generate over a shared connection pool"""
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        keep_alive: str = "30m",
+        max_tokens: int = 600,
+        first_token_timeout: float = 20.0,
+        timeout: float = 90.0,
+        max_connections: int = 4,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.keep_alive = keep_alive
+        self.max_tokens = max_tokens
+        self.first_token_timeout = first_token_timeout
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.transport = transport  # e.g. httpx.ASGITransport around a stand-in server
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Created on first use, inside the running event loop"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.first_token_timeout, connect=5.0),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                transport=self.transport
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def options(self, options: Optional[Dict] = None) -> Dict:
+        """Generation options sent to Ollama (num_predict caps output tokens)"""
+        return {"num_predict": self.max_tokens, **(options or {})}
+
+    async def stream(self, prompt: str, options: Optional[Dict] = None, model: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield response tokens; raises LLMUnavailable on errors and timeouts"""
+        payload = {
+            "model": model or self.model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": self.keep_alive,
+            "options": self.options(options),
+        }
+        max_chars = payload["options"]["num_predict"] * MAX_CHARS_PER_TOKEN
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        produced = 0
+
+        request = self.client.build_request("POST", "/api/generate", json=payload)
+        try:
+            # Ollama sends headers with the first chunk, so this is first-token time too
+            try:
+                response = await asyncio.wait_for(
+                    self.client.send(request, stream=True),
+                    min(self.first_token_timeout, self.timeout)
+                )
+            except asyncio.TimeoutError:
+                raise LLMUnavailable("Ollama first token timed out")
+
+            try:
+                if response.status_code != 200:
+                    body = (await response.aread()).decode(errors="replace")
+                    raise LLMUnavailable(f"Ollama returned {response.status_code}: {body[:200]}")
+
+                lines = response.aiter_lines()
+                while True:
+                    remaining = deadline - loop.time()
+                    if produced == 0:
+                        remaining = min(remaining, self.first_token_timeout)
+                    if remaining <= 0:
+                        raise LLMUnavailable("Generation timed out")
+                    try:
+                        line = await asyncio.wait_for(lines.__anext__(), remaining)
+                    except StopAsyncIteration:
+                        break
+                    except asyncio.TimeoutError:
+                        stage = "first token" if produced == 0 else "generation"
+                        raise LLMUnavailable(f"Ollama {stage} timed out")
+                    if not line.strip():
+                        continue
+
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise LLMUnavailable(f"Ollama error: {chunk['error']}")
+                    token = chunk.get("response", "")
+                    if token:
+                        if produced + len(token) >= max_chars:
+                            yield token[:max_chars - produced]
+                            break
+                        produced += len(token)
+                        yield token
+                    if chunk.get("done"):
+                        break
+            finally:
+                await response.aclose()  # Closing early stops generation server-side
+        except httpx.TimeoutException as e:
+            stage = "first token" if produced == 0 else "generation"
+            raise LLMUnavailable(f"Ollama {stage} timed out") from e
+        except httpx.HTTPError as e:
+            raise LLMUnavailable(f"Ollama request failed: {e!r}") from e
+        except json.JSONDecodeError as e:
+            raise LLMUnavailable(f"Malformed Ollama response: {e}") from e
+
+    async def generate(self, prompt: str, options: Optional[Dict] = None, model: Optional[str] = None) -> str:
+        """Whole response text (still streamed, so the deadlines apply)"""
+        return "".join([token async for token in self.stream(prompt, options, model)])
+
+ollama = OllamaClient(
+    base_url=config.OLLAMA_BASE_URL,
+    model=config.OLLAMA_MODEL,
+    keep_alive=config.OLLAMA_KEEP_ALIVE,
+    max_tokens=config.OLLAMA_MAX_TOKENS,
+    first_token_timeout=config.OLLAMA_FIRST_TOKEN_TIMEOUT_SECONDS,
+    timeout=config.OLLAMA_TIMEOUT_SECONDS,
+    max_connections=config.OLLAMA_MAX_CONNECTIONS
+)
@@ -0,0 +1,284 @@
+# LLM request scheduler
+# One Ollama instance only runs a few generations at once, so requests go
+# through a priority queue (interactive before bulk) drained by a fixed
+# number of workers. Identical requests (same model, prompt and options)
+# share one generation whose tokens are streamed to every caller, and
+# completed results go to the persistent llm_results cache.
+
+from app.config import config
+from app.database import llm_cache
+from app.database.database import AsyncSessionLocal
+from app.generation.llm import LLMUnavailable, OllamaClient, ollama
+from collections import deque
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+import asyncio
+import itertools
+
+INTERACTIVE = 0
+BULK = 10
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+WAIT_SAMPLES = 1000  # Recent queue waits kept for percentiles
+
+@dataclass
+class LLMRequest:
+    key: str
+    prompt: str
+    model: str
+    options: Dict
+    priority: int
+    enqueued_at: float
+    started_at: Optional[float] = None
+    finished: bool = False
+    cancelled: bool = False
+    tokens: List[str] = field(default_factory=list)  # Replayed to callers that join late
+    listeners: List[asyncio.Queue] = field(default_factory=list)
+    task: Optional[asyncio.Task] = None
+
+class LLMScheduler:
+    """Bounded-concurrency, prioritised, coalescing front for OllamaClient"""
+
+    def __init__(
+        self,
+        client: OllamaClient,
+        concurrency: int = 1,
+        queue_size: int = 100,
+        queue_timeout: float = 30.0,
+        cache: bool = True
+    ):
+        self.client = client
+        self.concurrency = max(1, concurrency)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.cache = cache
+        self.inflight: Dict[str, LLMRequest] = {}  # Queued or running, by cache key
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._sequence = itertools.count()  # FIFO within a priority
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self.counters = dict.fromkeys(
+            ("completed", "failed", "cancelled", "rejected", "queue_timeouts", "coalesced", "cache_hits", "cache_misses"), 0
+        )
+        self.wait_count = 0
+        self.wait_total = 0.0
+
+    @property
+    def model(self) -> str:
+        return self.client.model
+
+    def options(self, options: Optional[Dict] = None) -> Dict:
+        return self.client.options(options)
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.PriorityQueue()  # Depth capped in stream(); stale entries don't count
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        for request in list(self.inflight.values()):
+            if request.task:
+                request.task.cancel()
+            self._finish(request, ("error", LLMUnavailable("LLM scheduler stopped")))
+        self._workers = []
+        self._queue = None
+
+    async def stream(
+        self,
+        prompt: str,
+        options: Optional[Dict] = None,
+        model: Optional[str] = None,
+        priority: int = INTERACTIVE
+    ) -> AsyncIterator[str]:
+        """
+        Yield tokens for prompt: from the cache, from an identical request
+        already queued or running, or from a new queued generation. Raises
+        LLMUnavailable when the queue is full, the wait exceeds
+        queue_timeout, or generation fails.
+        """
+        model = model or self.client.model
+        options = self.client.options(options)
+        key = llm_cache.cache_key(model, prompt, options)
+
+        if self.cache:
+            cached = await self._cached(key)
+            if cached is not None:
+                self.counters["cache_hits"] += 1
+                yield cached
+                return
+            self.counters["cache_misses"] += 1
+
+        if not self.running:
+            raise LLMUnavailable("LLM scheduler not started")
+
+        loop = asyncio.get_running_loop()
+        request = self.inflight.get(key)
+        if request is None:
+            if self.queue_depth() >= self.queue_size:
+                self.counters["rejected"] += 1
+                raise LLMUnavailable(f"LLM queue is full ({self.queue_size} requests)")
+            request = LLMRequest(key, prompt, model, options, priority, enqueued_at=loop.time())
+            self.inflight[key] = request
+            self._queue.put_nowait((priority, next(self._sequence), request))
+        else:
+            self.counters["coalesced"] += 1
+            if priority < request.priority and request.started_at is None:
+                # Promote; the worker skips the stale lower-priority entry
+                request.priority = priority
+                self._queue.put_nowait((priority, next(self._sequence), request))
+
+        listener: asyncio.Queue = asyncio.Queue()
+        for token in request.tokens:
+            listener.put_nowait(("token", token))
+        request.listeners.append(listener)
+        joined_at = loop.time()
+        try:
+            while True:
+                timeout = None
+                if request.started_at is None:
+                    timeout = max(0.0, joined_at + self.queue_timeout - loop.time())
+                try:
+                    kind, value = await asyncio.wait_for(listener.get(), timeout)
+                except asyncio.TimeoutError:
+                    if request.started_at is not None:
+                        continue
+                    self.counters["queue_timeouts"] += 1
+                    raise LLMUnavailable(f"Waited over {self.queue_timeout:g}s in the LLM queue")
+                if kind == "token":
+                    yield value
+                elif kind == "error":
+                    raise LLMUnavailable(str(value))
+                else:
+                    return
+        finally:
+            request.listeners.remove(listener)
+            if not request.listeners and not request.finished:
+                self._abandon(request)
+
+    async def generate(self, prompt: str, options: Optional[Dict] = None, model: Optional[str] = None, priority: int = INTERACTIVE) -> str:
+        return "".join([token async for token in self.stream(prompt, options, model, priority)])
+
+    def queue_depth(self) -> int:
+        return sum(1 for request in self.inflight.values() if request.started_at is None)
+
+    def stats(self) -> Dict:
+        waiting: Dict[str, int] = {name: 0 for name in PRIORITY_NAMES.values()}
+        running = 0
+        for request in self.inflight.values():
+            if request.started_at is None:
+                name = PRIORITY_NAMES.get(request.priority, str(request.priority))
+                waiting[name] = waiting.get(name, 0) + 1
+            else:
+                running += 1
+        waits = sorted(self._waits)
+        return {
+            "model": self.client.model,
+            "concurrency": self.concurrency,
+            "queue_depth": sum(waiting.values()),
+            "queue_depth_by_priority": waiting,
+            "running": running,
+            **self.counters,
+            "wait_seconds": {
+                "count": self.wait_count,
+                "mean": round(self.wait_total / self.wait_count, 4) if self.wait_count else 0.0,
+                "p50": round(waits[len(waits) // 2], 4) if waits else 0.0,
+                "p95": round(waits[int(len(waits) * 0.95)], 4) if waits else 0.0,
+                "max": round(waits[-1], 4) if waits else 0.0,
+            },
+        }
+
+    # ============ Workers ============
+
+    async def _work(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, request = await self._queue.get()
+            if request.cancelled or request.started_at is not None:
+                continue  # Abandoned, or a stale entry left by a promotion
+            request.started_at = loop.time()
+            wait = request.started_at - request.enqueued_at
+            self._waits.append(wait)
+            self.wait_count += 1
+            self.wait_total += wait
+            request.task = asyncio.create_task(self._generate(request))
+            try:
+                await asyncio.wait([request.task])
+            except asyncio.CancelledError:
+                request.task.cancel()
+                raise
+
+    async def _generate(self, request: LLMRequest):
+        try:
+            async for token in self.client.stream(request.prompt, request.options, request.model):
+                request.tokens.append(token)
+                self._publish(request, ("token", token))
+            text = "".join(request.tokens)
+            if self.cache and text.strip():
+                await self._store(request, text)
+            self.counters["completed"] += 1
+            self._finish(request, ("done", None))
+        except asyncio.CancelledError:
+            self.counters["cancelled"] += 1
+            self._finish(request, ("error", LLMUnavailable("Generation cancelled")))
+            raise
+        except Exception as e:
+            self.counters["failed"] += 1
+            self._finish(request, ("error", e))
+
+    @staticmethod
+    def _publish(request: LLMRequest, event):
+        for listener in request.listeners:
+            listener.put_nowait(event)
+
+    def _finish(self, request: LLMRequest, event):
+        if request.finished:
+            return
+        request.finished = True
+        if self.inflight.get(request.key) is request:
+            del self.inflight[request.key]
+        self._publish(request, event)
+
+    def _abandon(self, request: LLMRequest):
+        """Every caller left: drop the request, or stop its generation"""
+        request.cancelled = True
+        if request.task and not request.task.done():
+            request.task.cancel()
+        else:
+            self._finish(request, ("error", LLMUnavailable("Generation cancelled")))
+
+    # ============ Cache ============
+
+    async def _cached(self, key: str) -> Optional[str]:
+        try:
+            async with AsyncSessionLocal() as db:
+                entry = await llm_cache.lookup(db, key)
+                if entry is None:
+                    return None
+                await db.commit()
+                return entry.response
+        except Exception as e:
+            print(f"LLM cache lookup failed: {e}")
+            return None
+
+    async def _store(self, request: LLMRequest, text: str):
+        try:
+            async with AsyncSessionLocal() as db:
+                await llm_cache.store(db, request.key, request.model, request.prompt, request.options, text)
+                await db.commit()
+        except Exception as e:
+            print(f"LLM cache store failed: {e}")
+
+llm_scheduler = LLMScheduler(
+    ollama,
+    concurrency=config.LLM_CONCURRENCY,
+    queue_size=config.LLM_QUEUE_SIZE,
+    queue_timeout=config.LLM_QUEUE_TIMEOUT_SECONDS,
+    cache=config.LLM_RESULT_CACHE
+)
@@ -0,0 +1,222 @@
+# PDF rendering service
+# WeasyPrint renders are CPU-bound and slow on first use (font and CSS
+# setup), so they run in a pool of pre-warmed worker processes instead of on
+# the event loop. Jobs go through a bounded queue; a fixed number of
+# dispatchers caps concurrent renders, and each job has a timeout.
+
+from app.config import config
+from app import instrumentation
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import asyncio
+import inspect
+import signal
+import time
+import uuid
+
+WARMUP_HTML = """<!DOCTYPE html><html><head><style>
+body { font-family: Arial, sans-serif; font-size: 11pt; } h1 { font-weight: bold; }
+</style></head><body><h1>Warmup</h1><p>Loads fonts &amp; CSS once per worker.</p></body></html>"""
+
+class RenderQueueFull(Exception):
+    """Raised by submit() when the queue is at RENDER_QUEUE_SIZE"""
+
+@dataclass
+class RenderJob:
+    id: str
+    html: str
+    output_path: str
+    status: str = "queued"  # queued, running, done, failed, timeout
+    result_path: Optional[str] = None  # output_path, or the HTML fallback
+    fallback: bool = False  # PDF failed and HTML was written instead
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+    done: Optional[asyncio.Event] = None
+    on_done: Optional[Callable] = None  # Called (or awaited) with the job once finished
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "timeout")
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "fallback": self.fallback,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+# ============ Worker process ============
+
+def _on_timeout(signum, frame):
+    raise TimeoutError("Render timed out")
+
+def _warm_worker():
+    """Pool initializer: import WeasyPrint and render once so fonts/CSS are loaded"""
+    try:
+        from weasyprint import HTML
+        HTML(string=WARMUP_HTML).write_pdf()
+    except Exception as e:
+        # Jobs will report the same error and fall back to HTML
+        print(f"PDF worker warmup failed: {e}")
+
+def render_pdf(html: str, output_path: str, timeout: float) -> str:
+    """Process-pool task: HTML string -> PDF file"""
+    use_alarm = timeout > 0 and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        from weasyprint import HTML
+        HTML(string=html).write_pdf(output_path)
+        return output_path
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+# ============ Service ============
+
+class RenderService:
+    """Queue + dispatchers in the event loop, renders in worker processes"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        queue_size: int = 100,
+        timeout: float = 60.0,
+        job_ttl: float = 3600.0,
+        render: Callable[[str, str, float], str] = render_pdf
+    ):
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.job_ttl = job_ttl
+        self.render = render
+        self.jobs: Dict[str, RenderJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._dispatchers = []
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    async def start(self):
+        """Spawn and warm the worker processes, then start dispatching"""
+        if self.running:
+            return
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # First submit starts the workers; the initializer warms each one
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._pool, time.sleep, 0)
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._dispatchers:
+            task.cancel()
+        self._dispatchers = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def submit(self, html: str, output_path: str, on_done: Optional[Callable] = None) -> RenderJob:
+        """Queue a render; raises RenderQueueFull when saturated"""
+        if not self.running:
+            raise RuntimeError("Render service not started")
+        self._prune()
+        job = RenderJob(id=str(uuid.uuid4()), html=html, output_path=output_path, done=asyncio.Event(), on_done=on_done)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise RenderQueueFull(f"Render queue is full ({self.queue_size} jobs)")
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[RenderJob]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job: RenderJob, timeout: Optional[float] = None) -> RenderJob:
+        """Block until the job finishes or timeout elapses (job may still be pending)"""
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    def stats(self) -> Dict:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self.workers, "queued": self._queue.qsize() if self._queue else 0, "jobs": counts}
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            instrumentation.STAGE_SECONDS.observe((datetime.utcnow() - job.created_at).total_seconds(), stage="pdf_queue_wait")
+            try:
+                with instrumentation.timer("pdf_render"):
+                    future = loop.run_in_executor(self._pool, self.render, job.html, job.output_path, self.timeout)
+                    # Grace period over the in-worker timer
+                    job.result_path = await asyncio.wait_for(future, self.timeout + 5 if self.timeout > 0 else None)
+                job.status = "done"
+            except (asyncio.TimeoutError, TimeoutError):
+                job.status = "timeout"
+                job.error = f"Render exceeded {self.timeout:g}s"
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+
+            if job.status != "done":
+                self._write_fallback(job)
+            job.finished_at = datetime.utcnow()
+            job.html = ""  # Release the document once rendered
+            if job.on_done:
+                try:
+                    result = job.on_done(job)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    print(f"Render callback failed: {e}")
+            job.done.set()
+            self._queue.task_done()
+
+    @staticmethod
+    def _write_fallback(job: RenderJob):
+        """PDF unavailable: serve the HTML instead, as generation always has"""
+        print(f"PDF generation failed, falling back to HTML: {job.error}")
+        fallback_path = job.output_path.rsplit(".", 1)[0] + ".html"
+        try:
+            with open(fallback_path, "w", encoding="utf-8") as f:
+                f.write(job.html)
+            job.result_path = fallback_path
+            job.fallback = True
+            job.status = "done"
+        except OSError as e:
+            job.error = f"{job.error}; HTML fallback failed: {e}"
+
+    def _prune(self):
+        """Forget finished jobs older than job_ttl"""
+        cutoff = datetime.utcnow().timestamp() - self.job_ttl
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished and job.finished_at.timestamp() < cutoff
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+renderer = RenderService(
+    workers=config.RENDER_WORKERS,
+    queue_size=config.RENDER_QUEUE_SIZE,
+    timeout=config.RENDER_TIMEOUT_SECONDS,
+    job_ttl=config.RENDER_JOB_TTL_SECONDS
+)
@@ -0,0 +1,260 @@
+# Document generation service
+# One path for single and bulk generation: content-addressed cache lookup,
+# then render (PDFs through the worker pool, coalescing identical in-flight
+# requests) and record the result in GeneratedDocument.
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app import instrumentation
+from app.database.database import AsyncSessionLocal
+from app.database.models import GeneratedDocument
+from app.generation import documents
+from app.generation.cover_letter import CoverLetterGenerator
+from app.generation.llm import LLMUnavailable
+from app.generation.llm_scheduler import INTERACTIVE, LLMScheduler
+from app.generation.render_pool import RenderJob, RenderService
+from app.generation.resume_tailor import ResumeTailor
+from app.generation.templating import DEFAULT_RESUME_TEMPLATE, template_digest
+from app.resume.models import ResumeData
+from dataclasses import dataclass
+from datetime import datetime
+from functools import partial
+from typing import Awaitable, Callable, Dict, Optional
+import anyio
+import os
+
+@dataclass
+class GenerationResult:
+    doc_type: str  # resume, cover_letter
+    document: Optional[GeneratedDocument] = None  # Set once the file exists and is recorded
+    job: Optional[RenderJob] = None  # PDF render still pending, or finished with an HTML fallback
+    cached: bool = False
+    content: Optional[str] = None  # Cover letter text
+    source: Optional[str] = None  # Cover letters: template or llm
+    fallback: bool = False  # LLM requested but the template was used
+    error: Optional[str] = None
+
+    @property
+    def file_path(self) -> Optional[str]:
+        if self.document:
+            return self.document.file_path
+        if self.job and self.job.status == "done":
+            return self.job.result_path
+        return None
+
+    @property
+    def download_url(self) -> Optional[str]:
+        return f"/api/downloads/{os.path.basename(self.file_path)}" if self.file_path else None
+
+class DocumentGenerator:
+    """Cache-aware resume and cover letter generation"""
+
+    def __init__(self, tailor: ResumeTailor, letter_gen: CoverLetterGenerator, renderer: RenderService, llm: Optional[LLMScheduler] = None):
+        self.tailor = tailor
+        self.letter_gen = letter_gen
+        self.renderer = renderer
+        self.llm = llm
+        self.rendering: Dict[str, RenderJob] = {}  # In-flight renders by document key
+
+    async def resume(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        resume: ResumeData,
+        job_title: str,
+        template: str = DEFAULT_RESUME_TEMPLATE,
+        output_format: str = "pdf",
+        wait: bool = True,
+        job_id: Optional[str] = None
+    ) -> GenerationResult:
+        """
+        Tailored resume for job_title. PDF renders go through the worker pool
+        (RenderQueueFull propagates); with wait=False a pending job is returned.
+        """
+        extension = "pdf" if output_format == "pdf" else "docx"
+        key = documents.document_key(
+            "resume",
+            resume.model_dump(),
+            job_title=job_title,
+            template=template,
+            template_digest=template_digest(template),
+            output_format=extension
+        )
+        existing = await documents.find_document(db, key)
+        if existing and existing.output_format == extension:
+            return GenerationResult("resume", document=existing, cached=True)
+        # An HTML fallback is recorded (so it stays downloadable) but the PDF is retried
+
+        os.makedirs(config.GENERATED_DOCS_DIR, exist_ok=True)
+        output_path = documents.document_path(key, extension)
+        file_name = documents.display_name(
+            resume.full_name, "resume", job_title,
+            template if template != DEFAULT_RESUME_TEMPLATE else "",
+            extension=extension
+        )
+
+        inputs = {
+            "resume": resume.model_dump(mode="json"),
+            "job_title": job_title,
+            "template": template,
+            "output_format": extension,
+        }
+
+        if extension == "docx":
+            # Building and saving the document is blocking work: a worker thread
+            # (anyio copies the request context, so docx_build still reaches Server-Timing)
+            await anyio.to_thread.run_sync(
+                partial(self.tailor.generate_resume_docx, resume, output_path, job_title, template)
+            )
+            document = await documents.record_document(
+                db, key, user_id, "resume", output_path, file_name,
+                template=template, output_format=extension, job_id=job_id, inputs=inputs
+            )
+            return GenerationResult("resume", document=document)
+
+        job = self.rendering.get(key)
+        if job is None:
+            html = self.tailor.generate_resume_html(resume, job_title, template)
+            job = self.renderer.submit(
+                html, output_path,
+                on_done=self._record_rendered(key, user_id, file_name, template, job_id, inputs)
+            )
+            self.rendering[key] = job
+
+        if wait:
+            with instrumentation.timer("pdf_wait"):
+                await self.renderer.wait(job, config.RENDER_TIMEOUT_SECONDS + 10)
+        if not job.finished or job.fallback:
+            return GenerationResult("resume", job=job)
+        if job.status != "done":
+            return GenerationResult("resume", job=job, error=job.error)
+
+        document = await documents.find_document(db, key)
+        if document is None:
+            return GenerationResult("resume", job=job)
+        return GenerationResult("resume", document=document)
+
+    def _record_rendered(self, key: str, user_id: str, file_name: str, template: str, job_id: Optional[str], inputs: Dict):
+        """
+        Render-job callback: record the PDF once it exists. An HTML fallback
+        is recorded as output_format "html" so downloads and the orphan
+        sweep know it; a later request renders the PDF again and replaces it.
+        """
+        async def on_done(job: RenderJob):
+            self.rendering.pop(key, None)
+            if job.status == "done":
+                output_format = "html" if job.fallback else "pdf"
+                async with AsyncSessionLocal() as db:
+                    await documents.record_document(
+                        db, key, user_id, "resume", job.result_path,
+                        os.path.splitext(file_name)[0] + f".{output_format}",
+                        template=template, output_format=output_format, job_id=job_id, inputs=inputs
+                    )
+        return on_done
+
+    async def cover_letter(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        resume: ResumeData,
+        job_title: str,
+        company_name: str,
+        job_description: str = "",
+        job_id: Optional[str] = None,
+        mode: Optional[str] = None,
+        on_token: Optional[Callable[[str], Awaitable]] = None,
+        priority: int = INTERACTIVE
+    ) -> GenerationResult:
+        """
+        Cover letter text file; identical inputs on the same day hit the cache.
+        mode="llm" has the local model write it (scheduled at priority),
+        passing tokens to on_token as they arrive, and falls back to the
+        template if the model is busy, fails or times out.
+        """
+        mode = mode or config.COVER_LETTER_MODE
+        if mode == "llm" and self.llm is None:
+            mode = "template"
+        key_inputs = dict(
+            job_title=job_title,
+            company_name=company_name,
+            job_description=job_description,
+            date=datetime.now().date()  # The letter is dated
+        )
+        if mode == "llm":
+            key_inputs.update(mode=mode, model=self.llm.model, options=self.llm.options())
+        key = documents.document_key("cover_letter", resume.model_dump(), **key_inputs)
+        existing = await documents.find_document(db, key)
+        if existing:
+            with open(existing.file_path, encoding="utf-8") as f:
+                content = f.read()
+            return GenerationResult("cover_letter", document=existing, cached=True, content=content, source=mode)
+
+        if mode == "llm":
+            try:
+                content = await self._write_letter(resume, job_title, company_name, job_description, on_token, priority)
+            except LLMUnavailable as e:
+                print(f"LLM cover letter failed, using template: {e}")
+                result = await self.cover_letter(db, user_id, resume, job_title, company_name, job_description, job_id, mode="template")
+                result.fallback = True
+                return result
+        else:
+            content = self.letter_gen.generate(resume, job_title, company_name, job_description)
+
+        os.makedirs(config.GENERATED_DOCS_DIR, exist_ok=True)
+        output_path = documents.document_path(key, "txt")
+        self.letter_gen.save_to_file(content, output_path)
+        document = await documents.record_document(
+            db, key, user_id, "cover_letter", output_path,
+            documents.display_name(resume.full_name, "cover_letter", company_name, extension="txt"),
+            output_format="txt", job_id=job_id,
+            inputs={
+                "resume": resume.model_dump(mode="json"),
+                "job_title": job_title,
+                "company_name": company_name,
+                "job_description": job_description,
+                "mode": mode,
+            }
+        )
+        return GenerationResult("cover_letter", document=document, content=content, source=mode)
+
+    @instrumentation.timed("llm_generate")
+    async def _write_letter(
+        self,
+        resume: ResumeData,
+        job_title: str,
+        company_name: str,
+        job_description: str,
+        on_token: Optional[Callable[[str], Awaitable]],
+        priority: int
+    ) -> str:
+        prompt = self.letter_gen.build_prompt(resume, job_title, company_name, job_description)
+        parts = []
+        async for token in self.llm.stream(prompt, priority=priority):
+            parts.append(token)
+            if on_token:
+                await on_token(token)
+        content = "".join(parts).strip()
+        if not content:
+            raise LLMUnavailable("Empty response")
+        return content
+
+    async def regenerate(self, db: AsyncSession, document: GeneratedDocument) -> Optional[GenerationResult]:
+        """
+        Generate an evicted document again from its recorded inputs (waiting
+        for PDF renders). The result may land under a different file name if
+        the template or date changed since. None when no inputs were recorded.
+        """
+        inputs = document.generation_inputs
+        if not inputs:
+            return None
+        resume = ResumeData(**inputs["resume"])
+        if document.doc_type == "cover_letter":
+            return await self.cover_letter(
+                db, document.user_id, resume, inputs["job_title"], inputs["company_name"],
+                inputs.get("job_description", ""), job_id=document.job_id, mode=inputs.get("mode")
+            )
+        return await self.resume(
+            db, document.user_id, resume, inputs["job_title"],
+            template=inputs["template"], output_format=inputs["output_format"],
+            wait=True, job_id=document.job_id
+        )
@@ -0,0 +1,180 @@
+# Generated document storage - byte quota for GENERATED_DOCS_DIR
+# Usage is tracked as documents are recorded and re-measured by a periodic
+# sweep. Over quota, the least recently accessed documents (per
+# GeneratedDocument.last_accessed_at) lose their files down to the low
+# watermark; rows are kept with evicted_at set so a later request
+# regenerates the file. The sweep also removes files no row refers to.
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import config
+from app.database.database import AsyncSessionLocal
+from app.database.models import GeneratedDocument
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+import asyncio
+import os
+import time
+
+# Evict down to this fraction of the quota so every write doesn't trigger a sweep
+LOW_WATERMARK = 0.9
+
+# last_accessed_at is only rewritten when older than this
+TOUCH_INTERVAL = timedelta(seconds=60)
+
+EVICTION_BATCH = 200
+
+def _stem(file_name: str) -> str:
+    """Document key of a stored file: <key>.pdf, <key>.html, <key>.txt.gz ..."""
+    return file_name.split(".", 1)[0]
+
+class DocumentStorage:
+    """Quota enforcement, LRU eviction and orphan cleanup for generated files"""
+
+    def __init__(self, directory: str, quota_bytes: int, sweep_interval: float = 600.0, orphan_grace: float = 3600.0):
+        self.directory = directory
+        self.quota_bytes = quota_bytes  # 0: unlimited
+        self.sweep_interval = sweep_interval
+        self.orphan_grace = orphan_grace
+        self.used_bytes = 0
+        self.evicted = 0
+        self.orphans_removed = 0
+        self._sweeper: Optional[asyncio.Task] = None
+        self._sweeping: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Measure the directory and start the periodic sweep"""
+        os.makedirs(self.directory, exist_ok=True)
+        await self.sweep()
+        if self.sweep_interval > 0:
+            self._sweeper = asyncio.create_task(self._sweep_periodically())
+
+    async def stop(self):
+        for task in (self._sweeper, self._sweeping):
+            if task:
+                task.cancel()
+        self._sweeper = self._sweeping = None
+
+    def added(self, size: int):
+        """size more bytes on disk (a rewrite passes the difference); sweep in the background once over quota"""
+        self.used_bytes += size
+        if self.quota_bytes and self.used_bytes > self.quota_bytes and not (self._sweeping and not self._sweeping.done()):
+            self._sweeping = asyncio.create_task(self.sweep())
+
+    def discard(self, path: str):
+        """Delete a file (and its compressed variants) its document no longer refers to"""
+        for variant in (path, path + ".gz", path + ".br"):
+            try:
+                size = os.path.getsize(variant)
+            except OSError:
+                continue
+            self._remove(variant)
+            self.used_bytes -= size
+
+    async def touch(self, db: AsyncSession, document: GeneratedDocument):
+        """Record an access (cache hit or download) for LRU ordering"""
+        now = datetime.utcnow()
+        if document.last_accessed_at and now - document.last_accessed_at < TOUCH_INTERVAL:
+            return
+        document.last_accessed_at = now
+        await db.commit()
+
+    def stats(self) -> Dict:
+        return {
+            "used_bytes": self.used_bytes,
+            "quota_bytes": self.quota_bytes,
+            "evicted": self.evicted,
+            "orphans_removed": self.orphans_removed,
+        }
+
+    async def sweep(self):
+        """Remove orphans, re-measure usage and evict down to the low watermark"""
+        try:
+            async with AsyncSessionLocal() as db:
+                await self.remove_orphans(db)
+                self.used_bytes = self._disk_usage()
+                if self.quota_bytes and self.used_bytes > self.quota_bytes:
+                    await self.evict(db, int(self.quota_bytes * LOW_WATERMARK))
+        except Exception as e:
+            print(f"Document storage sweep failed: {e}")
+
+    async def evict(self, db: AsyncSession, target_bytes: int) -> int:
+        """Delete files of least recently accessed documents until usage <= target_bytes"""
+        files = self._files_by_stem()
+        evicted = 0
+        while self.used_bytes > target_bytes:
+            candidates = (await db.scalars(
+                select(GeneratedDocument)
+                .where(GeneratedDocument.evicted_at.is_(None))
+                .order_by(func.coalesce(GeneratedDocument.last_accessed_at, GeneratedDocument.created_at))
+                .limit(EVICTION_BATCH)
+            )).all()
+            if not candidates:
+                break
+            now = datetime.utcnow()
+            for document in candidates:
+                if self.used_bytes <= target_bytes:
+                    break
+                for name, size in files.pop(document.content_hash, {}).items():
+                    self._remove(os.path.join(self.directory, name))
+                    self.used_bytes -= size
+                document.evicted_at = now
+                evicted += 1
+            await db.commit()
+        self.evicted += evicted
+        if evicted:
+            print(f"Evicted {evicted} generated documents ({self.used_bytes} of {self.quota_bytes} bytes used)")
+        return evicted
+
+    async def remove_orphans(self, db: AsyncSession) -> int:
+        """Delete files older than the grace period that no document row refers to"""
+        known = set(await db.scalars(select(GeneratedDocument.content_hash)))
+        cutoff = time.time() - self.orphan_grace  # In-flight renders and fallbacks still being polled
+        removed = 0
+        for stem, names in self._files_by_stem().items():
+            if stem in known:
+                continue
+            for name in names:
+                path = os.path.join(self.directory, name)
+                try:
+                    if os.stat(path).st_mtime < cutoff:
+                        self._remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+        self.orphans_removed += removed
+        return removed
+
+    def _files_by_stem(self) -> Dict[str, Dict[str, int]]:
+        """Regular files in the directory as {key: {name: size}}"""
+        files: Dict[str, Dict[str, int]] = {}
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        files.setdefault(_stem(entry.name), {})[entry.name] = entry.stat().st_size
+        except FileNotFoundError:
+            pass
+        return files
+
+    def _disk_usage(self) -> int:
+        return sum(size for names in self._files_by_stem().values() for size in names.values())
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def _sweep_periodically(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            await self.sweep()
+
+storage = DocumentStorage(
+    directory=config.GENERATED_DOCS_DIR,
+    quota_bytes=int(config.GENERATED_DOCS_QUOTA_MB * 1024 * 1024),
+    sweep_interval=config.STORAGE_SWEEP_INTERVAL_SECONDS,
+    orphan_grace=config.STORAGE_ORPHAN_GRACE_SECONDS
+)
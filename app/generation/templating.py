@@ -0,0 +1,78 @@
+# Shared Jinja2 environment for generated documents
+# Templates are loaded from app/generation/templates, compiled once per
+# process (Environment cache) and, across restarts, loaded from an on-disk
+# bytecode cache. Autoescaping is on for .html templates since they embed
+# text taken from uploaded resumes.
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+from app.config import config
+from typing import Optional
+import functools
+import hashlib
+import os
+import threading
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+# Public template name -> file in TEMPLATE_DIR
+RESUME_TEMPLATES = {
+    "ats": "resume_ats.html",
+    "compact": "resume_compact.html",
+    "two-column": "resume_two_column.html",
+}
+
+DEFAULT_RESUME_TEMPLATE = "ats"
+
+_environment: Optional[Environment] = None
+_lock = threading.Lock()
+
+def create_environment(use_bytecode_cache: Optional[bool] = None, auto_reload: Optional[bool] = None) -> Environment:
+    """New environment; most callers want the shared get_environment()"""
+    if use_bytecode_cache is None:
+        use_bytecode_cache = config.TEMPLATE_BYTECODE_CACHE
+    bytecode_cache = None
+    if use_bytecode_cache:
+        cache_dir = config.TEMPLATE_BYTECODE_CACHE_DIR or None  # None: per-user temp directory
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(["html", "xml"]),
+        bytecode_cache=bytecode_cache,
+        # Without auto_reload a compiled template is reused without stat()ing its file
+        auto_reload=config.TEMPLATE_AUTO_RELOAD if auto_reload is None else auto_reload,
+        cache_size=100,
+    )
+
+def get_environment() -> Environment:
+    """Process-wide environment, created on first use"""
+    global _environment
+    with _lock:
+        if _environment is None:
+            _environment = create_environment()
+        return _environment
+
+def resume_template_names():
+    return list(RESUME_TEMPLATES)
+
+def get_resume_template(name: Optional[str] = None) -> Template:
+    """Compiled resume template by public name; ValueError if unknown"""
+    name = name or DEFAULT_RESUME_TEMPLATE
+    if name not in RESUME_TEMPLATES:
+        raise ValueError(f"Unknown template '{name}'. Available: {', '.join(RESUME_TEMPLATES)}")
+    return get_environment().get_template(RESUME_TEMPLATES[name])
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path: str, mtime: float) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+def template_digest(name: Optional[str] = None) -> str:
+    """Short hash of a resume template's source, so edits invalidate cached documents"""
+    name = name or DEFAULT_RESUME_TEMPLATE
+    if name not in RESUME_TEMPLATES:
+        raise ValueError(f"Unknown template '{name}'. Available: {', '.join(RESUME_TEMPLATES)}")
+    path = os.path.join(TEMPLATE_DIR, RESUME_TEMPLATES[name])
+    return _file_digest(path, os.path.getmtime(path))
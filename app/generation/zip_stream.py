@@ -0,0 +1,89 @@
+# Streaming zip archives
+# zipfile writes to a non-seekable sink using data descriptors, so entries
+# can be sent to the client as each document completes. Only the current
+# chunk is held in memory, never the whole archive.
+
+from typing import AsyncIterator, Iterable, List
+import asyncio
+import json
+import zipfile
+
+CHUNK_SIZE = 64 * 1024
+
+# Already-compressed formats are stored as-is
+STORED_EXTENSIONS = (".pdf", ".docx", ".zip", ".png", ".jpg")
+
+class _Sink:
+    """Write-only file object that buffers until drained"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def _unique_name(name: str, used: set) -> str:
+    if name not in used:
+        used.add(name)
+        return name
+    stem, dot, extension = name.rpartition(".")
+    if not dot:
+        stem, extension = name, ""
+    counter = 2
+    while True:
+        candidate = f"{stem}_{counter}.{extension}" if extension else f"{stem}_{counter}"
+        if candidate not in used:
+            used.add(candidate)
+            return candidate
+        counter += 1
+
+async def stream_zip(tasks: Iterable[asyncio.Future], results: list) -> AsyncIterator[bytes]:
+    """
+    Zip the files produced by tasks, in completion order.
+    Each task resolves to a dict with file_path and file_name (or error);
+    every dict is appended to results and written as manifest.json at the end.
+    """
+    sink = _Sink()
+    archive = zipfile.ZipFile(sink, mode="w", allowZip64=True)
+    used_names = set()
+
+    for next_done in asyncio.as_completed(list(tasks)):
+        entry = await next_done
+        results.append(entry)
+        if entry.get("error"):
+            continue
+
+        arcname = _unique_name(entry["file_name"], used_names)
+        entry["archive_name"] = arcname
+        compression = zipfile.ZIP_STORED if arcname.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+        info = zipfile.ZipInfo(arcname)
+        info.compress_type = compression
+        try:
+            with open(entry["file_path"], "rb") as source, archive.open(info, mode="w", force_zip64=True) as target:
+                while True:
+                    chunk = source.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    target.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+        except OSError as e:
+            entry["error"] = str(e)
+        data = sink.drain()
+        if data:
+            yield data
+
+    manifest = [{k: v for k, v in entry.items() if k != "file_path"} for entry in results]
+    archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    archive.close()
+    yield sink.drain()
@@ -0,0 +1,320 @@
+# Lightweight instrumentation - counters, histograms and stage timers
+# Metrics live in process memory and are rendered in the Prometheus text
+# format at /metrics. Stage timers also accumulate into the current
+# request's Server-Timing header (via a context variable set by
+# InstrumentationMiddleware). With METRICS_ENABLED=false, timer() hands out
+# a shared no-op context manager and counters return immediately.
+
+from app.config import config
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional, Tuple
+import inspect
+import os
+import threading
+import time
+
+enabled = config.METRICS_ENABLED
+
+# Seconds; covers sub-millisecond template renders up to slow scrapes
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+INF_BUCKET = 'le="+Inf"'
+
+# Stage -> accumulated seconds for the request being handled, if any
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+# ============ Metric types ============
+
+def _label_key(labelnames: Tuple[str, ...], labels: Dict[str, str]) -> Tuple[str, ...]:
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labelnames: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        if not enabled:
+            return
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for key, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        if enabled:
+            self.observe_key(_label_key(self.labelnames, labels), value)
+
+    def observe_key(self, key: Tuple[str, ...], value: float):
+        """observe() with label values already in labelnames order"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for key, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % _format_value(bound)
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(self.labelnames, key, INF_BUCKET)} {series[-1]}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(series[-2])}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}"
+
+class Gauge:
+    """
+    Value read at scrape time from a callback (queue depths, bytes used).
+    With labelnames the callback returns {label values tuple: value}.
+    """
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], object], labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+        self.labelnames = labelnames
+
+    def render(self) -> Iterable[str]:
+        try:
+            value = self.read()
+        except Exception:
+            return
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        if not self.labelnames:
+            yield f"{self.name} {_format_value(value)}"
+            return
+        for key, series_value in sorted(value.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(series_value)}"
+
+# ============ Registry ============
+
+_registry: Dict[str, object] = {}
+
+def _register(metric):
+    existing = _registry.get(metric.name)
+    if existing is not None:
+        return existing  # Module reloads reuse the metric
+    _registry[metric.name] = metric
+    return metric
+
+def counter(name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    return _register(Counter(name, documentation, labelnames))
+
+def histogram(name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+def gauge(name: str, documentation: str, read: Callable[[], object], labelnames: Tuple[str, ...] = ()) -> Gauge:
+    _registry[name] = Gauge(name, documentation, read, labelnames)  # Latest callback wins
+    return _registry[name]
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)"""
+    lines = []
+    for metric in _registry.values():
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# ============ Stage timers ============
+
+STAGE_SECONDS = histogram(
+    "job_hunter_stage_duration_seconds",
+    "Time spent in each pipeline stage",
+    ("stage", "source")
+)
+
+class _Timer:
+    __slots__ = ("stage", "source", "start")
+
+    def __init__(self, stage: str, source: str):
+        self.stage = stage
+        self.source = source
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe_key((self.stage, self.source), elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings[self.stage] = timings.get(self.stage, 0.0) + elapsed
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def timer(stage: str, source: str = ""):
+    """with timer("embed"): ... - records the stage duration (no-op when disabled)"""
+    if not enabled:
+        return _NULL_TIMER
+    return _Timer(stage, source)
+
+def timed(stage: str, source: str = ""):
+    """Decorator form of timer() for sync and async functions"""
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with timer(stage, source):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(stage, source):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# ============ Process memory ============
+
+# smaps_rollup fields (kB) -> process_memory() keys
+_SMAPS_FIELDS = {
+    "Rss": "rss", "Pss": "pss",
+    "Shared_Clean": "shared", "Shared_Dirty": "shared",
+    "Private_Clean": "uss", "Private_Dirty": "uss",
+}
+
+def process_memory(pid="self") -> Dict[str, int]:
+    """
+    Bytes of memory used by a process (Linux): rss (resident), pss (shared
+    pages split between the processes sharing them; sums to the real total
+    across workers), uss (private to this process) and shared. Only rss
+    where smaps_rollup is unavailable; empty off Linux.
+    """
+    usage: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                key = _SMAPS_FIELDS.get(name)
+                if key:
+                    usage[key] = usage.get(key, 0) + int(rest.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        usage["rss"] = int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    return usage
+
+def child_pids(pid: int) -> Tuple[int, ...]:
+    """Direct children of a process (Linux), e.g. a prefork master's workers"""
+    children = []
+    try:
+        with os.scandir(f"/proc/{pid}/task") as tasks:
+            for task in tasks:
+                with open(os.path.join(task.path, "children")) as f:
+                    children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return tuple(sorted(set(children)))
+
+# ============ HTTP middleware ============
+
+HTTP_REQUESTS = counter(
+    "job_hunter_http_requests_total",
+    "HTTP requests by handler and status",
+    ("method", "handler", "status")
+)
+HTTP_SECONDS = histogram(
+    "job_hunter_http_request_duration_seconds",
+    "Time to response headers, by handler",
+    ("method", "handler")
+)
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+class InstrumentationMiddleware:
+    """ASGI middleware: per-request stage timings, Server-Timing header, HTTP metrics"""
+
+    def __init__(self, app, server_timing_header: bool = True):
+        self.app = app
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed = time.perf_counter() - start
+                endpoint = scope.get("endpoint")
+                handler = getattr(endpoint, "__name__", "unmatched")
+                HTTP_SECONDS.observe(elapsed, method=scope["method"], handler=handler)
+                if self.server_timing_header:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", server_timing(timings, elapsed).encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            handler = getattr(scope.get("endpoint"), "__name__", "unmatched")
+            HTTP_REQUESTS.inc(method=scope["method"], handler=handler, status=str(status))
+            _request_timings.reset(token)
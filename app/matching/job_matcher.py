@@ -1,9 +1,13 @@
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 from sklearn.metrics.pairwise import cosine_similarity
+from app import instrumentation
 import json
 
+# Descriptions encoded per progress report in score_jobs
+PROGRESS_CHUNK = 128
+
 class JobMatcher:
     """Match jobs with resume using free embeddings (NO API CALLS)"""
     
@@ -13,6 +17,7 @@ class JobMatcher:
         all-MiniLM-L6-v2: Fast, lightweight, good for your specs
         """
         print("Loading embedding model (one-time download: 90MB)...")
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
         print("Model loaded successfully")
     
@@ -78,6 +83,74 @@ class JobMatcher:
         else:
             return "poor_match"
     
+    @instrumentation.timed("embed", source="resume")
+    def encode_resume(self, resume_text: str) -> np.ndarray:
+        """Unit-length resume embedding, reusable across rankings"""
+        return self.model.encode(resume_text, normalize_embeddings=True)
+    
+    @instrumentation.timed("embed", source="resume")
+    def encode_resumes(self, resume_texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Unit-length embeddings for many resumes in one batched call"""
+        return self.model.encode(resume_texts, batch_size=batch_size, normalize_embeddings=True)
+    
+    def score_jobs(
+        self,
+        resume_embedding: np.ndarray,
+        resume_skills: List[str],
+        jobs: List[Dict],
+        on_progress: Optional[Callable[[int], None]] = None
+    ) -> List[Dict]:
+        """
+        Score jobs against a precomputed resume embedding.
+        Job descriptions are encoded in one batch (in PROGRESS_CHUNK slices,
+        reporting the count so far, when on_progress is given); with
+        unit-length vectors the cosine similarity is a single matrix-vector
+        product.
+        """
+        if not jobs:
+            return []
+        
+        descriptions = [job['description'] or "" for job in jobs]
+        with instrumentation.timer("embed", source="jobs"):
+            if on_progress is None:
+                job_embeddings = self.model.encode(descriptions, normalize_embeddings=True)
+            else:
+                parts = []
+                for start in range(0, len(descriptions), PROGRESS_CHUNK):
+                    parts.append(self.model.encode(descriptions[start:start + PROGRESS_CHUNK], normalize_embeddings=True))
+                    on_progress(min(start + PROGRESS_CHUNK, len(descriptions)))
+                job_embeddings = np.concatenate(parts)
+        similarities = job_embeddings @ resume_embedding
+        
+        with instrumentation.timer("rank"):
+            skills_lower = [(skill, skill.lower()) for skill in resume_skills]
+            ranked = []
+            
+            for job, description, similarity in zip(jobs, descriptions, similarities):
+                semantic_score = float(similarity) * 100
+            
+                job_desc_lower = description.lower()
+                matched_skills = [skill for skill, lower in skills_lower if lower in job_desc_lower]
+                missing_skills = [skill for skill, lower in skills_lower if lower not in job_desc_lower]
+            
+                skill_bonus = (len(matched_skills) / max(len(resume_skills), 1)) * 30
+                final_score = min(100, semantic_score * 0.7 + skill_bonus)
+            
+                ranked.append({
+                    'job': job,
+                    'match': {
+                        'match_score': round(final_score, 2),
+                        'semantic_score': round(semantic_score, 2),
+                        'matched_skills': matched_skills,
+                        'missing_skills': missing_skills,
+                        'recommendation': self._get_recommendation(final_score)
+                    }
+                })
+            
+            # Sort by score
+            ranked.sort(key=lambda x: x['match']['match_score'], reverse=True)
+        return ranked
+    
     def rank_jobs(
         self,
         resume_text: str,
@@ -85,21 +158,4 @@ class JobMatcher:
         jobs: List[Dict]
     ) -> List[Dict]:
         """Rank multiple jobs"""
-        ranked = []
-        
-        for job in jobs:
-            match = self.calculate_match_score(
-                resume_text,
-                job['description'],
-                resume_skills,
-                job['title']
-            )
-            
-            ranked.append({
-                'job': job,
-                'match': match
-            })
-        
-        # Sort by score
-        ranked.sort(key=lambda x: x['match']['match_score'], reverse=True)
-        return ranked
+        return self.score_jobs(self.encode_resume(resume_text), resume_skills, jobs)
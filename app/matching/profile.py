@@ -0,0 +1,135 @@
+from app.resume.models import ResumeData, JobPreferences
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+import threading
+
+@dataclass
+class MatchingProfile:
+    """Everything a match request needs about a user, computed ahead of time"""
+    user_id: str
+    model_name: str
+    embedding: np.ndarray  # Unit-length float32 resume embedding
+    skills: List[str]  # Display names, deduplicated in resume order
+    normalized_skills: List[str]  # Lowercased, aligned with skills
+    filters: Dict = field(default_factory=dict)  # Preference filters for candidate selection
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+def profile_resume_text(resume: ResumeData) -> str:
+    """Text that represents a resume in embedding space"""
+    return f"{resume.summary} {' '.join(resume.technical_skills)}"
+
+def normalize_skills(skills: List[str]) -> tuple:
+    """Deduplicate skills case-insensitively, keeping first spelling"""
+    seen = set()
+    display, normalized = [], []
+    for skill in skills:
+        key = skill.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            display.append(skill.strip())
+            normalized.append(key)
+    return display, normalized
+
+def preference_filters(preferences: Optional[dict]) -> Dict:
+    """Subset of JobPreferences that narrows the candidate set"""
+    if not preferences:
+        return {}
+    prefs = JobPreferences(**preferences)
+    return {
+        'job_type': [t.lower() for t in prefs.job_type],
+        'locations': [loc.lower() for loc in prefs.locations],
+        'experience_level': prefs.experience_level.lower() if prefs.experience_level else None,
+        # 0 from the Preferences form means no bound
+        'min_salary': prefs.min_salary or None,
+        'max_salary': prefs.max_salary or None,
+        'salary_currency': prefs.salary_currency.upper() if prefs.salary_currency else None,
+    }
+
+def build_profile(matcher, user_id: str, resume: ResumeData, preferences: Optional[dict] = None) -> MatchingProfile:
+    """Encode the resume once and bundle it with normalized skills and filters"""
+    skills, normalized = normalize_skills(resume.technical_skills)
+    embedding = matcher.encode_resume(profile_resume_text(resume)).astype(np.float32)
+    return MatchingProfile(
+        user_id=user_id,
+        model_name=matcher.model_name,
+        embedding=embedding,
+        skills=skills,
+        normalized_skills=normalized,
+        filters=preference_filters(preferences)
+    )
+
+def build_profiles(matcher, items: List[tuple]) -> List[MatchingProfile]:
+    """
+    Batched build_profile for bulk ingestion.
+    items: (user_id, resume, preferences) tuples; one encode call for all.
+    """
+    if not items:
+        return []
+    embeddings = matcher.encode_resumes([profile_resume_text(resume) for _, resume, _ in items])
+    profiles = []
+    for (user_id, resume, preferences), embedding in zip(items, embeddings):
+        skills, normalized = normalize_skills(resume.technical_skills)
+        profiles.append(MatchingProfile(
+            user_id=user_id,
+            model_name=matcher.model_name,
+            embedding=embedding.astype(np.float32),
+            skills=skills,
+            normalized_skills=normalized,
+            filters=preference_filters(preferences)
+        ))
+    return profiles
+
+def store_profile(user, profile: MatchingProfile):
+    """Persist a profile onto its User row"""
+    user.profile_embedding = profile.embedding.tobytes()
+    user.profile_model = profile.model_name
+    user.profile_skills = profile.skills
+    user.profile_filters = profile.filters
+    user.profile_updated_at = profile.updated_at
+
+def load_profile(user, model_name: str) -> Optional[MatchingProfile]:
+    """Rebuild a profile from a User row; None if missing or from another model"""
+    if not user.profile_embedding or user.profile_model != model_name:
+        return None
+    skills, normalized = normalize_skills(user.profile_skills or [])
+    return MatchingProfile(
+        user_id=user.id,
+        model_name=user.profile_model,
+        embedding=np.frombuffer(user.profile_embedding, dtype=np.float32),
+        skills=skills,
+        normalized_skills=normalized,
+        filters=user.profile_filters or {},
+        updated_at=user.profile_updated_at or datetime.utcnow()
+    )
+
+class ProfileCache:
+    """Thread-safe in-process LRU of MatchingProfile keyed by user id"""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self._profiles: "OrderedDict[str, MatchingProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: str) -> Optional[MatchingProfile]:
+        with self._lock:
+            profile = self._profiles.get(user_id)
+            if profile is not None:
+                self._profiles.move_to_end(user_id)
+            return profile
+
+    def put(self, profile: MatchingProfile):
+        with self._lock:
+            self._profiles[profile.user_id] = profile
+            self._profiles.move_to_end(profile.user_id)
+            while len(self._profiles) > self.max_size:
+                self._profiles.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        with self._lock:
+            self._profiles.pop(user_id, None)
+
+    def __len__(self):
+        return len(self._profiles)
@@ -0,0 +1,510 @@
+# Background match tasks
+# A match scrapes ~500 jobs and embeds them, which can outlast client and
+# proxy timeouts when done inside one request. Submitted tasks run the same
+# pipeline in the background: a MatchTask row records status, stage
+# progress (scraped N, embedded M) and finally the ranked result, which
+# later submissions of the same (user, query) reuse for
+# MATCH_RESULT_TTL_SECONDS. The blocking steps (scraping, embedding and
+# ranking) go to a backend: worker threads of this process ("asyncio"), or
+# a process pool whose workers load their own embedding model ("process").
+# Cancelling stops the task at once; a step already handed to a thread or
+# process finishes in the background and its output is discarded.
+# With several API worker processes a task lives in the worker that
+# accepted it; the others follow it through its stored stage and progress.
+# The owner refreshes heartbeat_at on its unfinished tasks every
+# MATCH_TASK_HEARTBEAT_SECONDS; any worker fails tasks whose heartbeat is
+# three intervals old (their process died), never ones a live worker runs.
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database.database import AsyncSessionLocal
+from app.database.models import MatchTask
+from app.matching.profile import MatchingProfile
+from app.scraper.job_scraper import JobScraper, job_filter_clauses
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+import anyio
+import asyncio
+import numpy as np
+import os
+import socket
+import time
+import uuid
+
+ACTIVE = ("queued", "running")
+
+class MatchQueueFull(Exception):
+    """Raised by submit() when MATCH_QUEUE_SIZE tasks are already waiting"""
+
+def query_key(query: str) -> str:
+    """Queries that differ only in case and spacing share results"""
+    return " ".join(query.lower().split())
+
+def format_results(ranked: List[Dict]) -> List[Dict]:
+    """Ranked matches in the /api/jobs/match response shape"""
+    return [{
+        'job': item['job'],
+        'match_score': item['match']['match_score'],
+        'recommendation': item['match']['recommendation'],
+        'matched_skills': item['match']['matched_skills'],
+        'missing_skills': item['match']['missing_skills']
+    } for item in ranked]
+
+Progress = Callable[..., None]  # progress(stage=None, **counts); safe to call from any thread
+
+# ============ Backends ============
+
+class ThreadBackend:
+    """Blocking steps in worker threads, sharing this process's model; reports per source and batch"""
+
+    name = "asyncio"
+
+    def __init__(self, scraper: JobScraper):
+        self.scraper = scraper
+        self.matcher = None
+
+    async def start(self, matcher):
+        self.matcher = matcher
+
+    async def stop(self):
+        pass
+
+    async def scrape(self, query: str, limit: int, progress: Progress) -> List[Dict]:
+        on_source = lambda source, count: progress(scraped=count)
+        return await anyio.to_thread.run_sync(
+            partial(self.scraper.search_all_sources, query, limit=limit, on_source=on_source),
+            cancellable=True
+        )
+
+    async def score(self, embedding: np.ndarray, skills: List[str], jobs: List[Dict], progress: Progress) -> List[Dict]:
+        on_progress = lambda count: progress(embedded=count)
+        return await anyio.to_thread.run_sync(
+            partial(self.matcher.score_jobs, embedding, skills, jobs, on_progress=on_progress),
+            cancellable=True
+        )
+
+_worker_scraper: Optional[JobScraper] = None
+_worker_matcher = None
+
+def _init_worker(model_name: str):
+    """Pool initializer: one scraper and embedding model per worker process"""
+    global _worker_scraper, _worker_matcher
+    from app.matching.job_matcher import JobMatcher
+    _worker_scraper = JobScraper()
+    _worker_matcher = JobMatcher(model_name)
+
+def _scrape_in_worker(query: str, limit: int) -> List[Dict]:
+    return _worker_scraper.search_all_sources(query, limit=limit)
+
+def _score_in_worker(embedding: np.ndarray, skills: List[str], jobs: List[Dict]) -> List[Dict]:
+    return _worker_matcher.score_jobs(embedding, skills, jobs)
+
+class ProcessBackend:
+    """Blocking steps in a process pool, off this process's GIL; reports per stage"""
+
+    name = "process"
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def start(self, matcher):
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(matcher.model_name,)
+        )
+
+    async def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def scrape(self, query: str, limit: int, progress: Progress) -> List[Dict]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _scrape_in_worker, query, limit)
+
+    async def score(self, embedding: np.ndarray, skills: List[str], jobs: List[Dict], progress: Progress) -> List[Dict]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _score_in_worker, embedding, skills, jobs)
+
+# ============ Queue ============
+
+@dataclass
+class ActiveTask:
+    id: str
+    user_id: str
+    query: str
+    key: str
+    profile: MatchingProfile
+    status: str = "queued"
+    stage: Optional[str] = None
+    progress: Dict = field(default_factory=dict)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    listeners: List[asyncio.Queue] = field(default_factory=list)
+    task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "task_id": self.id,
+            "query": self.query,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": dict(self.progress),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": None,
+            "error": None,
+        }
+
+def task_dict(row: MatchTask, include_result: bool = True) -> Dict:
+    data = {
+        "task_id": row.id,
+        "query": row.query,
+        "status": row.status,
+        "stage": row.stage,
+        "progress": row.progress or {},
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "started_at": row.started_at.isoformat() if row.started_at else None,
+        "finished_at": row.finished_at.isoformat() if row.finished_at else None,
+        "error": row.error,
+    }
+    if include_result and row.status == "done":
+        data["total"] = len(row.result or [])
+        data["jobs"] = row.result or []
+    return data
+
+class MatchTaskQueue:
+    """Bounded queue of match tasks drained by MATCH_CONCURRENCY workers"""
+
+    def __init__(
+        self,
+        scraper: JobScraper,
+        backend: str = "asyncio",
+        concurrency: int = 2,
+        queue_size: int = 50,
+        result_ttl: float = 900.0,
+        candidates: int = 500,
+        retention_hours: float = 24.0,
+        heartbeat_seconds: float = 10.0
+    ):
+        if backend not in ("asyncio", "process"):
+            raise ValueError(f"Unknown MATCH_WORKER_BACKEND '{backend}'. Use 'asyncio' or 'process'")
+        self.scraper = scraper
+        self.concurrency = max(1, concurrency)
+        self.backend = ThreadBackend(scraper) if backend == "asyncio" else ProcessBackend(self.concurrency)
+        self.queue_size = queue_size
+        self.result_ttl = result_ttl
+        self.candidates = candidates
+        self.retention_hours = retention_hours
+        self.heartbeat_seconds = heartbeat_seconds
+        self.owner: Optional[str] = None  # Set in start(): a prefork master builds this before forking
+        self.active: Dict[str, ActiveTask] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._followers: Dict[int, asyncio.Task] = {}  # id(listener) -> poller for tasks in other workers
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    async def start(self, matcher, recover: bool = True):
+        """recover=False when a prefork master already ran recover() for all workers"""
+        if self.running:
+            return
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        await self.backend.start(matcher)
+        if recover:
+            await self.recover()
+        self._queue = asyncio.Queue()  # Depth capped in submit()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+        self._heartbeat = asyncio.create_task(self._beat())
+
+    async def stop(self, grace: float = 0.0):
+        """Give accepted tasks up to grace seconds to finish, then cancel the rest"""
+        deadline = time.monotonic() + grace
+        while self.active and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        for task in self._workers:
+            task.cancel()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        for follower in self._followers.values():
+            follower.cancel()
+        running = []
+        for active in list(self.active.values()):
+            if active.task:
+                active.task.cancel()
+                running.append(active.task)
+            else:
+                await self._finish(active, "failed", error="Interrupted by a restart")
+        if running:
+            await asyncio.wait(running, timeout=5)
+        self._workers = []
+        self._followers = {}
+        self._queue = None
+        await self.backend.stop()
+
+    def queue_depth(self) -> int:
+        return sum(1 for active in self.active.values() if active.status == "queued")
+
+    async def submit(self, db: AsyncSession, user_id: str, query: str, profile: MatchingProfile) -> Tuple[Dict, bool]:
+        """
+        Task dict for (user, query): an active task, a finished result younger
+        than result_ttl and newer than the profile (cached=True), or a newly
+        queued task. Raises MatchQueueFull.
+        """
+        if not self.running:
+            raise RuntimeError("Match task queue not started")
+        key = query_key(query)
+        for active in self.active.values():
+            if active.user_id == user_id and active.key == key:
+                return active.to_dict(), False
+
+        fresh_after = max(datetime.utcnow() - timedelta(seconds=self.result_ttl), profile.updated_at)
+        cached = await db.scalar(
+            select(MatchTask)
+            .where(
+                MatchTask.user_id == user_id,
+                MatchTask.query_key == key,
+                MatchTask.status == "done",
+                MatchTask.created_at >= fresh_after
+            )
+            .order_by(MatchTask.created_at.desc())
+            .limit(1)
+        )
+        if cached is not None:
+            return task_dict(cached), True
+
+        if self.queue_depth() >= self.queue_size:
+            raise MatchQueueFull(f"Match queue is full ({self.queue_size} tasks)")
+        row = MatchTask(
+            user_id=user_id, query=query, query_key=key, status="queued", progress={},
+            owner=self.owner, heartbeat_at=datetime.utcnow()
+        )
+        db.add(row)
+        await db.commit()
+        active = ActiveTask(row.id, user_id, query, key, profile, created_at=row.created_at)
+        self.active[row.id] = active
+        self._queue.put_nowait(active)
+        return active.to_dict(), False
+
+    async def get(self, db: AsyncSession, task_id: str, user_id: str) -> Optional[Dict]:
+        active = self.active.get(task_id)
+        if active is not None:
+            return active.to_dict() if active.user_id == user_id else None
+        row = await db.get(MatchTask, task_id)
+        if row is None or row.user_id != user_id:
+            return None
+        return task_dict(row)
+
+    async def cancel(self, db: AsyncSession, task_id: str, user_id: str) -> Optional[Dict]:
+        active = self.active.get(task_id)
+        if active is None or active.user_id != user_id:
+            return await self.get(db, task_id, user_id)  # Already finished: nothing to cancel
+        if active.task is not None:
+            active.task.cancel()
+            await asyncio.wait([active.task])
+        else:
+            await self._finish(active, "cancelled", error="Cancelled")  # Still queued
+        return await self.get(db, task_id, user_id)
+
+    def subscribe(self, task_id: str, user_id: str) -> Optional[asyncio.Queue]:
+        """Event queue for an active task: ("progress"|"done"|"failed"|"cancelled", task dict)"""
+        active = self.active.get(task_id)
+        if active is None or active.user_id != user_id:
+            return None
+        listener: asyncio.Queue = asyncio.Queue()
+        listener.put_nowait(("progress", active.to_dict()))
+        active.listeners.append(listener)
+        return listener
+
+    def follow(self, task_id: str, task: Dict, interval: float = 1.0) -> asyncio.Queue:
+        """
+        Event queue for a task running in another worker process, fed by
+        polling its row: "progress" on stage changes, then the final event.
+        """
+        listener: asyncio.Queue = asyncio.Queue()
+        listener.put_nowait(("progress", task))
+
+        async def poll():
+            last = (task["status"], task["stage"])
+            try:
+                while True:
+                    await asyncio.sleep(interval)
+                    async with AsyncSessionLocal() as db:
+                        row = await db.get(MatchTask, task_id)
+                        current = task_dict(row, include_result=False) if row else None
+                    if current is None:
+                        return
+                    if current["status"] not in ACTIVE:
+                        if current["status"] == "done":
+                            current["total"] = len(row.result or [])
+                        listener.put_nowait((current["status"], current))
+                        return
+                    if (current["status"], current["stage"]) != last:
+                        last = (current["status"], current["stage"])
+                        listener.put_nowait(("progress", current))
+            finally:
+                self._followers.pop(id(listener), None)
+
+        self._followers[id(listener)] = asyncio.create_task(poll())
+        return listener
+
+    def unsubscribe(self, task_id: str, listener: asyncio.Queue):
+        follower = self._followers.pop(id(listener), None)
+        if follower is not None:
+            follower.cancel()
+        active = self.active.get(task_id)
+        if active is not None and listener in active.listeners:
+            active.listeners.remove(listener)
+
+    # ============ Pipeline ============
+
+    async def pipeline(self, query: str, profile: MatchingProfile, progress: Optional[Progress] = None) -> List[Dict]:
+        """Scrape, ingest, filter by preferences, embed and rank; used inline by /api/jobs/match too"""
+        progress = progress or (lambda stage=None, **counts: None)
+
+        progress("scraping")
+        jobs = await self.backend.scrape(query, self.candidates, progress)
+        progress("saving", scraped=len(jobs))
+
+        # Ingest, then narrow by the user's preferences in SQL before embedding
+        async with AsyncSessionLocal() as db:
+            await self.scraper.save_jobs_to_db(db, jobs)
+            progress("filtering")
+            filters = profile.filters
+            clauses = job_filter_clauses(
+                job_types=filters.get('job_type'),
+                experience_levels=[filters['experience_level']] if filters.get('experience_level') else None,
+                min_salary=filters.get('min_salary'),
+                max_salary=filters.get('max_salary'),
+                salary_currency=filters.get('salary_currency')
+            )
+            jobs = await self.scraper.filter_jobs(db, jobs, clauses)
+        if not jobs:
+            return []
+
+        progress("embedding", candidates=len(jobs), embedded=0)
+        print(f"Ranking {len(jobs)} jobs by match...")
+        ranked = await self.backend.score(profile.embedding, profile.skills, jobs, progress)
+        progress("ranking", embedded=len(jobs))
+        return format_results(ranked)
+
+    # ============ Workers ============
+
+    async def _work(self):
+        while True:
+            active = await self._queue.get()
+            if active.status != "queued":
+                continue  # Cancelled while waiting
+            active.task = asyncio.create_task(self._execute(active))
+            try:
+                await asyncio.wait([active.task])
+            except asyncio.CancelledError:
+                active.task.cancel()
+                raise
+
+    async def _execute(self, active: ActiveTask):
+        loop = asyncio.get_running_loop()
+
+        def progress(stage: Optional[str] = None, **counts):
+            # Scraper and matcher callbacks arrive on worker threads
+            loop.call_soon_threadsafe(self._progress, active, stage, counts)
+
+        active.status = "running"
+        active.started_at = datetime.utcnow()
+        await self._save(active.id, status="running", started_at=active.started_at)
+        try:
+            results = await self.pipeline(active.query, active.profile, progress)
+            await asyncio.sleep(0)  # Deliver progress scheduled from threads before "done"
+            await self._finish(active, "done", result=results)
+        except asyncio.CancelledError:
+            await self._finish(active, "cancelled", error="Cancelled")
+        except Exception as e:
+            print(f"Match task {active.id} failed: {e}")
+            await self._finish(active, "failed", error=str(e))
+
+    def _progress(self, active: ActiveTask, stage: Optional[str], counts: Dict):
+        if active.status != "running":
+            return
+        stage_changed = stage is not None and stage != active.stage
+        if stage is not None:
+            active.stage = stage
+        active.progress.update(counts)
+        self._publish(active, "progress", active.to_dict())
+        if stage_changed:
+            # Persist on stage changes only; per-batch counts stay in memory
+            asyncio.create_task(self._save(active.id, stage=active.stage, progress=dict(active.progress)))
+
+    @staticmethod
+    def _publish(active: ActiveTask, event: str, data: Dict):
+        for listener in active.listeners:
+            listener.put_nowait((event, data))
+
+    async def _finish(self, active: ActiveTask, status: str, result: Optional[List[Dict]] = None, error: Optional[str] = None):
+        active.status = status
+        self.active.pop(active.id, None)
+        finished_at = datetime.utcnow()
+        await self._save(
+            active.id, status=status, stage=active.stage, progress=dict(active.progress),
+            result=result, error=error, finished_at=finished_at
+        )
+        data = active.to_dict()
+        data.update(finished_at=finished_at.isoformat(), error=error)
+        if result is not None:
+            data.update(total=len(result))
+        self._publish(active, status, data)
+
+    @staticmethod
+    async def _save(task_id: str, **values):
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(MatchTask).where(MatchTask.id == task_id).values(**values))
+                await db.commit()
+        except Exception as e:
+            print(f"Failed to update match task {task_id}: {e}")
+
+    async def _beat(self):
+        """Keep this worker's unfinished tasks alive, and fail those of dead workers"""
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                async with AsyncSessionLocal() as db:
+                    if self.active:
+                        await db.execute(
+                            update(MatchTask)
+                            .where(MatchTask.id.in_(list(self.active)))
+                            .values(heartbeat_at=datetime.utcnow())
+                        )
+                    await self._fail_stale(db)
+                    await db.commit()
+            except Exception as e:
+                print(f"Match task heartbeat failed: {e}")
+
+    async def _fail_stale(self, db: AsyncSession):
+        stale_before = datetime.utcnow() - timedelta(seconds=3 * self.heartbeat_seconds)
+        await db.execute(
+            update(MatchTask)
+            .where(
+                MatchTask.status.in_(ACTIVE),
+                MatchTask.owner.is_distinct_from(self.owner),
+                func.coalesce(MatchTask.heartbeat_at, MatchTask.created_at) < stale_before
+            )
+            .values(status="failed", error="Interrupted: its worker process stopped", finished_at=datetime.utcnow())
+        )
+
+    async def recover(self):
+        """
+        Fail tasks whose worker stopped heartbeating, and drop old records.
+        Safe with other workers running: their tasks have fresh heartbeats.
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=self.retention_hours)
+        async with AsyncSessionLocal() as db:
+            await self._fail_stale(db)
+            await db.execute(delete(MatchTask).where(MatchTask.created_at < cutoff))
+            await db.commit()
@@ -0,0 +1,292 @@
+# On-demand request profiling
+# Opt-in (PROFILING_ENABLED plus PROFILING_TOKEN): a request carrying
+# "X-Profile: <format>" and a matching "X-Profile-Token" runs under a
+# profiler and the result is written to PROFILE_DIR, linked from the
+# response's X-Profile-Url header. Formats:
+#   speedscope - sampled stacks as speedscope JSON (https://www.speedscope.app)
+#   collapsed  - sampled stacks as "frame;frame;frame count" lines (flamegraph.pl)
+#   pstats     - deterministic cProfile of the event loop thread (snakeviz, pstats)
+# The sampler is a background thread reading sys._current_frames(), so it
+# also sees executor and database threads; idle worker threads are dropped.
+
+from starlette.responses import JSONResponse
+from app.config import config
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import anyio
+import cProfile
+import hmac
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+
+FORMATS = {"speedscope": ".speedscope.json", "collapsed": ".collapsed.txt", "pstats": ".prof"}
+DEFAULT_FORMAT = "speedscope"
+
+Frame = Tuple[str, str, int]  # function, file, first line
+
+# Leaf frames of threads that are blocked waiting for work
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+IDLE_FUNCTIONS = {("thread.py", "_worker")}
+
+_STDLIB = os.path.dirname(os.__file__) + os.sep
+
+def _short_path(path: str) -> str:
+    """Paths relative to site-packages, the stdlib or the working directory"""
+    index = path.rfind("site-packages" + os.sep)
+    if index >= 0:
+        return path[index + len("site-packages") + 1:]
+    if path.startswith(_STDLIB):
+        return path[len(_STDLIB):]
+    cwd = os.getcwd() + os.sep
+    return path[len(cwd):] if path.startswith(cwd) else path
+
+# ============ Sampling profiler ============
+
+class SamplingProfiler:
+    """Samples every thread's stack each interval seconds from a background thread"""
+
+    def __init__(self, interval: float = 0.005, main_thread: Optional[int] = None):
+        self.interval = interval
+        self.main_thread = main_thread or threading.get_ident()  # Kept even when idle
+        self.samples: Dict[str, List[Tuple[Tuple[Frame, ...], float]]] = {}  # thread -> (stack, weight)
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._frames: Dict[Tuple, Frame] = {}  # code object key -> Frame
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self.started_at
+
+    def _run(self):
+        own = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            weight, last = now - last, now
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = self._stack(frame)
+                if ident != self.main_thread and self._idle(stack[-1]):
+                    continue
+                name = names.get(ident, str(ident))
+                if ident == self.main_thread:
+                    name = f"{name} (event loop)"
+                self.samples.setdefault(name, []).append((stack, weight))
+
+    def _stack(self, frame) -> Tuple[Frame, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+            entry = self._frames.get(key)
+            if entry is None:
+                entry = self._frames[key] = (code.co_name, _short_path(code.co_filename), code.co_firstlineno)
+            stack.append(entry)
+            frame = frame.f_back
+        stack.reverse()  # Root first
+        return tuple(stack)
+
+    @staticmethod
+    def _idle(leaf: Frame) -> bool:
+        name, path, _ = leaf
+        base = os.path.basename(path)
+        return base in IDLE_FILES or (base, name) in IDLE_FUNCTIONS
+
+    # ============ Output ============
+
+    def collapsed(self) -> str:
+        """One line per distinct stack: thread;root;...;leaf sample_count"""
+        counts: Counter = Counter()
+        for thread, samples in self.samples.items():
+            for stack, _ in samples:
+                frames = ";".join(f"{name} ({path}:{line})" for name, path, line in stack)
+                counts[f"{thread};{frames}"] += 1
+        return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+    def speedscope(self, name: str) -> Dict:
+        """Sampled profile per thread in the speedscope file format"""
+        frames: List[Dict] = []
+        index: Dict[Frame, int] = {}
+        profiles = []
+        for thread, samples in self.samples.items():
+            stacks, weights = [], []
+            for stack, weight in samples:
+                ids = []
+                for frame in stack:
+                    if frame not in index:
+                        index[frame] = len(frames)
+                        frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                    ids.append(index[frame])
+                stacks.append(ids)
+                weights.append(round(weight, 6))
+            profiles.append({
+                "type": "sampled",
+                "name": thread,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 6),
+                "samples": stacks,
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "job-hunter",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+# ============ Running a profile ============
+
+class Profile:
+    """A profiler for one format; start() and stop() on the thread being profiled"""
+
+    def __init__(self, fmt: str, name: str, interval: float):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown profile format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+        self.format = fmt
+        self.name = name
+        self.profiler = cProfile.Profile() if fmt == "pstats" else SamplingProfiler(interval)
+
+    def start(self):
+        if self.format == "pstats":
+            self.profiler.enable()
+        else:
+            self.profiler.start()
+
+    def stop(self):
+        if self.format == "pstats":
+            self.profiler.disable()
+        else:
+            self.profiler.stop()
+
+    def write(self, path: str):
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        if self.format == "pstats":
+            self.profiler.dump_stats(tmp_path)
+        else:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                if self.format == "collapsed":
+                    f.write(self.profiler.collapsed())
+                else:
+                    json.dump(self.profiler.speedscope(self.name), f)
+        os.replace(tmp_path, path)
+
+def profile_file_name(path: str, fmt: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-")[:60] or "root"
+    return f"{datetime.utcnow():%Y%m%dT%H%M%S}-{slug}-{uuid.uuid4().hex[:8]}{FORMATS[fmt]}"
+
+def resolve_profile(name: str) -> Optional[str]:
+    """Path of a stored profile directly in PROFILE_DIR, or None"""
+    if not name or name.startswith(".") or os.path.basename(name) != name or "\\" in name:
+        return None
+    if not name.endswith(tuple(FORMATS.values())):
+        return None
+    root = os.path.realpath(config.PROFILE_DIR)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.dirname(path) != root or not os.path.isfile(path):
+        return None
+    return path
+
+def list_profiles() -> List[Dict]:
+    """Stored profiles, newest first"""
+    if not os.path.isdir(config.PROFILE_DIR):
+        return []
+    entries = []
+    with os.scandir(config.PROFILE_DIR) as it:
+        for entry in it:
+            if entry.is_file() and entry.name.endswith(tuple(FORMATS.values())):
+                stat = entry.stat()
+                entries.append({"name": entry.name, "size": stat.st_size, "created_at": stat.st_mtime})
+    entries.sort(key=lambda e: e["created_at"], reverse=True)
+    return entries
+
+def prune_profiles(keep: int):
+    for entry in list_profiles()[keep:]:
+        try:
+            os.remove(os.path.join(config.PROFILE_DIR, entry["name"]))
+        except OSError:
+            pass
+
+def token_matches(supplied: Optional[str]) -> bool:
+    token = config.PROFILING_TOKEN
+    return bool(token) and supplied is not None and hmac.compare_digest(supplied.encode(), token.encode())
+
+# ============ Middleware ============
+
+class ProfilingMiddleware:
+    """ASGI middleware running requests that ask for it under a profiler"""
+
+    def __init__(self, app, interval: float = 0.005, keep: int = 50):
+        self.app = app
+        self.interval = interval
+        self.keep = keep
+        self.active = False  # One profile at a time; samplers and cProfile don't nest
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        requested = headers.get(b"x-profile")
+        if requested is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not token_matches(headers.get(b"x-profile-token", b"").decode("latin-1")):
+            response = JSONResponse(status_code=403, content={"error": "Profiling requires a valid X-Profile-Token"})
+            await response(scope, receive, send)
+            return
+        fmt = requested.decode("latin-1").strip().lower()
+        fmt = DEFAULT_FORMAT if fmt in ("", "1", "true") else fmt
+        if fmt not in FORMATS:
+            response = JSONResponse(status_code=400, content={"error": f"Unknown profile format '{fmt}'. Use one of: {', '.join(FORMATS)}"})
+            await response(scope, receive, send)
+            return
+        if self.active:
+            await self.app(scope, receive, _with_headers(send, [(b"x-profile", b"busy")]))
+            return
+
+        name = profile_file_name(scope["path"], fmt)
+        # Written once the request finishes, i.e. after the last body chunk
+        link = [(b"x-profile-url", f"/api/admin/profiles/{name}".encode())]
+        profile = Profile(fmt, f"{scope['method']} {scope['path']}", self.interval)
+        self.active = True
+        profile.start()
+        try:
+            await self.app(scope, receive, _with_headers(send, link))
+        finally:
+            profile.stop()
+            self.active = False
+            try:
+                os.makedirs(config.PROFILE_DIR, exist_ok=True)
+                await anyio.to_thread.run_sync(profile.write, os.path.join(config.PROFILE_DIR, name))
+                prune_profiles(self.keep)
+                print(f"Profile written: {name}")
+            except Exception as e:
+                print(f"Failed to write profile {name}: {e}")
+
+def _with_headers(send, extra: List[Tuple[bytes, bytes]]):
+    async def wrapped(message):
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": list(message.get("headers", [])) + extra}
+        await send(message)
+    return wrapped
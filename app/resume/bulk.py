@@ -0,0 +1,166 @@
+# Bulk resume ingestion
+# Expands an upload of PDFs and/or zip archives into individual files and
+# parses them in the shared PDF process pool, a bounded number at a time,
+# yielding each result as soon as it is ready.
+
+from app.config import config
+from app.resume import pdf_text
+from app.resume.parser import ResumeParser
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, BinaryIO, Callable, Iterable, Iterator, Optional, Tuple
+import asyncio
+import hashlib
+import signal
+import zipfile
+
+@dataclass
+class ParseOutcome:
+    file_name: str
+    status: str  # parsed, error, timeout
+    resume: Optional[dict] = None  # ResumeData.model_dump()
+    error: Optional[str] = None
+    content_hash: Optional[str] = None  # SHA-256 of the file bytes
+    cached: bool = False  # Served from the parse cache
+    cached_user_id: Optional[str] = None  # User first created from the same bytes
+
+# ============ Input expansion ============
+
+def max_file_bytes() -> int:
+    return int(config.MAX_UPLOAD_MB * 1024 * 1024)
+
+def iter_upload_files(uploads: Iterable[Tuple[str, BinaryIO]]) -> Iterator[Tuple[str, Optional[bytes], Optional[str]]]:
+    """
+    (file_name, bytes, error) for every PDF in the uploads, reading zip
+    members lazily. Oversized or unreadable entries yield an error instead
+    of bytes; at most BULK_MAX_FILES entries are produced.
+    """
+    limit = max_file_bytes()
+    count = 0
+
+    def entries():
+        for name, stream in uploads:
+            if (name or '').lower().endswith('.zip'):
+                try:
+                    archive = zipfile.ZipFile(stream)
+                except zipfile.BadZipFile:
+                    yield name, None, "Not a valid zip archive"
+                    continue
+                with archive:
+                    for info in archive.infolist():
+                        member = info.filename
+                        if info.is_dir() or member.startswith('__MACOSX/') or not member.lower().endswith('.pdf'):
+                            continue
+                        label = f"{name}/{member}"
+                        if info.file_size > limit:
+                            yield label, None, f"File exceeds {config.MAX_UPLOAD_MB:g} MB"
+                            continue
+                        # Header sizes can lie; never read past the limit
+                        with archive.open(info) as member_file:
+                            data = member_file.read(limit + 1)
+                        if len(data) > limit:
+                            yield label, None, f"File exceeds {config.MAX_UPLOAD_MB:g} MB"
+                        else:
+                            yield label, data, None
+            else:
+                data = stream.read(limit + 1)
+                if len(data) > limit:
+                    yield name, None, f"File exceeds {config.MAX_UPLOAD_MB:g} MB"
+                else:
+                    yield name, data, None
+
+    for entry in entries():
+        count += 1
+        if count > config.BULK_MAX_FILES:
+            yield entry[0], None, f"Skipped: more than {config.BULK_MAX_FILES} files"
+            continue
+        yield entry
+
+# ============ Worker ============
+
+_parser = None
+
+def _on_timeout(signum, frame):
+    raise TimeoutError("Parsing timed out")
+
+def parse_resume_bytes(data: bytes, timeout: float) -> dict:
+    """
+    Process-pool task: parse one PDF and return ResumeData as a dict.
+    On Unix an interval timer aborts the task inside the worker, so a
+    pathological file frees its worker instead of occupying it.
+    """
+    global _parser
+    if _parser is None:
+        _parser = ResumeParser()
+
+    use_alarm = timeout > 0 and hasattr(signal, 'setitimer')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    try:
+        # Already inside a worker: extract pages serially
+        text = pdf_text.extract_text(data, parallel=False)
+        return _parser.parse_text(text).model_dump()
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+# ============ Orchestration ============
+
+async def parse_files(
+    files: Iterable[Tuple[str, Optional[bytes], Optional[str]]],
+    timeout: Optional[float] = None,
+    max_in_flight: Optional[int] = None,
+    lookup: Optional[Callable[[str], Awaitable[Optional[Tuple[dict, Optional[str]]]]]] = None
+) -> AsyncIterator[ParseOutcome]:
+    """
+    Parse files in the process pool, yielding outcomes in completion order.
+    Only max_in_flight files (default 2 per worker) are held in memory.
+    lookup(content_hash) may return a cached (resume, user_id) to skip parsing.
+    """
+    timeout = config.BULK_PARSE_TIMEOUT_SECONDS if timeout is None else timeout
+    max_in_flight = max_in_flight or max(2, config.PDF_WORKERS * 2)
+    loop = asyncio.get_running_loop()
+    pool = pdf_text.get_pool()
+
+    async def run(file_name: str, data: bytes, digest: str) -> ParseOutcome:
+        future = loop.run_in_executor(pool, parse_resume_bytes, data, timeout)
+        try:
+            # Small grace period over the in-worker timer
+            resume = await asyncio.wait_for(future, timeout + 5 if timeout > 0 else None)
+            return ParseOutcome(file_name, "parsed", resume=resume, content_hash=digest)
+        except (asyncio.TimeoutError, TimeoutError):
+            return ParseOutcome(file_name, "timeout", error=f"Parsing exceeded {timeout:g}s", content_hash=digest)
+        except Exception as e:
+            return ParseOutcome(file_name, "error", error=str(e), content_hash=digest)
+
+    pending = set()
+    iterator = iter(files)
+    exhausted = False
+
+    while pending or not exhausted:
+        while not exhausted and len(pending) < max_in_flight:
+            try:
+                file_name, data, error = next(iterator)
+            except StopIteration:
+                exhausted = True
+                break
+            if error:
+                yield ParseOutcome(file_name, "error", error=error)
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            hit = await lookup(digest) if lookup else None
+            if hit is not None:
+                resume, user_id = hit
+                yield ParseOutcome(
+                    file_name, "parsed", resume=resume, content_hash=digest,
+                    cached=True, cached_user_id=user_id
+                )
+                continue
+            pending.add(asyncio.ensure_future(run(file_name, data, digest)))
+
+        if not pending:
+            continue
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task.result()
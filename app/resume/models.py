@@ -38,6 +38,7 @@ class JobPreferences(BaseModel):
     locations: List[str] = []
     min_salary: Optional[int] = None
     max_salary: Optional[int] = None
+    salary_currency: Optional[str] = None  # e.g. INR, USD; salary bounds are ignored without one
     industries: List[str] = []
     required_skills: List[str] = []
     nice_to_have_skills: List[str] = []
@@ -1,47 +1,185 @@
-import PyPDF2
-from typing import Optional
+from app.resume import pdf_text
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from app.resume.models import ResumeData, WorkExperience, Education
+from app import instrumentation
 import re
 
+# Bump whenever parsing output can change; cached parses from other versions are discarded
+PARSER_VERSION = "2"
+
+# ============ Section segmentation ============
+
+# Canonical section -> header spellings seen in resumes
+SECTION_ALIASES = {
+    'summary': ['summary', 'professional summary', 'profile', 'professional profile', 'objective',
+                'career objective', 'about me', 'about'],
+    'skills': ['skills', 'technical skills', 'key skills', 'core competencies', 'skills & tools',
+               'skills and tools', 'technologies', 'tech stack'],
+    'experience': ['experience', 'work experience', 'professional experience', 'employment history',
+                   'work history', 'employment', 'internships', 'internship experience'],
+    'education': ['education', 'academic background', 'academics', 'educational qualifications',
+                  'qualifications'],
+    'certifications': ['certifications', 'certification', 'certificates', 'licenses & certifications',
+                       'certifications & achievements', 'achievements', 'awards'],
+    'projects': ['projects', 'key projects', 'personal projects', 'academic projects'],
+}
+
+_ALIAS_TO_SECTION = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+# One pattern for every header: a line consisting only of a known alias,
+# optionally decorated with markdown/bullets and a trailing colon
+HEADER_PATTERN = re.compile(
+    r'^\s*(?:#+|•|\*|-)?\s*(' +
+    '|'.join(re.escape(alias) for alias in sorted(_ALIAS_TO_SECTION, key=len, reverse=True)) +
+    r')\s*:?\s*$',
+    re.IGNORECASE
+)
+
+BULLET_PATTERN = re.compile(r'^\s*(?:[•●▪◦*\-–]|\d+[.)])\s*')
+
+class ResumeSections:
+    """Lines of a resume plus the line span of each detected section"""
+
+    def __init__(self, lines: List[str], spans: Dict[str, List[Tuple[int, int]]]):
+        self.lines = lines
+        self.spans = spans  # section -> [(first body line, end line exclusive), ...]
+
+    def lines_of(self, section: str) -> List[str]:
+        """Non-empty body lines of a section (header excluded)"""
+        return [
+            line
+            for start, end in self.spans.get(section, [])
+            for line in self.lines[start:end]
+            if line.strip()
+        ]
+
+    def text(self, section: str) -> str:
+        return '\n'.join(self.lines_of(section))
+
+    def __contains__(self, section: str) -> bool:
+        return section in self.spans
+
+def segment(text: str) -> ResumeSections:
+    """
+    Split text into lines once and index section spans in a single pass.
+    A header that appears twice (e.g. per page) contributes both spans.
+    """
+    lines = text.splitlines()
+    headers: List[Tuple[int, str]] = []
+
+    for index, line in enumerate(lines):
+        if len(line) > 60:
+            continue  # Headers are short; skip the regex for body text
+        match = HEADER_PATTERN.match(line)
+        if match:
+            headers.append((index, _ALIAS_TO_SECTION[match.group(1).lower()]))
+
+    spans: Dict[str, List[Tuple[int, int]]] = {}
+    for position, (index, name) in enumerate(headers):
+        end = headers[position + 1][0] if position + 1 < len(headers) else len(lines)
+        spans.setdefault(name, []).append((index + 1, end))
+
+    return ResumeSections(lines, spans)
+
+# ============ Field patterns ============
+
+EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+
+# Support Indian format: +91-XXXXX-XXXXX or 10 digit
+PHONE_PATTERNS = [
+    re.compile(r'\+91[\s\-]?\d{5}[\s\-]?\d{5}'),
+    re.compile(r'\+91[\s\-]?\d{10}'),
+    re.compile(r'[\d\s\-\+]{10,}'),
+]
+
+YEAR_PATTERN = re.compile(r'\b((?:19|20)\d{2})\b')
+
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+DATE_RANGE_PATTERN = re.compile(
+    r'((?:' + _MONTH + r'\s*)?(?:\d{1,2}/)?(?:19|20)\d{2})\s*(?:-|–|—|to)\s*'
+    r'((?:' + _MONTH + r'\s*)?(?:\d{1,2}/)?(?:19|20)\d{2}|present|current|now|till date)',
+    re.IGNORECASE
+)
+
+ROLE_SEPARATOR_PATTERN = re.compile(r'\s+(?:-|–|—|\||@|at)\s+|,\s+')
+
+DEGREE_PATTERN = re.compile(
+    r'\b(b\.?\s?tech|m\.?\s?tech|b\.?\s?e\b|m\.?\s?e\b|b\.?\s?sc|m\.?\s?sc|b\.?\s?s\b|m\.?\s?s\b|b\.?\s?a\b|m\.?\s?a\b|'
+    r'bca|mca|mba|ph\.?\s?d|bachelor(?:\'s)?(?: of [a-z]+)?|master(?:\'s)?(?: of [a-z]+)?|diploma|'
+    r'higher secondary|senior secondary|hsc|ssc|class xii|class x)',
+    re.IGNORECASE
+)
+SCHOOL_PATTERN = re.compile(r'[^,|\n]*\b(university|college|institute|iit|nit|iiit|school|academy)\b[^,|\n]*', re.IGNORECASE)
+FIELD_PATTERN = re.compile(r'\b(?:in|of)\s+([A-Za-z &]+?)(?:\s*[,|(]|\s+-\s+|\s+(?:from|at)\s+|$)')
+GPA_PATTERN = re.compile(r'\b(?:c?gpa|cgpa|percentage)\s*[:\-]?\s*([\d.]+\s*(?:/\s*[\d.]+|%)?)', re.IGNORECASE)
+
+# Common technical skills
+TECH_KEYWORDS = [
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'C++', 'C#', 'Go', 'Rust',
+    'React', 'Vue', 'Angular', 'Django', 'FastAPI', 'Flask', 'Spring', 'Node',
+    'TensorFlow', 'PyTorch', 'Scikit-learn', 'Pandas', 'NumPy', 'Keras',
+    'SQL', 'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Elasticsearch',
+    'Docker', 'Kubernetes', 'AWS', 'GCP', 'Azure', 'CI/CD', 'Git', 'Jenkins',
+    'Linux', 'REST API', 'GraphQL', 'Microservices', 'Machine Learning',
+    'Deep Learning', 'NLP', 'Computer Vision', 'Data Science'
+]
+
+# Common soft skills
+SOFT_KEYWORDS = [
+    'Communication', 'Leadership', 'Problem Solving', 'Teamwork',
+    'Project Management', 'Critical Thinking', 'Adaptability', 'Creativity',
+    'Time Management', 'Collaboration'
+]
+
+def _keyword_pattern(keywords: List[str]) -> re.Pattern:
+    """
+    One alternation for a keyword list, longest first, bounded by non-word
+    characters so 'Go' does not match 'good' and 'C++' still matches.
+    """
+    alternation = '|'.join(re.escape(k.lower()) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(r'(?<![\w])(' + alternation + r')(?![\w])')
+
+TECH_PATTERN = _keyword_pattern(TECH_KEYWORDS)
+SOFT_PATTERN = _keyword_pattern(SOFT_KEYWORDS)
+_TECH_CANONICAL = {k.lower(): k for k in TECH_KEYWORDS}
+_SOFT_CANONICAL = {k.lower(): k for k in SOFT_KEYWORDS}
+
+def _find_keywords(pattern: re.Pattern, canonical: Dict[str, str], text_lower: str) -> List[str]:
+    """Canonical names of matched keywords, deduplicated in keyword-list order"""
+    found = {canonical[m] for m in pattern.findall(text_lower)}
+    return [name for name in canonical.values() if name in found]
+
+def _strip_bullet(line: str) -> str:
+    return BULLET_PATTERN.sub('', line).strip()
+
 class ResumeParser:
     """Parse resume PDF without using any API"""
-    
+
     @staticmethod
-    def extract_pdf_text(pdf_path: str) -> str:
-        """Extract text from PDF file"""
+    def extract_pdf_text(source: pdf_text.PdfSource) -> str:
+        """Extract text from a PDF path, bytes or file object (page-capped, parallel for large files)"""
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                return text
+            return pdf_text.extract_text(source)
         except Exception as e:
             print(f"Error extracting PDF: {e}")
             raise ValueError(f"Could not extract text from PDF: {e}")
-    
+
     @staticmethod
     def extract_email(text: str) -> Optional[str]:
         """Extract email from text"""
-        pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-        match = re.search(pattern, text)
+        match = EMAIL_PATTERN.search(text)
         return match.group(0) if match else None
-    
+
     @staticmethod
     def extract_phone(text: str) -> Optional[str]:
         """Extract phone number"""
-        # Support Indian format: +91-XXXXX-XXXXX or 10 digit
-        patterns = [
-            r'\+91[\s\-]?\d{5}[\s\-]?\d{5}',
-            r'\+91[\s\-]?\d{10}',
-            r'[\d\s\-\+]{10,}',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text)
+        for pattern in PHONE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(0)
         return None
-    
+
     @staticmethod
     def extract_name(text: str) -> Optional[str]:
         """Extract name from first lines"""
@@ -55,123 +193,198 @@ class ResumeParser:
                 if len(words) <= 3 and all(w.isupper() for w in words if w):
                     return line
         return "Name Not Found"
-    
+
     @staticmethod
     def extract_section(text: str, section_name: str, end_marker: Optional[str] = None) -> str:
-        """Extract section between headers"""
-        # Common section headers
-        headers = [
-            f"{section_name.upper()}",
-            f"{section_name.upper()}S",
-            f"## {section_name}",
-            f"• {section_name}",
-        ]
-        
-        text_upper = text.upper()
-        start_idx = -1
-        
-        for header in headers:
-            idx = text_upper.find(header)
-            if idx != -1:
-                start_idx = idx
-                break
-        
-        if start_idx == -1:
-            return ""
-        
-        # Find end of section
-        end_idx = len(text)
+        """
+        Extract section body by header name (any alias, e.g. "SKILLS").
+        Kept for existing callers; parse_resume segments once instead.
+        """
+        sections = segment(text)
+        name = _ALIAS_TO_SECTION.get(section_name.lower().strip(), section_name.lower().strip())
+        section_text = sections.text(name)
         if end_marker:
-            end_idx = text_upper.find(end_marker.upper(), start_idx)
-            if end_idx == -1:
-                end_idx = len(text)
-        
-        section_text = text[start_idx:end_idx]
+            end_idx = section_text.upper().find(end_marker.upper())
+            if end_idx != -1:
+                section_text = section_text[:end_idx]
         return section_text
-    
+
     @staticmethod
     def parse_skills(text: str) -> tuple:
         """Extract technical and soft skills"""
-        # Common technical skills
-        tech_keywords = [
-            'Python', 'Java', 'JavaScript', 'TypeScript', 'C++', 'C#', 'Go', 'Rust',
-            'React', 'Vue', 'Angular', 'Django', 'FastAPI', 'Flask', 'Spring', 'Node',
-            'TensorFlow', 'PyTorch', 'Scikit-learn', 'Pandas', 'NumPy', 'Keras',
-            'SQL', 'MySQL', 'PostgreSQL', 'MongoDB', 'Redis', 'Elasticsearch',
-            'Docker', 'Kubernetes', 'AWS', 'GCP', 'Azure', 'CI/CD', 'Git', 'Jenkins',
-            'Linux', 'REST API', 'GraphQL', 'Microservices', 'Machine Learning',
-            'Deep Learning', 'NLP', 'Computer Vision', 'Data Science'
-        ]
-        
-        # Common soft skills
-        soft_keywords = [
-            'Communication', 'Leadership', 'Problem Solving', 'Teamwork',
-            'Project Management', 'Critical Thinking', 'Adaptability', 'Creativity',
-            'Time Management', 'Collaboration'
-        ]
-        
-        technical_skills = []
-        soft_skills = []
-        
-        for skill in tech_keywords:
-            if skill.lower() in text.lower():
-                technical_skills.append(skill)
-        
-        for skill in soft_keywords:
-            if skill.lower() in text.lower():
-                soft_skills.append(skill)
-        
-        return list(set(technical_skills)), list(set(soft_skills))
-    
+        text_lower = text.lower()
+        technical_skills = _find_keywords(TECH_PATTERN, _TECH_CANONICAL, text_lower)
+        soft_skills = _find_keywords(SOFT_PATTERN, _SOFT_CANONICAL, text_lower)
+        return technical_skills, soft_skills
+
+    @staticmethod
+    def parse_experience(lines: List[str]) -> List[WorkExperience]:
+        """
+        Group experience lines into roles. A role starts at a non-bullet line
+        that carries a date range, or at one directly followed by a dated line
+        (title line, then dates line).
+        """
+        entries = []
+        current = None
+        dated = [DATE_RANGE_PATTERN.search(line) for line in lines]
+
+        for index, line in enumerate(lines):
+            is_bullet = bool(BULLET_PATTERN.match(line))
+            dates = dated[index]
+
+            if (dates and not is_bullet and current is not None
+                    and not current['duration'] and current['line'] == index - 1):
+                # Dates line under a title line
+                current['duration'] = dates.group(0)
+                current['start_date'], current['end_date'] = dates.group(1), dates.group(2)
+                remainder = DATE_RANGE_PATTERN.sub('', line).strip(' ,|-–—')
+                if remainder and not current['company']:
+                    current['company'] = remainder
+                continue
+
+            next_dated = not dates and index + 1 < len(lines) and dated[index + 1] is not None
+            if not is_bullet and (dates or next_dated):
+                heading = DATE_RANGE_PATTERN.sub('', line).strip(' ,|-–—')
+                parts = [p.strip() for p in ROLE_SEPARATOR_PATTERN.split(heading) if p.strip()]
+                current = {
+                    'line': index,
+                    'job_title': parts[0] if parts else heading,
+                    'company': parts[1] if len(parts) > 1 else '',
+                    'duration': dates.group(0) if dates else '',
+                    'start_date': dates.group(1) if dates else None,
+                    'end_date': dates.group(2) if dates else None,
+                    'bullets': [],
+                }
+                entries.append(current)
+            elif current is not None:
+                current['bullets'].append(_strip_bullet(line))
+
+        experience = []
+        for entry in entries:
+            description = '\n'.join(b for b in entry['bullets'] if b)
+            key_skills, _ = ResumeParser.parse_skills(description)
+            experience.append(WorkExperience(
+                company=entry['company'],
+                job_title=entry['job_title'],
+                duration=entry['duration'],
+                start_date=entry['start_date'],
+                end_date=entry['end_date'],
+                description=description,
+                key_skills=key_skills
+            ))
+        return experience
+
+    @staticmethod
+    def parse_education(lines: List[str]) -> List[Education]:
+        """One entry per line naming a degree; following lines add school/year/GPA"""
+        blocks: List[List[str]] = []
+        for line in lines:
+            clean = _strip_bullet(line)
+            if DEGREE_PATTERN.search(clean) or not blocks:
+                blocks.append([clean])
+            else:
+                blocks[-1].append(clean)
+
+        education = []
+        for block in blocks:
+            text = ' | '.join(block)
+            degree_match = DEGREE_PATTERN.search(text)
+            if not degree_match:
+                continue
+            school_match = SCHOOL_PATTERN.search(text)
+            field_match = FIELD_PATTERN.search(text[degree_match.end():])
+            years = YEAR_PATTERN.findall(text)
+            gpa_match = GPA_PATTERN.search(text)
+            education.append(Education(
+                school=school_match.group(0).strip(' -') if school_match else '',
+                degree=degree_match.group(0),
+                field=field_match.group(1).strip() if field_match else '',
+                year=years[-1] if years else '',
+                gpa=gpa_match.group(1).strip() if gpa_match else None
+            ))
+        return education
+
+    @staticmethod
+    def parse_certifications(lines: List[str]) -> List[str]:
+        """Each non-empty line of the certifications section"""
+        return [cert for cert in (_strip_bullet(line) for line in lines) if cert]
+
     @staticmethod
     def calculate_experience_years(text: str) -> int:
         """Estimate years of experience from dates"""
-        from datetime import datetime
-        import re
-        
         # Find all year patterns
         years = re.findall(r'\b(20\d{2})\b', text)
         if not years:
             return 0
-        
+
         years = [int(y) for y in years]
         if len(years) >= 2:
             return min(years[-1] - years[0], 20)  # Cap at 20 years
         return 0
-    
-    def parse_resume(self, pdf_path: str) -> ResumeData:
-        """Parse entire resume and return structured data"""
-        # Extract text
-        text = self.extract_pdf_text(pdf_path)
-        
+
+    @staticmethod
+    def experience_years_from_roles(experience: List[WorkExperience]) -> Optional[int]:
+        """Span from the earliest role start to the latest role end"""
+        starts, ends = [], []
+        for role in experience:
+            start = YEAR_PATTERN.search(role.start_date or '')
+            if not start:
+                continue
+            starts.append(int(start.group(1)))
+            end = YEAR_PATTERN.search(role.end_date or '')
+            ends.append(int(end.group(1)) if end else datetime.now().year)
+
+        if not starts:
+            return None
+        return max(0, min(max(ends) - min(starts), 20))  # Cap at 20 years
+
+    def parse_text(self, text: str) -> ResumeData:
+        """Parse extracted resume text into structured data"""
+        sections = segment(text)
+
         # Extract basic info
         name = self.extract_name(text)
         email = self.extract_email(text)
         phone = self.extract_phone(text)
-        
-        # Extract sections
-        summary_section = self.extract_section(text, "SUMMARY")
-        skills_section = self.extract_section(text, "SKILLS")
-        
-        # Parse skills
-        technical_skills, soft_skills = self.parse_skills(text)
-        
+
+        # Structured sections
+        summary = ' '.join(line.strip() for line in sections.lines_of('summary'))
+        work_experience = self.parse_experience(sections.lines_of('experience'))
+        education = self.parse_education(sections.lines_of('education'))
+        certifications = self.parse_certifications(sections.lines_of('certifications'))
+
+        # Skills are also named in summary/experience/projects
+        if 'skills' in sections:
+            skills_text = '\n'.join(
+                sections.text(name) for name in ('skills', 'summary', 'experience', 'projects')
+            )
+        else:
+            skills_text = text
+        technical_skills, soft_skills = self.parse_skills(skills_text)
+
         # Calculate experience
-        years_exp = self.calculate_experience_years(text)
-        
+        years_exp = self.experience_years_from_roles(work_experience)
+        if years_exp is None:
+            years_exp = self.calculate_experience_years(text)
+
         # Simple heuristic for location (often near phone number)
         location = "Bangalore"  # Default
-        
+
         return ResumeData(
             full_name=name or "Unknown",
             email=email or "not@found.com",
             phone=phone or "+91-0000000000",
             location=location,
-            summary=summary_section[:200] if summary_section else "ML/Software Engineer",
+            summary=summary[:1000] if summary else "ML/Software Engineer",
             technical_skills=technical_skills,
             soft_skills=soft_skills,
             years_of_experience=years_exp,
-            work_experience=[],  # Would require more sophisticated parsing
-            education=[],
-            certifications=[]
+            work_experience=work_experience,
+            education=education,
+            certifications=certifications
         )
+
+    @instrumentation.timed("resume_parse")
+    def parse_resume(self, source: pdf_text.PdfSource) -> ResumeData:
+        """Parse entire resume (path, bytes or file object) and return structured data"""
+        return self.parse_text(self.extract_pdf_text(source))
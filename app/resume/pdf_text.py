@@ -0,0 +1,206 @@
+# PDF text extraction
+# Pages are streamed one at a time from the fastest installed backend
+# (pypdfium2 > PyPDF2 > pdfminer.six), capped at a configurable page count.
+# Large documents are split into page ranges extracted in a process pool.
+# Sources may be a path, bytes or a binary file object, so uploads are parsed
+# from memory without a temp file.
+
+from app.config import config
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple, Union
+import importlib.util
+import io
+import threading
+
+PdfSource = Union[str, bytes, BinaryIO]
+
+BACKEND_MODULES = {
+    'pypdfium2': 'pypdfium2',
+    'pdfminer': 'pdfminer',
+    'pypdf2': 'PyPDF2',
+}
+
+# Preference order for PDF_BACKEND=auto, fastest first
+# (benchmarks/pdf_extraction.py: pdfminer is ~15x slower than PyPDF2)
+BACKEND_ORDER = ['pypdfium2', 'pypdf2', 'pdfminer']
+
+def available_backends() -> List[str]:
+    """Installed backends in preference order"""
+    return [name for name in BACKEND_ORDER if importlib.util.find_spec(BACKEND_MODULES[name])]
+
+def select_backend(preferred: Optional[str] = None) -> str:
+    """Resolve 'auto' (or an unavailable choice) to an installed backend"""
+    preferred = (preferred or config.PDF_BACKEND).lower()
+    installed = available_backends()
+    if not installed:
+        raise ValueError("No PDF backend installed (need PyPDF2, pdfminer.six or pypdfium2)")
+    if preferred != 'auto' and preferred in installed:
+        return preferred
+    if preferred != 'auto':
+        print(f"PDF backend '{preferred}' not installed, using {installed[0]}")
+    return installed[0]
+
+# ============ Backends ============
+
+class _Unclosed:
+    """Lets `with` blocks use a caller-owned file object without closing it"""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+
+    def __enter__(self) -> BinaryIO:
+        return self.file
+
+    def __exit__(self, *exc):
+        return False
+
+def _stream(source: PdfSource):
+    """Binary stream over a source; bytes are wrapped without copying"""
+    if isinstance(source, str):
+        return open(source, 'rb')
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return _Unclosed(source)
+
+def _pdfium_document(source: PdfSource):
+    import pypdfium2 as pdfium
+    if isinstance(source, (bytearray, memoryview)):
+        source = bytes(source)
+    elif not isinstance(source, (str, bytes)):
+        source.seek(0)  # pdfium reads the caller's file object in place
+    return pdfium.PdfDocument(source)
+
+@contextmanager
+def _open_pdf(source: PdfSource, backend: str) -> Iterator[Tuple[int, Callable[[int, int], Iterator[str]]]]:
+    """
+    Parse the document once: (page count, pages) where pages(start, end)
+    streams the text of pages [start, end) from that same parse.
+    """
+    if backend == 'pypdfium2':
+        pdf = _pdfium_document(source)
+
+        def pages(start: int, end: int) -> Iterator[str]:
+            for index in range(start, min(end, len(pdf))):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+
+        try:
+            yield len(pdf), pages
+        finally:
+            pdf.close()
+
+    elif backend == 'pdfminer':
+        from pdfminer.converter import PDFPageAggregator
+        from pdfminer.layout import LAParams, LTTextContainer
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+        with _stream(source) as file:
+            # Page objects are cheap; their content is only read when laid out
+            document_pages = list(PDFPage.get_pages(file))
+
+            def pages(start: int, end: int) -> Iterator[str]:
+                # What pdfminer.high_level.extract_pages does, over the already parsed pages
+                resources = PDFResourceManager()
+                device = PDFPageAggregator(resources, laparams=LAParams())
+                interpreter = PDFPageInterpreter(resources, device)
+                for page in document_pages[start:end]:
+                    interpreter.process_page(page)
+                    yield ''.join(
+                        element.get_text() for element in device.get_result() if isinstance(element, LTTextContainer)
+                    )
+
+            yield len(document_pages), pages
+
+    else:
+        import PyPDF2
+        with _stream(source) as file:
+            reader = PyPDF2.PdfReader(file)
+
+            def pages(start: int, end: int) -> Iterator[str]:
+                for index in range(start, min(end, len(reader.pages))):
+                    yield reader.pages[index].extract_text() or ''
+
+            yield len(reader.pages), pages
+
+def _iter_pages(source: PdfSource, backend: str, start: int, end: int) -> Iterator[str]:
+    """Text of pages [start, end), one page at a time"""
+    with _open_pdf(source, backend) as (_, pages):
+        yield from pages(start, end)
+
+def _extract_range(source: Union[str, bytes], backend: str, start: int, end: int) -> str:
+    """Process-pool task: one contiguous page range"""
+    return '\n'.join(_iter_pages(source, backend, start, end))
+
+# ============ Process pool ============
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ProcessPoolExecutor:
+    """Shared pool, created on first large document"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=config.PDF_WORKERS)
+        return _pool
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+# ============ Public API ============
+
+def iter_page_texts(source: PdfSource, backend: Optional[str] = None, max_pages: Optional[int] = None) -> Iterator[str]:
+    """Stream page texts without materializing the whole document"""
+    backend = select_backend(backend)
+    limit = max_pages if max_pages is not None else config.PDF_MAX_PAGES
+    return _iter_pages(source, backend, 0, limit if limit > 0 else 1 << 31)
+
+def extract_text(
+    source: PdfSource,
+    backend: Optional[str] = None,
+    max_pages: Optional[int] = None,
+    parallel: Optional[bool] = None
+) -> str:
+    """
+    Text of the first max_pages pages, joined with newlines.
+    parallel=None decides by size: documents with at least
+    PDF_PARALLEL_MIN_PAGES pages are split across the process pool.
+    """
+    backend = select_backend(backend)
+    limit = max_pages if max_pages is not None else config.PDF_MAX_PAGES
+    # One parse both counts the pages and, when extracting serially, reads them
+    with _open_pdf(source, backend) as (pages, page_texts):
+        if limit > 0:
+            pages = min(pages, limit)
+
+        if parallel is None:
+            parallel = config.PDF_WORKERS > 1 and pages >= config.PDF_PARALLEL_MIN_PAGES
+
+        if not parallel or pages < 2:
+            return '\n'.join(page_texts(0, pages))
+
+    # Workers need a picklable source: a path or the raw bytes
+    if not isinstance(source, (str, bytes)):
+        if isinstance(source, (bytearray, memoryview)):
+            source = bytes(source)
+        else:
+            source.seek(0)
+            source = source.read()
+
+    # Contiguous ranges, a few per worker so a slow page does not stall one range
+    chunks = max(1, min(pages, config.PDF_WORKERS * 2))
+    bounds = [(pages * i // chunks, pages * (i + 1) // chunks) for i in range(chunks)]
+    pool = get_pool()
+    futures = [pool.submit(_extract_range, source, backend, start, end) for start, end in bounds if end > start]
+    return '\n'.join(future.result() for future in futures)
@@ -1,10 +1,69 @@
 from app.scraper.sources.linkedin import LinkedInJobsScraper
 from app.scraper.sources.remoteok import RemoteOKScraper
-from app.database.database import get_db_session
+from app.scraper.normalize import normalize_job, NOT_SPECIFIED
 from app.database.models import Job
-from typing import List, Optional
+from app import instrumentation
+from sqlalchemy import select, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Callable, List, Optional
 from datetime import datetime
 import json
+import uuid
+
+NORMALIZED_COLUMNS = (
+    'job_type', 'experience_level', 'salary', 'salary_min', 'salary_max', 'salary_currency'
+)
+
+def job_filter_clauses(
+    job_types: Optional[List[str]] = None,
+    experience_levels: Optional[List[str]] = None,
+    min_salary: Optional[int] = None,
+    max_salary: Optional[int] = None,
+    salary_currency: Optional[str] = None,
+    include_unspecified: bool = True
+) -> list:
+    """
+    SQL predicates over the normalized, indexed job columns.
+    With include_unspecified, jobs whose field could not be extracted are
+    kept rather than silently dropped. Salary bounds need salary_currency.
+    """
+    clauses = []
+    
+    def with_unspecified(column, predicate):
+        if not include_unspecified:
+            return predicate
+        return or_(predicate, column.is_(None), column == NOT_SPECIFIED)
+    
+    if job_types:
+        clauses.append(with_unspecified(Job.job_type, Job.job_type.in_([t.lower() for t in job_types])))
+    if experience_levels:
+        clauses.append(with_unspecified(Job.experience_level, Job.experience_level.in_([e.lower() for e in experience_levels])))
+    
+    # 0 or empty means "no bound" (the Preferences form defaults to 0), and
+    # amounts are only comparable within one currency, so without a currency
+    # there is no salary predicate at all
+    min_salary = min_salary if min_salary and min_salary > 0 else None
+    max_salary = max_salary if max_salary and max_salary > 0 else None
+    if salary_currency and (min_salary is not None or max_salary is not None):
+        # Ranges overlap: the job can pay at least min and at most max
+        salary = [Job.salary_currency == salary_currency.upper()]
+        if min_salary is not None:
+            salary.append(Job.salary_max >= min_salary)
+        if max_salary is not None:
+            salary.append(Job.salary_min <= max_salary)
+        predicate = and_(*salary)
+        if include_unspecified:
+            predicate = or_(predicate, Job.salary_min.is_(None))
+        clauses.append(predicate)
+    
+    return clauses
+
+SCRAPED_JOBS = instrumentation.counter(
+    "job_hunter_scraped_jobs_total", "Jobs returned by each source", ("source",)
+)
+SCRAPE_ERRORS = instrumentation.counter(
+    "job_hunter_scrape_errors_total", "Source searches that raised", ("source",)
+)
 
 class JobScraper:
     """Unified job scraper"""
@@ -21,51 +80,74 @@ class JobScraper:
         location: str = "India",
         job_type: Optional[str] = None,
         experience_level: Optional[str] = None,
-        limit: int = 50
+        limit: int = 50,
+        on_source: Optional[Callable[[str, int], None]] = None
     ) -> List[dict]:
-        """Search all job sources"""
+        """Search all job sources; on_source(name, jobs_so_far) runs after each one"""
         all_jobs = []
         
         print(f"Scraping jobs for: {query} in {location}")
         
-        import uuid
-
         for source in self.sources:
             try:
                 source_name = source.__class__.__name__
                 print(f"Scraping {source_name}...")
                 
-                # Dynamic dispatch based on signature would be better, but simpler here:
-                if isinstance(source, RemoteOKScraper):
-                     # RemoteOK is global/remote, location might filter it
-                     jobs = source.search_jobs(query, location, limit=limit)
-                else:
-                    jobs = source.search_jobs(query, location, limit=limit)
+                with instrumentation.timer("scrape", source=source_name):
+                    # Dynamic dispatch based on signature would be better, but simpler here:
+                    if isinstance(source, RemoteOKScraper):
+                         # RemoteOK is global/remote, location might filter it
+                         jobs = source.search_jobs(query, location, limit=limit)
+                    else:
+                        jobs = source.search_jobs(query, location, limit=limit)
                 
-                # Assign unique IDs to transient jobs
+                # Assign unique IDs to transient jobs and normalize
+                # salary/seniority/work mode once, at ingest
                 for job in jobs:
                     if 'id' not in job:
                         job['id'] = str(uuid.uuid4())
+                    normalize_job(job)
 
                 print(f"Found {len(jobs)} jobs on {source_name}")
+                SCRAPED_JOBS.inc(len(jobs), source=source_name)
                 all_jobs.extend(jobs)
+                if on_source:
+                    on_source(source_name, min(len(all_jobs), limit))
                 
             except Exception as e:
+                SCRAPE_ERRORS.inc(source=source.__class__.__name__)
                 print(f"Error scraping {source.__class__.__name__}: {e}")
         
         return all_jobs[:limit]
     
-    def save_jobs_to_db(self, jobs: List[dict]):
-        """Save jobs to database"""
-        db = get_db_session()
+    @instrumentation.timed("db_ingest")
+    async def save_jobs_to_db(self, db: AsyncSession, jobs: List[dict]):
+        """
+        Save jobs to database. Failures are rolled back and re-raised:
+        filter_jobs reads the rows back, so a batch that was not saved
+        would otherwise silently filter down to nothing.
+        """
         try:
+            # One lookup for every URL in the batch instead of one per job
+            urls = [job_data['url'] for job_data in jobs if job_data.get('url')]
+            result = await db.scalars(select(Job).where(Job.url.in_(urls)))
+            existing_jobs = {job.url: job for job in result}
+            
+            saved = 0
             for job_data in jobs:
-                # Check if job already exists
-                existing = db.query(Job).filter(Job.url == job_data['url']).first()
+                existing = existing_jobs.get(job_data['url'])
                 if existing:
+                    # Keep the caller's dict pointing at the stored row
+                    job_data['id'] = existing.id
+                    # Backfill rows ingested before normalization existed
+                    for column in NORMALIZED_COLUMNS:
+                        if job_data.get(column) is not None:
+                            setattr(existing, column, job_data[column])
                     continue
                 
+                job_data.setdefault('id', str(uuid.uuid4()))
                 job = Job(
+                    id=job_data['id'],
                     title=job_data['title'],
                     company=job_data['company'],
                     description=job_data['description'],
@@ -73,16 +155,36 @@ class JobScraper:
                     job_type=job_data.get('job_type', 'not specified'),
                     url=job_data['url'],
                     source=job_data['source'],
+                    salary=job_data.get('salary'),
+                    salary_min=job_data.get('salary_min'),
+                    salary_max=job_data.get('salary_max'),
+                    salary_currency=job_data.get('salary_currency'),
                     posted_date=job_data.get('posted_date', datetime.now()),
                     experience_level=job_data.get('experience_level', 'not specified'),
-                    parsed_data=json.dumps(job_data)
+                    parsed_data=json.dumps(job_data, default=str)
                 )
                 db.add(job)
+                existing_jobs[job_data['url']] = job
+                saved += 1
             
-            db.commit()
-            print(f"Saved {len(jobs)} jobs to database")
+            await db.commit()
+            print(f"Saved {saved} jobs to database")
         except Exception as e:
             print(f"Error saving jobs: {e}")
-            db.rollback()
-        finally:
-            db.close()
+            await db.rollback()
+            raise
+    
+    async def filter_jobs(self, db: AsyncSession, jobs: List[dict], clauses: list) -> List[dict]:
+        """
+        Narrow jobs saved by save_jobs_to_db with SQL predicates from
+        job_filter_clauses, preserving the scraped order. Runs before any
+        embedding work.
+        """
+        if not clauses or not jobs:
+            return jobs
+        
+        ids = [job['id'] for job in jobs]
+        with instrumentation.timer("db_filter"):
+            result = await db.scalars(select(Job.id).where(Job.id.in_(ids), *clauses))
+        keep = set(result)
+        return [job for job in jobs if job['id'] in keep]
@@ -0,0 +1,231 @@
+# Ingest-time job normalization
+# Sources hand back free text; this extracts salary range, seniority and work
+# mode once, with precompiled rule tables, so search/match can filter on
+# indexed columns instead of re-reading descriptions.
+
+import re
+from typing import Optional, Tuple
+
+NOT_SPECIFIED = "not specified"
+
+# ============ Salary ============
+
+CURRENCY_SYMBOLS = {
+    '$': 'USD', 'us$': 'USD', 'usd': 'USD',
+    '€': 'EUR', 'eur': 'EUR',
+    '£': 'GBP', 'gbp': 'GBP',
+    '₹': 'INR', 'rs': 'INR', 'rs.': 'INR', 'inr': 'INR',
+    'cad': 'CAD', 'c$': 'CAD', 'aud': 'AUD', 'a$': 'AUD',
+}
+
+# Multiply to get an annual figure
+PERIOD_FACTORS = {
+    'hour': 2080, 'hr': 2080, 'h': 2080,
+    'day': 260,
+    'week': 52, 'wk': 52,
+    'month': 12, 'mo': 12,
+    'year': 1, 'yr': 1, 'annum': 1, 'annual': 1,
+}
+
+# 1,20,000 (Indian grouping) | 120,000 / 120.000 | 120 / 1.5
+_AMOUNT = r'(\d{1,3}(?:,\d{2})+,\d{3}|\d{1,3}(?:[,.]\d{3})+|\d+(?:\.\d+)?)\s*(k|m|lpa|lakhs?|lacs?|l|cr|crores?)?\b'
+_CURRENCY = r'(us\$|c\$|a\$|\$|€|£|₹|rs\.?|usd|eur|gbp|inr|cad|aud)'
+_PERIOD = r'(?:\s*(?:/|per|an?|p\.?)\s*(hour|hr|h|day|week|wk|month|mo|year|yr|annum|annual)\b)?'
+
+SALARY_PATTERNS = [
+    # "$120k - $150k / year", "USD 80,000 to 100,000"
+    re.compile(_CURRENCY + r'\s*' + _AMOUNT + r'\s*(?:-|–|to)\s*' + _CURRENCY + r'?\s*' + _AMOUNT + _PERIOD, re.IGNORECASE),
+    # "10 - 15 LPA", "80,000 - 100,000 USD"
+    re.compile(_AMOUNT + r'\s*(?:-|–|to)\s*' + _AMOUNT + r'\s*' + _CURRENCY + r'?' + _PERIOD, re.IGNORECASE),
+    # "$150k", "₹12 LPA", "€60,000 per year"
+    re.compile(_CURRENCY + r'\s*' + _AMOUNT + _PERIOD, re.IGNORECASE),
+    # "12 LPA"
+    re.compile(r'(\d+(?:\.\d+)?)\s*(lpa|lakhs?\s+per\s+annum)', re.IGNORECASE),
+]
+
+UNIT_FACTORS = {
+    'k': 1_000, 'm': 1_000_000,
+    'l': 100_000, 'lpa': 100_000, 'lakh': 100_000, 'lakhs': 100_000, 'lac': 100_000, 'lacs': 100_000,
+    'cr': 10_000_000, 'crore': 10_000_000, 'crores': 10_000_000,
+}
+
+INDIAN_UNITS = {'l', 'lpa', 'lakh', 'lakhs', 'lac', 'lacs', 'cr', 'crore', 'crores'}
+
+# Reject "salary" figures that are really years, team sizes, etc.
+MIN_ANNUAL_SALARY = 1_000
+
+def _amount(number: str, unit: Optional[str]) -> float:
+    if ',' in number or re.fullmatch(r'\d{1,3}(?:\.\d{3})+', number):
+        value = float(re.sub(r'[,.]', '', number))
+    else:
+        value = float(number)
+    return value * UNIT_FACTORS.get((unit or '').lower(), 1)
+
+# Words that mark a figure as pay rather than funding, revenue or headcount
+SALARY_CONTEXT = re.compile(
+    r'\b(salary|salaries|pay|paid|compensation|comp|ctc|package|stipend|wages?|base|ote|earn(ing)?s?|remuneration|per annum|lpa)\b',
+    re.IGNORECASE
+)
+# ...and words that mark it as something else, even next to a pay word
+NOT_SALARY_CONTEXT = re.compile(
+    r'\b(raised?|raising|funding|funded|series [a-e]|seed|valuation|revenue|arr|investors?|customers|users)\b',
+    re.IGNORECASE
+)
+SALARY_CONTEXT_CHARS = 80
+SENTENCE_BREAK = re.compile(r'[.!?;]\s|\n')
+
+def _salary_context(text: str, start: int, end: int) -> bool:
+    """Whether a pay word, and no funding word, appears near the match in its sentence"""
+    before = text[max(0, start - SALARY_CONTEXT_CHARS):start]
+    after = text[end:end + SALARY_CONTEXT_CHARS]
+    breaks = list(SENTENCE_BREAK.finditer(before))
+    if breaks:
+        before = before[breaks[-1].end():]
+    cut = SENTENCE_BREAK.search(after)
+    if cut:
+        after = after[:cut.start()]
+    window = f"{before} {after}"
+    return bool(SALARY_CONTEXT.search(window)) and not NOT_SALARY_CONTEXT.search(window)
+
+def extract_salary(text: str, require_context: bool = True) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    """
+    (annual_min, annual_max, currency) from free text, or (None, None, None).
+    With require_context (descriptions), a figure only counts if it is a
+    range with a pay period ("$90k-$120k/year"), is in LPA, or sits in a
+    sentence with a pay word, so "Series A, $10M raised" is not a salary.
+    """
+    if not text:
+        return None, None, None
+
+    for index, pattern in enumerate(SALARY_PATTERNS):
+        for match in pattern.finditer(text):
+            groups = match.groups()
+
+            if index == 0:
+                cur1, n1, u1, cur2, n2, u2, period = groups
+                currency_token = cur1 or cur2
+            elif index == 1:
+                n1, u1, n2, u2, currency_token, period = groups
+            elif index == 2:
+                currency_token, n1, u1, period = groups
+                n2, u2 = n1, u1
+            else:
+                n1, u1 = groups
+                n2, u2, currency_token, period = n1, u1, None, None
+
+            # "10-15 LPA": the unit on the upper bound applies to both
+            u1 = u1 or u2
+            units = {(u1 or '').lower(), (u2 or '').lower()}
+            if currency_token:
+                currency = CURRENCY_SYMBOLS.get(currency_token.lower())
+            elif units & INDIAN_UNITS:
+                currency = 'INR'
+            else:
+                # Bare numbers without currency or unit are too ambiguous
+                continue
+
+            if require_context:
+                is_range = index in (0, 1)
+                if not ((is_range and period) or index == 3 or 'lpa' in units
+                        or _salary_context(text, match.start(), match.end())):
+                    continue
+
+            factor = PERIOD_FACTORS.get((period or 'year').lower(), 1)
+            low, high = sorted((_amount(n1, u1) * factor, _amount(n2, u2) * factor))
+            if low < MIN_ANNUAL_SALARY:
+                continue
+            return int(low), int(high), currency
+
+    return None, None, None
+
+def format_salary(salary_min: Optional[int], salary_max: Optional[int], currency: Optional[str]) -> Optional[str]:
+    """Display string stored in Job.salary"""
+    if salary_min is None:
+        return None
+    if salary_max is None or salary_max == salary_min:
+        return f"{currency} {salary_min:,}"
+    return f"{currency} {salary_min:,} - {salary_max:,}"
+
+# ============ Seniority ============
+
+# First matching rule wins. Keywords are only read from the title: in a
+# description they are mostly verbs and context ("Lead the team", "report to
+# a senior engineer"); the description contributes years of experience.
+SENIORITY_RULES = [
+    ('entry', re.compile(r'\b(intern(ship)?|trainee|graduate|fresher|entry[\s-]?level|junior|jr\.?)\b', re.IGNORECASE)),
+    ('senior', re.compile(r'\b(senior|sr\.?|staff|principal|lead|head of|architect|director|vp)\b', re.IGNORECASE)),
+    ('mid', re.compile(r'\b(mid[\s-]?level|intermediate|mid[\s-]?senior)\b', re.IGNORECASE)),
+]
+
+YEARS_PATTERN = re.compile(r'(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?(?:years?|yrs?)', re.IGNORECASE)
+
+def extract_seniority(title: str, description: str) -> str:
+    """entry, mid, senior or 'not specified'"""
+    for level, pattern in SENIORITY_RULES:
+        if pattern.search(title or ''):
+            return level
+
+    match = YEARS_PATTERN.search(description or '')
+    if match:
+        years = int(match.group(1))
+        if years < 2:
+            return 'entry'
+        if years < 5:
+            return 'mid'
+        return 'senior'
+
+    return NOT_SPECIFIED
+
+# ============ Work mode ============
+
+WORK_MODE_RULES = [
+    ('hybrid', re.compile(r'\bhybrid\b', re.IGNORECASE)),
+    ('remote', re.compile(r'\b(remote|work from home|wfh|anywhere|worldwide|distributed team)\b', re.IGNORECASE)),
+    ('on-site', re.compile(r'\b(on[\s-]?site|in[\s-]office|office[\s-]based|in[\s-]person)\b', re.IGNORECASE)),
+]
+
+# "not remote", "no remote work", "non-remote", "not a remote role"
+NEGATION = re.compile(r'\b(?:not|no|non)\b(?:[\s-]+(?:a|an|fully|100%))?[\s-]*$', re.IGNORECASE)
+
+def extract_work_mode(*texts: str) -> str:
+    """remote, hybrid, on-site or 'not specified'"""
+    for text in texts:
+        if not text:
+            continue
+        for mode, pattern in WORK_MODE_RULES:
+            for match in pattern.finditer(text):
+                if not NEGATION.search(text[max(0, match.start() - 20):match.start()]):
+                    return mode
+    return NOT_SPECIFIED
+
+# ============ Entry point ============
+
+def normalize_job(job: dict) -> dict:
+    """
+    Fill salary_min/salary_max/salary_currency/salary, experience_level and
+    job_type in place. Values a source already provided are kept.
+    """
+    title = job.get('title') or ''
+    description = job.get('description') or ''
+
+    if job.get('salary_min') is None:
+        # A source's salary field is trusted; titles and descriptions need pay context
+        salary_min, salary_max, currency = extract_salary(job.get('salary') or '', require_context=False)
+        if salary_min is None:
+            salary_min, salary_max, currency = extract_salary(f"{title}\n{description}")
+        job['salary_min'] = salary_min
+        job['salary_max'] = salary_max
+        job['salary_currency'] = currency
+    else:
+        job.setdefault('salary_max', job['salary_min'])
+        job.setdefault('salary_currency', 'USD')
+    if not job.get('salary'):
+        job['salary'] = format_salary(job['salary_min'], job['salary_max'], job['salary_currency'])
+
+    if job.get('experience_level') in (None, '', NOT_SPECIFIED):
+        job['experience_level'] = extract_seniority(title, description)
+
+    if job.get('job_type') in (None, '', NOT_SPECIFIED):
+        job['job_type'] = extract_work_mode(title, job.get('location') or '', description)
+
+    return job
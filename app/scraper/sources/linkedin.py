@@ -4,6 +4,7 @@
 
 import requests
 from bs4 import BeautifulSoup
+from app import instrumentation
 from datetime import datetime
 from typing import List
 import time
@@ -78,8 +79,9 @@ class LinkedInJobsScraper:
                     
                     if response.status_code == 200:
                         try:
-                            soup = BeautifulSoup(response.content, 'html.parser')
-                            job_cards = soup.find_all('div', class_='base-card')
+                            with instrumentation.timer("html_parse", source="linkedin"):
+                                soup = BeautifulSoup(response.content, 'html.parser')
+                                job_cards = soup.find_all('div', class_='base-card')
                             
                             if not job_cards:
                                 print(f"[LinkedIn] No more jobs found at start={start}")
@@ -172,10 +174,11 @@ class LinkedInJobsScraper:
             )
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Try to extract job listings from the page
-                job_containers = soup.find_all('div', {'data-job-id': True})
+                with instrumentation.timer("html_parse", source="linkedin"):
+                    soup = BeautifulSoup(response.content, 'html.parser')
+                    
+                    # Try to extract job listings from the page
+                    job_containers = soup.find_all('div', {'data-job-id': True})
                 
                 for container in job_containers[:limit]:
                     try:
@@ -110,6 +110,12 @@ class RemoteOKScraper:
                     'job_type': 'remote',
                     'experience_level': 'not specified'
                 }
+                
+                # RemoteOK publishes annual USD bounds (0 when unknown)
+                if item.get('salary_min'):
+                    job['salary_min'] = int(item['salary_min'])
+                    job['salary_max'] = int(item.get('salary_max') or item['salary_min'])
+                    job['salary_currency'] = 'USD'
                 jobs.append(job)
         
         except Exception as e:
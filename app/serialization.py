@@ -0,0 +1,81 @@
+# Fast JSON serialization
+# Job payloads (hundreds of dicts with full HTML descriptions and datetime
+# posted dates) dominate response encoding. orjson serializes datetimes,
+# numpy scalars and arrays natively and several times faster than the
+# stdlib; without it the stdlib json module is used with the same output
+# rules. Routes that return large payloads hand their dicts straight to
+# FastJSONResponse, which skips FastAPI's per-value jsonable_encoder pass.
+# The same encoder backs SQLAlchemy JSON columns (match task results).
+
+from starlette.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+from app.config import config
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Dict, Optional, Type
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Types neither encoder handles natively"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()  # Only reached without orjson
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if hasattr(value, "tolist"):
+        return value.tolist()  # numpy scalars and arrays without orjson
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if orjson:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+    loads = orjson.loads
+else:
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
+
+def dumps_str(value: Any) -> str:
+    """dumps() as text, for SQLAlchemy's json_serializer"""
+    return dumps(value).decode("utf-8")
+
+# ============ Responses ============
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (or compact stdlib json)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def json_response(
+    content: Dict,
+    model: Optional[Type[BaseModel]] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> FastJSONResponse:
+    """
+    Response for a payload already in the shape of its schemas.py model.
+    The model documents the route; the payload is only validated against it
+    when VALIDATE_RESPONSES is on (development), where a mismatch is logged.
+    """
+    if model is not None and config.VALIDATE_RESPONSES:
+        try:
+            model.model_validate(content)
+        except ValidationError as e:
+            print(f"Response does not match {model.__name__}: {e.error_count()} error(s)\n{e}")
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
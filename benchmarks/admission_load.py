@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cheap-endpoint latency while expensive requests flood the server.
+
+A Starlette app with an expensive endpoint shaped like /api/jobs/match -
+CPU work in worker threads alternating with work on the event loop (ORM
+ingest, filtering, encoding) - and a cheap one. N concurrent expensive
+requests run while /cheap is polled every 20 ms; reports /cheap latency
+percentiles and expensive-request outcomes without admission control and
+behind AdmissionMiddleware.
+
+Usage:
+    python benchmarks/admission_load.py [concurrent_expensive] [concurrency_limit]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import anyio
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from app.api.admission import AdmissionController, AdmissionMiddleware, CostClass
+
+POLL_INTERVAL = 0.02
+
+def burn(iterations: int) -> int:
+    return sum(i * i % 7 for i in range(iterations))
+
+async def expensive(request):
+    total = 0
+    for _ in range(4):
+        total += await anyio.to_thread.run_sync(burn, 300_000)
+        total += burn(60_000)  # On the event loop
+    return JSONResponse({"value": total})
+
+async def cheap(request):
+    return JSONResponse({"ok": True})
+
+async def run(app, flood: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        latencies = []
+        done = asyncio.Event()
+
+        async def poll_cheap():
+            # Latency from the scheduled send time, so time spent waiting for
+            # a busy event loop counts too
+            scheduled = time.perf_counter()
+            while not done.is_set():
+                scheduled += POLL_INTERVAL
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await client.get("/cheap")
+                latencies.append((time.perf_counter() - scheduled) * 1000)
+
+        poller = asyncio.create_task(poll_cheap())
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[client.post("/expensive") for _ in range(flood)])
+        elapsed = time.perf_counter() - start
+        done.set()
+        await poller
+
+    statuses = {}
+    for response in responses:
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    latencies.sort()
+    return {
+        "statuses": statuses,
+        "seconds": elapsed,
+        "p50": statistics.median(latencies),
+        "p99": latencies[int(len(latencies) * 0.99) - 1] if len(latencies) > 1 else latencies[0],
+    }
+
+def main():
+    flood = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    app = Starlette(routes=[Route("/expensive", expensive, methods=["POST"]), Route("/cheap", cheap)])
+    controller = AdmissionController([CostClass("expensive", limit, queue_size=limit * 4)], queue_timeout=30)
+    guarded = AdmissionMiddleware(app, controller, {("POST", "/expensive"): "expensive"})
+
+    print(f"{flood} concurrent expensive requests; /cheap polled meanwhile")
+    for label, target in (("no admission control", app), (f"admission (concurrency {limit}, queue {limit * 4})", guarded)):
+        result = asyncio.run(run(target, flood))
+        print(f"  {label:<38} /cheap p50 {result['p50']:7.1f} ms  p99 {result['p99']:7.1f} ms  "
+              f"expensive {result['statuses']} in {result['seconds']:.1f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sync SessionLocal() inside async handlers vs the async session layer.
+
+Runs the application-history listing under concurrent load against a
+seeded temporary SQLite file while a probe task measures event-loop lag
+(how late a 5 ms sleep wakes up). Blocking database calls show up as lag
+that every other request on the worker pays, e.g. /health.
+
+Usage:
+    python benchmarks/db_concurrency.py [--requests 400] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, Depends
+from sqlalchemy import select, func
+from app.database.database import init_db, get_db_session, get_async_db, close_db
+from app.database.models import User, Job, SavedJob
+from app.database import history
+
+USERS = 50
+SAVED_PER_USER = 400
+
+def seed():
+    init_db()
+    db = get_db_session()
+    now = datetime.utcnow()
+    for u in range(USERS):
+        db.add(User(id=f"user-{u}", resume_data={}, preferences={}))
+        for j in range(SAVED_PER_USER):
+            job_id = f"job-{u}-{j}"
+            db.add(Job(id=job_id, title="Engineer", company="Acme", description="x" * 500,
+                       location="Remote", url=f"https://example.com/{job_id}", source="bench"))
+            db.add(SavedJob(user_id=f"user-{u}", job_id=job_id,
+                            status=("shortlisted", "applied", "rejected")[j % 3],
+                            match_score=50.0, matched_skills=["Python"], missing_skills=[],
+                            created_at=now - timedelta(minutes=j)))
+    db.commit()
+    db.close()
+
+def build_sync_app() -> FastAPI:
+    """Mirrors the previous handlers: blocking session work on the event loop"""
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/history/{user_id}")
+    async def listing(user_id: str):
+        db = get_db_session()
+        rows = db.execute(
+            select(SavedJob, Job).outerjoin(Job, Job.id == SavedJob.job_id)
+            .where(SavedJob.user_id == user_id, SavedJob.status == "applied")
+            .order_by(SavedJob.created_at.desc(), SavedJob.id.desc()).limit(21)
+        ).all()
+        total = db.scalar(select(func.count()).select_from(SavedJob).where(SavedJob.user_id == user_id))
+        payload = {"total": total, "saved_jobs": [history.serialize_saved_job(s, j) for s, j in rows]}
+        db.close()
+        return payload
+
+    return app
+
+def build_async_app() -> FastAPI:
+    """Same query through the AsyncSession dependency"""
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/history/{user_id}")
+    async def listing(user_id: str, db=Depends(get_async_db)):
+        rows, _ = await history.list_saved_jobs(db, user_id, statuses=["applied"], limit=20)
+        total = await history.count_saved_jobs(db, user_id)
+        return {"total": total, "saved_jobs": [history.serialize_saved_job(s, j) for s, j in rows]}
+
+    return app
+
+async def run_load(app: FastAPI, requests: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        lag_ms = []
+        done = asyncio.Event()
+
+        async def one(i: int):
+            async with semaphore:
+                response = await client.get(f"/history/user-{i % USERS}")
+                response.raise_for_status()
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.005)
+                lag_ms.append((time.perf_counter() - start - 0.005) * 1000)
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+
+    lag_ms.sort()
+    return {
+        "req_per_s": requests / elapsed,
+        "lag_p50_ms": statistics.median(lag_ms),
+        "lag_max_ms": lag_ms[-1],
+        "probes": len(lag_ms),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"Seeding {USERS * SAVED_PER_USER} saved jobs into {DB_PATH}...")
+    seed()
+
+    for name, app in (("sync sessions", build_sync_app()), ("async sessions", build_async_app())):
+        await run_load(app, 50, 10)  # warm up pools and caches
+        stats = await run_load(app, args.requests, args.concurrency)
+        print(f"{name:15s} {stats['req_per_s']:8.1f} req/s   "
+              f"loop lag p50 {stats['lag_p50_ms']:7.2f} ms   max {stats['lag_max_ms']:7.2f} ms   "
+              f"({stats['probes']} probes)")
+
+    await close_db()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: DOCX resume generation, documents per second.
+
+Compares the previous path (render resume HTML, dump it as one paragraph
+into a fresh Document) with the direct builder in
+app.generation.docx_builder, both with a new styled base document per call
+and with the per-thread base reused (the default), for every template.
+
+Usage:
+    python benchmarks/docx_build.py [documents]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from app.generation import docx_builder
+from app.generation.resume_tailor import ResumeTailor
+from benchmarks.template_render import sample_resume
+
+def legacy_docx(tailor: ResumeTailor, resume, output_path: str, template: str):
+    """The former ResumeTailor.html_to_docx: HTML source as a single paragraph"""
+    html = tailor.generate_resume_html(resume, "ML Engineer", template)
+    doc = Document()
+    doc.add_paragraph(html.replace('<br/>', '\n').replace('<br>', '\n'))
+    doc.save(output_path)
+
+def fresh_base_docx(tailor: ResumeTailor, resume, output_path: str, template: str):
+    docx_builder._local.bases = {}  # Force a new base document
+    tailor.generate_resume_docx(resume, output_path, "ML Engineer", template)
+
+def reused_base_docx(tailor: ResumeTailor, resume, output_path: str, template: str):
+    tailor.generate_resume_docx(resume, output_path, "ML Engineer", template)
+
+def rate(build, tailor, resume, output_path, template, count) -> float:
+    build(tailor, resume, output_path, template)  # Warm
+    start = time.perf_counter()
+    for _ in range(count):
+        build(tailor, resume, output_path, template)
+    return count / (time.perf_counter() - start)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    tailor = ResumeTailor()
+    resume = sample_resume()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, "resume.docx")
+
+        print(f"{count} documents per template (docs/sec)")
+        print(f"{'template':<12} {'html dump':>10} {'fresh base':>11} {'reused base':>12} {'vs fresh':>9}")
+        for template in docx_builder.LAYOUTS:
+            legacy = rate(legacy_docx, tailor, resume, output_path, template, count)
+            fresh = rate(fresh_base_docx, tailor, resume, output_path, template, max(1, count // 4))
+            reused = rate(reused_base_docx, tailor, resume, output_path, template, count)
+            print(f"{template:<12} {legacy:10.1f} {fresh:11.1f} {reused:12.1f} {reused / fresh:8.1f}x")
+
+        doc = Document(output_path)
+        styles = {p.style.name for p in doc.paragraphs}
+        print(f"\nLast document: {len(doc.paragraphs)} paragraphs, styles: {', '.join(sorted(styles))}")
+
+if __name__ == "__main__":
+    main()
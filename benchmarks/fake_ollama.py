@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Stand-in for an Ollama server, for benchmarks and manual testing.
+
+Implements the parts of the Ollama API the app uses: POST /api/generate
+(NDJSON streaming or a single JSON body, honouring options.num_predict)
+and GET /api/tags. Each word of a canned letter is one token; delays
+simulate model load (first token) and generation speed. It counts
+requests and peak concurrency, so callers can check pooling and
+scheduling behaviour.
+
+Usage:
+    python benchmarks/fake_ollama.py [--port 11435] [--first-token-delay 0.5] [--token-delay 0.02]
+    OLLAMA_BASE_URL=http://localhost:11435 COVER_LETTER_MODE=llm python run.py
+
+In-process:
+    app = create_app(first_token_delay=0.2)
+    OllamaClient(..., transport=httpx.ASGITransport(app=app))
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+LETTER = """Jane Doe
+jane@example.com | +91-9876543210 | Bangalore
+
+Dear Hiring Manager,
+
+I am excited to apply for this role. Over the past six years I have built
+retrieval and ranking systems in Python and PyTorch, shipped them on
+Kubernetes, and worked closely with product teams to measure their impact.
+I would welcome the chance to bring that experience to your team.
+
+Sincerely,
+Jane Doe"""
+
+class FakeOllamaStats:
+    def __init__(self):
+        self.requests = 0
+        self.active = 0
+        self.peak_active = 0
+        self.prompts = []
+
+def create_app(first_token_delay: float = 0.5, token_delay: float = 0.02, text: str = LETTER, fail: bool = False) -> Starlette:
+    """ASGI app mimicking Ollama; stats are on app.state.stats"""
+    stats = FakeOllamaStats()
+    tokens = [word + " " for word in text.split(" ")]
+
+    async def generate(request: Request):
+        body = await request.json()
+        stats.requests += 1
+        stats.prompts.append(body.get("prompt", ""))
+        if fail:
+            return JSONResponse(status_code=500, content={"error": "model failed to load"})
+        limit = (body.get("options") or {}).get("num_predict") or len(tokens)
+        selected = tokens[:limit]
+        model = body.get("model", "fake")
+
+        async def produce():
+            stats.active += 1
+            stats.peak_active = max(stats.peak_active, stats.active)
+            try:
+                await asyncio.sleep(first_token_delay)
+                for i, token in enumerate(selected):
+                    if i:
+                        await asyncio.sleep(token_delay)
+                    yield token
+            finally:
+                stats.active -= 1
+
+        if body.get("stream", True) is False:
+            text_out = "".join([token async for token in produce()])
+            return JSONResponse({"model": model, "response": text_out, "done": True})
+
+        async def lines():
+            async for token in produce():
+                yield json.dumps({"model": model, "response": token, "done": False}) + "\n"
+            yield json.dumps({"model": model, "response": "", "done": True, "eval_count": len(selected)}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    async def tags(request: Request):
+        return JSONResponse({"models": [{"name": "fake:latest"}]})
+
+    app = Starlette(routes=[
+        Route("/api/generate", generate, methods=["POST"]),
+        Route("/api/tags", tags, methods=["GET"]),
+    ])
+    app.state.stats = stats
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--first-token-delay", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(args.first_token_delay, args.token_delay), host="127.0.0.1", port=args.port)
+
+if __name__ == "__main__":
+    main()
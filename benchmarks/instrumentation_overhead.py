@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cost of the instrumentation in app.instrumentation.
+
+Times an empty block wrapped in timer() with metrics enabled (inside and
+outside a request's Server-Timing context) and disabled, a counter
+increment, and a full request through InstrumentationMiddleware vs the bare
+ASGI app.
+
+Usage:
+    python benchmarks/instrumentation_overhead.py [iterations]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from app import instrumentation
+
+def per_call_ns(block, iterations: int) -> float:
+    start = time.perf_counter()
+    block(iterations)
+    return (time.perf_counter() - start) / iterations * 1e9
+
+def bare(iterations: int):
+    for _ in range(iterations):
+        pass
+
+def timed_block(iterations: int):
+    for _ in range(iterations):
+        with instrumentation.timer("bench"):
+            pass
+
+def counted(iterations: int):
+    counter = instrumentation.counter("bench_total", "Benchmark counter", ("source",))
+    for _ in range(iterations):
+        counter.inc(source="bench")
+
+def timed_in_request(iterations: int):
+    token = instrumentation._request_timings.set({})
+    try:
+        timed_block(iterations)
+    finally:
+        instrumentation._request_timings.reset(token)
+
+async def request_rate(app, requests: int) -> float:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        start = time.perf_counter()
+        for _ in range(requests):
+            await client.get("/")
+        return (time.perf_counter() - start) / requests * 1e6
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    baseline = per_call_ns(bare, iterations)
+
+    print(f"Per call, {iterations} iterations (empty loop {baseline:.0f} ns subtracted)")
+    for enabled in (False, True):
+        instrumentation.enabled = enabled
+        label = "enabled " if enabled else "disabled"
+        print(f"  {label} timer()            {per_call_ns(timed_block, iterations) - baseline:8.0f} ns")
+        if enabled:
+            print(f"  {label} timer() + request  {per_call_ns(timed_in_request, iterations) - baseline:8.0f} ns")
+        print(f"  {label} counter.inc()      {per_call_ns(counted, iterations) - baseline:8.0f} ns")
+
+    async def endpoint(request):
+        with instrumentation.timer("handler"):
+            return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/", endpoint)])
+    requests = max(1, iterations // 100)
+    instrumentation.enabled = True
+    plain = asyncio.run(request_rate(app, requests))
+    wrapped = asyncio.run(request_rate(instrumentation.InstrumentationMiddleware(app), requests))
+    print(f"\nPer request, {requests} requests through httpx.ASGITransport")
+    print(f"  without middleware   {plain:8.0f} us")
+    print(f"  with middleware      {wrapped:8.0f} us  (+{wrapped - plain:.0f} us)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serialization time and bytes on the wire for job responses.
+
+Builds a /api/jobs/match response of N jobs (HTML descriptions, datetime
+posted dates) and compares FastAPI's default path - jsonable_encoder plus
+the stdlib JSONResponse - with app.serialization (orjson straight from the
+dicts, or its stdlib fallback), then the response size and compression
+time per Content-Encoding. Finally times whole requests through a FastAPI
+app with and without CompressionMiddleware.
+
+Usage:
+    python benchmarks/json_response.py [jobs] [iterations]
+"""
+
+import asyncio
+import gzip
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app import serialization
+from app.api import compression
+from app.api.compression import CompressionMiddleware
+from app.database.schemas import JobMatchResponse
+from app.scraper.normalize import normalize_job
+
+SKILLS = ["Python", "PyTorch", "SQL", "Docker", "Kubernetes", "AWS", "FastAPI", "Spark", "React", "Go", "Terraform"]
+
+def match_payload(count: int) -> dict:
+    rng = random.Random(0)
+    now = datetime.utcnow()
+    jobs = []
+    for i in range(count):
+        skills = rng.sample(SKILLS, 5)
+        paragraphs = "".join(
+            f"<p>You will design, build and operate {rng.choice(['services', 'pipelines', 'platforms'])} "
+            f"used by millions of customers, working closely with product and data teams.</p>"
+            for _ in range(rng.randrange(6, 30))
+        )
+        job = {
+            "id": f"job-{i}",
+            "title": f"{rng.choice(['Senior ', 'Staff ', ''])}{rng.choice(['Backend', 'ML', 'Data'])} Engineer",
+            "company": f"Company {i % 97}",
+            "location": "Bangalore (Hybrid)",
+            "description": (
+                f"<h2>About the role</h2>{paragraphs}<h3>Requirements</h3><ul>"
+                + "".join(f"<li>{rng.randrange(1, 8)}+ years of {skill}</li>" for skill in skills)
+                + f"</ul><p>Salary INR {20 + i % 20} - {35 + i % 20} LPA</p>"
+            ),
+            "url": f"https://jobs.example.com/{i}",
+            "source": rng.choice(["linkedin", "remoteok"]),
+            "posted_date": now - timedelta(hours=rng.randrange(1, 500), microseconds=rng.randrange(10**6)),
+        }
+        normalize_job(job)
+        jobs.append({
+            "job": job,
+            "match_score": round(rng.uniform(20, 95), 2),
+            "recommendation": rng.choice(["strong_match", "good_match", "moderate_match"]),
+            "matched_skills": skills[:3],
+            "missing_skills": skills[3:],
+        })
+    return {"status": "success", "total": count, "jobs": jobs}
+
+def best_ms(block, iterations: int) -> float:
+    times = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        block()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+def default_render(payload: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(payload)).body
+
+async def request_ms(app, iterations: int, encoding: str):
+    headers = {"Accept-Encoding": encoding}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get("/", headers=headers)
+        times, wire = [], 0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            response = await client.get("/", headers=headers)
+            times.append(time.perf_counter() - start)
+            wire = response.num_bytes_downloaded
+        return min(times) * 1000, wire
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    payload = match_payload(count)
+    encoder = "orjson" if serialization.orjson else "stdlib json (orjson not installed)"
+
+    before = default_render(payload)
+    after = serialization.FastJSONResponse(payload).body
+    print(f"{count} jobs, best of {iterations}; fast encoder: {encoder}")
+    print(f"  jsonable_encoder + JSONResponse  {best_ms(lambda: default_render(payload), iterations):8.1f} ms  {len(before) / 1024:7.0f} KiB")
+    print(f"  FastJSONResponse                 {best_ms(lambda: serialization.FastJSONResponse(payload), iterations):8.1f} ms  {len(after) / 1024:7.0f} KiB")
+    print(f"  JobMatchResponse.model_validate  {best_ms(lambda: JobMatchResponse.model_validate(payload), iterations):8.1f} ms  (VALIDATE_RESPONSES=true only)")
+
+    print("\nBytes on the wire")
+    print(f"  identity          {len(after) / 1024:7.0f} KiB")
+    for level in (1, 6, 9):
+        size = len(gzip.compress(after, level))
+        ms = best_ms(lambda: gzip.compress(after, level), iterations)
+        print(f"  gzip level {level}      {size / 1024:7.0f} KiB  {len(after) / size:5.1f}x  {ms:6.1f} ms")
+    if compression.brotli:
+        for quality in (1, 4, 6, 11):
+            size = len(compression.brotli.compress(after, quality=quality))
+            ms = best_ms(lambda: compression.brotli.compress(after, quality=quality), max(1, iterations // 4))
+            print(f"  br quality {quality:<2}     {size / 1024:7.0f} KiB  {len(after) / size:5.1f}x  {ms:6.1f} ms")
+    else:
+        print("  br                (brotli not installed)")
+
+    default_app = FastAPI()
+    default_app.get("/")(lambda: payload)
+    fast_app = FastAPI(default_response_class=serialization.FastJSONResponse)
+    fast_app.get("/")(lambda: serialization.json_response(payload))
+    compressed_app = CompressionMiddleware(fast_app)
+
+    print(f"\nWhole request through httpx.ASGITransport (best of {iterations})")
+    cases = [("default route, identity", default_app, "identity"), ("FastJSONResponse, identity", fast_app, "identity")]
+    cases += [(f"FastJSONResponse, {coding}", compressed_app, coding) for coding in ("gzip", "br") if coding == "gzip" or compression.brotli]
+    for label, app, coding in cases:
+        ms, wire = asyncio.run(request_ms(app, iterations, coding))
+        print(f"  {label:<28} {ms:8.1f} ms  {wire / 1024:7.0f} KiB")
+
+if __name__ == "__main__":
+    main()
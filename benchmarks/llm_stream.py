@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: LLM cover letter latency against the stand-in Ollama server.
+
+Starts benchmarks/fake_ollama.py on a local port and measures, for the
+OllamaClient in app.generation.llm:
+  - time to first token when streaming vs time to the whole letter
+    (what a non-streaming endpoint makes the user wait for)
+  - the pooled keep-alive client vs a new client per request
+  - how fast a stalled model is abandoned (first-token timeout)
+
+Usage:
+    python benchmarks/llm_stream.py [requests]
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uvicorn
+from app.generation.llm import LLMUnavailable, OllamaClient
+from benchmarks.fake_ollama import create_app
+
+def serve(app) -> str:
+    """Run app with uvicorn in a daemon thread; returns its base URL"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+def ms(values) -> str:
+    return f"median {statistics.median(values) * 1000:7.1f} ms   p95 {sorted(values)[int(len(values) * 0.95) - 1] * 1000:7.1f} ms"
+
+async def timed_stream(client: OllamaClient):
+    start = time.perf_counter()
+    first = None
+    async for _ in client.stream("Write a cover letter"):
+        if first is None:
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+async def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    base_url = serve(create_app(first_token_delay=0.3, token_delay=0.01))
+
+    pooled = OllamaClient(base_url, "fake", max_tokens=200)
+    await timed_stream(pooled)  # Open the connection
+    firsts, totals = [], []
+    for _ in range(count):
+        first, total = await timed_stream(pooled)
+        firsts.append(first)
+        totals.append(total)
+    print(f"{count} letters (300 ms model start, 10 ms/token)")
+    print(f"  first token (streamed)  {ms(firsts)}")
+    print(f"  whole letter            {ms(totals)}")
+
+    fresh_times, pooled_times = [], []
+    fast_url = serve(create_app(first_token_delay=0, token_delay=0))
+    fast_pooled = OllamaClient(fast_url, "fake", max_tokens=50)
+    await fast_pooled.generate("warm")
+    for _ in range(count * 5):
+        start = time.perf_counter()
+        await fast_pooled.generate("x")
+        pooled_times.append(time.perf_counter() - start)
+
+        fresh = OllamaClient(fast_url, "fake", max_tokens=50)
+        start = time.perf_counter()
+        await fresh.generate("x")
+        fresh_times.append(time.perf_counter() - start)
+        await fresh.close()
+    print(f"\nRequest overhead ({count * 5} requests, instant model)")
+    print(f"  pooled client           {ms(pooled_times)}")
+    print(f"  new client per request  {ms(fresh_times)}")
+
+    stalled = OllamaClient(serve(create_app(first_token_delay=30)), "fake", first_token_timeout=1.0)
+    start = time.perf_counter()
+    try:
+        await stalled.generate("x")
+    except LLMUnavailable as e:
+        print(f"\nStalled model: gave up after {time.perf_counter() - start:.2f}s ({e})")
+
+    for client in (pooled, fast_pooled, stalled):
+        await client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark: PDF text extraction across backends, streaming vs process pool.
+
+Compares the previous serial PyPDF2 loop (text += page.extract_text())
+with app.resume.pdf_text for every installed backend, serially and with
+the process pool, over PDFs of different sizes.
+
+Usage:
+    python benchmarks/pdf_extraction.py [resume.pdf ...]
+
+Without arguments, sample resumes of 1, 5, 25 and 100 pages are generated
+(requires reportlab, a benchmark-only dependency).
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.resume import pdf_text
+
+SAMPLE_PAGES = [1, 5, 25, 100]
+REPEATS = 3
+
+def make_sample(pages: int, directory: str) -> str:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfgen import canvas
+
+    path = os.path.join(directory, f"sample_{pages}p.pdf")
+    pdf = canvas.Canvas(path, pagesize=A4)
+    for page in range(pages):
+        y = 800
+        pdf.drawString(72, y, f"JANE DOE - page {page + 1}")
+        for line in range(45):
+            y -= 16
+            pdf.drawString(72, y, f"- Built Python, Docker and SQL services for project {page}-{line}, "
+                                  f"improving latency by {line}%")
+        pdf.showPage()
+    pdf.save()
+    return path
+
+def legacy_pypdf2(path: str) -> str:
+    """The extraction loop ResumeParser used before"""
+    import PyPDF2
+    with open(path, 'rb') as file:
+        reader = PyPDF2.PdfReader(file)
+        text = ""
+        for page in reader.pages:
+            text += page.extract_text()
+        return text
+
+def best_of(fn) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    paths = sys.argv[1:]
+    if not paths:
+        directory = tempfile.mkdtemp()
+        paths = [make_sample(pages, directory) for pages in SAMPLE_PAGES]
+
+    backends = pdf_text.available_backends()
+    print(f"Backends installed: {', '.join(backends)}   workers: {pdf_text.config.PDF_WORKERS}")
+    header = f"{'file':22s} {'legacy':>9s}" + ''.join(
+        f" {b + ' serial':>18s} {b + ' pool':>16s}" for b in backends
+    )
+    print(header)
+
+    for path in paths:
+        row = f"{os.path.basename(path):22s} {best_of(lambda: legacy_pypdf2(path)) * 1000:7.1f}ms"
+        for backend in backends:
+            serial = best_of(lambda: pdf_text.extract_text(path, backend, max_pages=0, parallel=False))
+            pooled = best_of(lambda: pdf_text.extract_text(path, backend, max_pages=0, parallel=True))
+            row += f" {serial * 1000:16.1f}ms {pooled * 1000:14.1f}ms"
+        print(row)
+
+    pdf_text.shutdown_pool()
+
+if __name__ == "__main__":
+    main()
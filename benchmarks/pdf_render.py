@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: N concurrent PDF renders, inline vs the pre-warmed worker pool.
+
+"inline" is the previous behaviour: WeasyPrint called inside the async
+route, so renders run one after another on the event loop and nothing else
+is served meanwhile. "pool" submits the same renders to RenderService with
+different worker counts. For each run we report throughput and the worst
+event-loop stall (time a concurrent /health-style tick was delayed).
+
+Usage:
+    python benchmarks/pdf_render.py [concurrent_renders] [--simulate]
+
+--simulate replaces WeasyPrint with a CPU-bound stand-in (150 ms per page,
+plus 400 ms once per process for font/CSS setup) for machines without
+Pango; it measures the service's scheduling, not WeasyPrint itself.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.generation import render_pool
+from app.generation.render_pool import RenderService
+from app.generation.resume_tailor import ResumeTailor
+from benchmarks.template_render import sample_resume
+
+SIMULATED_RENDER_SECONDS = 0.15
+SIMULATED_SETUP_SECONDS = 0.4
+_warm = False
+
+def _burn(seconds: float):
+    end = time.process_time() + seconds
+    while time.process_time() < end:
+        pass
+
+def simulated_render(html: str, output_path: str, timeout: float) -> str:
+    global _warm
+    if not _warm:
+        _burn(SIMULATED_SETUP_SECONDS)
+        _warm = True
+    _burn(SIMULATED_RENDER_SECONDS)
+    with open(output_path, "wb") as f:
+        f.write(html.encode())
+    return output_path
+
+def simulated_warmup():
+    simulated_render("", os.devnull, 0)
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+async def run_inline(render, html: str, count: int, directory: str):
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+    await asyncio.sleep(0)
+
+    async def one(i):
+        # Old route: synchronous render inside the coroutine
+        render(html, os.path.join(directory, f"inline_{i}.pdf"), 0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await lag_task
+
+async def run_pool(render, warmup, html: str, count: int, workers: int, directory: str):
+    service = RenderService(workers=workers, queue_size=count, timeout=120, render=render)
+    original_warmup = render_pool._warm_worker
+    render_pool._warm_worker = warmup
+    try:
+        await service.start()
+    finally:
+        render_pool._warm_worker = original_warmup
+    await asyncio.sleep(SIMULATED_SETUP_SECONDS + 0.2)  # Let every worker finish warming
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_lag(stop))
+    start = time.perf_counter()
+    jobs = [service.submit(html, os.path.join(directory, f"pool{workers}_{i}.pdf")) for i in range(count)]
+    await asyncio.gather(*(service.wait(job) for job in jobs))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await service.stop()
+    failed = [job for job in jobs if job.status != "done" or job.fallback]
+    if failed:
+        print(f"  {len(failed)} renders failed: {failed[0].error}")
+    return elapsed, await lag_task
+
+async def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    simulate = "--simulate" in sys.argv
+    count = int(args[0]) if args else 16
+
+    if simulate:
+        render, warmup = simulated_render, simulated_warmup
+    else:
+        render, warmup = render_pool.render_pdf, render_pool._warm_worker
+
+    html = ResumeTailor().generate_resume_html(sample_resume(), "ML Engineer")
+    print(f"{count} concurrent renders, {os.cpu_count()} CPUs, "
+          f"{'simulated renderer' if simulate else 'WeasyPrint'}")
+    print(f"{'mode':<12} {'total':>9} {'renders/s':>10} {'worst loop stall':>17}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        elapsed, lag = await run_inline(render, html, count, directory)
+        print(f"{'inline':<12} {elapsed:8.2f}s {count / elapsed:10.1f} {lag * 1000:15.0f}ms")
+
+        for workers in sorted({1, 2, os.cpu_count() or 1}):
+            elapsed, lag = await run_pool(render, warmup, html, count, workers, directory)
+            print(f"{f'pool x{workers}':<12} {elapsed:8.2f}s {count / elapsed:10.1f} {lag * 1000:15.0f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
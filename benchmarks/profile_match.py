@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Profile the /api/jobs/match pipeline offline.
+
+Runs MatchTaskQueue.pipeline - the code behind /api/jobs/match and
+/api/match-tasks - with scraping replaced by fixture jobs: normalize,
+ingest (save_jobs_to_db), preference filtering, embedding and ranking, then
+JSON serialization of the response, in a throwaway SQLite database and
+under the same profilers as the X-Profile request hook. Scoring runs on the
+main thread so pstats profiles include it. Prints the per-stage timings
+from app.instrumentation and writes the profile.
+
+Fixtures:
+    --jobs     JSON list of job dicts, or a saved /api/jobs/search or
+               /api/jobs/match response; synthetic jobs when omitted
+    --resume   ResumeData JSON, a saved /api/resume/upload response, or a
+               PDF; the benchmark sample resume when omitted
+
+Usage:
+    python benchmarks/profile_match.py [--jobs jobs.json] [--resume resume.pdf]
+        [--count 500] [--repeat 3] [--format speedscope|collapsed|pstats] [--out PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the fixtures out of the application database
+if "--database" not in sys.argv:
+    os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "profile_match.db")
+
+from app import instrumentation, profiling, serialization
+from app.config import config
+from app.database.database import close_db, init_db
+from app.matching.job_matcher import JobMatcher
+from app.matching.profile import build_profile
+from app.matching.tasks import MatchTaskQueue, ThreadBackend
+from app.resume.models import ResumeData
+from app.scraper.job_scraper import JobScraper
+from app.scraper.normalize import normalize_job
+from benchmarks.template_render import sample_resume
+
+TITLES = ["Backend Engineer", "ML Engineer", "Data Scientist", "Platform Engineer", "Frontend Developer", "SRE"]
+SKILLS = ["Python", "PyTorch", "SQL", "Docker", "Kubernetes", "AWS", "FastAPI", "Spark", "React", "Go", "Terraform"]
+WORK_MODES = ["Remote", "Hybrid", "On-site"]
+
+def synthetic_jobs(count: int) -> list:
+    rng = random.Random(0)
+    jobs = []
+    for i in range(count):
+        skills = rng.sample(SKILLS, 4)
+        low = rng.randrange(10, 40)
+        jobs.append({
+            "title": f"{rng.choice(['Senior ', 'Staff ', ''])}{rng.choice(TITLES)}",
+            "company": f"Company {i % 97}",
+            "location": f"Bangalore ({rng.choice(WORK_MODES)})",
+            "description": (
+                f"We need {rng.randrange(1, 9)}+ years with {', '.join(skills)}. "
+                f"Salary INR {low} - {low + 15} LPA. " + "Build and operate production systems. " * rng.randrange(5, 40)
+            ),
+            "url": f"https://jobs.example.com/{i}",
+            "source": rng.choice(["linkedin", "remoteok"]),
+        })
+    return jobs
+
+def load_jobs(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("jobs", [])
+    return [item["job"] if "job" in item and "match_score" in item else item for item in data]
+
+def load_resume(path: str) -> ResumeData:
+    if path.lower().endswith(".pdf"):
+        from app.resume.parser import ResumeParser
+        with open(path, "rb") as f:
+            return ResumeParser().parse_resume(f.read())
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return ResumeData(**data.get("resume", data))
+
+class FixtureBackend(ThreadBackend):
+    """Fixture jobs instead of scraping; scoring inline on the calling thread"""
+
+    def __init__(self, scraper: JobScraper, fixture: list):
+        super().__init__(scraper)
+        self.fixture = fixture
+
+    async def scrape(self, query, limit, progress):
+        jobs = [dict(job) for job in self.fixture[:limit]]
+        for job in jobs:
+            job.pop("id", None)
+            normalize_job(job)
+        return jobs
+
+    async def score(self, embedding, skills, jobs, progress):
+        return self.matcher.score_jobs(embedding, skills, jobs)
+
+async def run_pipeline(queue: MatchTaskQueue, profile) -> int:
+    result_jobs = await queue.pipeline("offline", profile)
+    with instrumentation.timer("serialize"):
+        body = serialization.dumps({"status": "success", "total": len(result_jobs), "jobs": result_jobs})
+    return len(body)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--jobs", help="Fixture jobs JSON")
+    parser.add_argument("--resume", help="Fixture resume (JSON or PDF)")
+    parser.add_argument("--count", type=int, default=500, help="Synthetic jobs when --jobs is omitted")
+    parser.add_argument("--repeat", type=int, default=3, help="Pipeline runs inside the profile")
+    parser.add_argument("--format", choices=list(profiling.FORMATS), default=profiling.DEFAULT_FORMAT)
+    parser.add_argument("--interval-ms", type=float, default=config.PROFILE_SAMPLE_INTERVAL_MS)
+    parser.add_argument("--out", help="Profile path (default: PROFILE_DIR/<timestamp>-match-offline...)")
+    parser.add_argument("--database", action="store_true", help="Use DATABASE_URL instead of a temporary database")
+    args = parser.parse_args()
+
+    fixture = load_jobs(args.jobs) if args.jobs else synthetic_jobs(args.count)
+    resume = load_resume(args.resume) if args.resume else sample_resume()
+
+    init_db()
+    print(f"Loading embedding model {config.OLLAMA_EMBEDDING_MODEL}...")
+    matcher = JobMatcher(config.OLLAMA_EMBEDDING_MODEL)
+    scraper = JobScraper()
+    queue = MatchTaskQueue(scraper, candidates=len(fixture))
+    queue.backend = FixtureBackend(scraper, fixture)
+    await queue.backend.start(matcher)
+    profile = build_profile(matcher, "offline", resume)
+
+    # Warm-up run outside the profile (model first-call cost, table creation)
+    await run_pipeline(queue, profile)
+
+    out = args.out or os.path.join(config.PROFILE_DIR, profiling.profile_file_name("match-offline", args.format))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    runner = profiling.Profile(args.format, f"match pipeline x{args.repeat} ({len(fixture)} jobs)", args.interval_ms / 1000)
+
+    timings = {}
+    token = instrumentation._request_timings.set(timings)
+    start = time.perf_counter()
+    runner.start()
+    try:
+        for _ in range(args.repeat):
+            size = await run_pipeline(queue, profile)
+    finally:
+        runner.stop()
+        instrumentation._request_timings.reset(token)
+    elapsed = time.perf_counter() - start
+    runner.write(out)
+    await close_db()
+
+    print(f"\n{args.repeat} run(s), {len(fixture)} jobs, {size / 1024:.0f} KiB response, {elapsed / args.repeat * 1000:.0f} ms per run")
+    for stage, seconds in sorted(timings.items(), key=lambda item: item[1], reverse=True):
+        print(f"  {stage:<12} {seconds / args.repeat * 1000:8.1f} ms  {seconds / elapsed * 100:5.1f}%")
+    print(f"\nProfile ({args.format}): {out}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: resume HTML rendering, per-call compilation vs shared environment.
+
+Compares the previous ResumeTailor behaviour (jinja2.Template(source) on
+every call, i.e. parse + compile + render) with the shared Environment from
+app.generation.templating (compiled once, cached), for every resume
+template. Also measures first-render cost in a fresh process-like
+environment with and without the on-disk bytecode cache.
+
+Usage:
+    python benchmarks/template_render.py [renders]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jinja2 import Template
+from app.generation import templating
+from app.generation.resume_tailor import ResumeTailor
+from app.resume.models import ResumeData, WorkExperience, Education
+
+def sample_resume() -> ResumeData:
+    return ResumeData(
+        full_name="Jane Doe",
+        email="jane@example.com",
+        phone="+91-9876543210",
+        location="Bangalore",
+        summary="ML engineer building retrieval & ranking systems.",
+        technical_skills=["Python", "PyTorch", "SQL", "Docker", "Kubernetes", "AWS", "FastAPI", "Spark"],
+        soft_skills=["Leadership", "Communication"],
+        years_of_experience=6,
+        work_experience=[
+            WorkExperience(
+                company=f"Company {i}",
+                job_title="Senior ML Engineer",
+                duration="2019 - 2023",
+                description="\n".join(f"Shipped model {i}.{j} improving recall by {j}%" for j in range(5)),
+                key_skills=["Python"]
+            ) for i in range(4)
+        ],
+        education=[Education(degree="B.Tech", field="Computer Science", school="IIT Madras", year="2016", gpa="8.9")],
+        certifications=["AWS ML Specialty", "CKA"]
+    )
+
+def per_second(count: int, seconds: float) -> str:
+    return f"{count / seconds:10.0f}/s"
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    tailor = ResumeTailor()
+    resume = sample_resume()
+
+    # Same context for both, so only template handling differs
+    context = tailor.build_context(resume, "ML Engineer")
+
+    print(f"{renders} renders per template")
+    print(f"{'template':<12} {'compile per call':>18} {'shared env':>14} {'speedup':>9}")
+    for name, file_name in templating.RESUME_TEMPLATES.items():
+        with open(os.path.join(templating.TEMPLATE_DIR, file_name), encoding="utf-8") as f:
+            source = f.read()
+
+        legacy_count = max(1, renders // 10)
+        start = time.perf_counter()
+        for _ in range(legacy_count):
+            Template(source, autoescape=True).render(context)
+        legacy = (time.perf_counter() - start) / legacy_count
+
+        tailor.generate_resume_html(resume, "ML Engineer", name)  # Warm
+        start = time.perf_counter()
+        for _ in range(renders):
+            tailor.generate_resume_html(resume, "ML Engineer", name)
+        shared = (time.perf_counter() - start) / renders
+
+        print(f"{name:<12} {per_second(1, legacy):>18} {per_second(1, shared):>14} {legacy / shared:8.1f}x")
+
+    print("\nFirst render in a new environment (process start):")
+    for label, use_cache in (("no bytecode cache", False), ("bytecode cache", True)):
+        if use_cache:
+            templating.create_environment(use_bytecode_cache=True).get_template("resume_ats.html")  # Populate
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            env = templating.create_environment(use_bytecode_cache=use_cache)
+            env.get_template("resume_ats.html").render(context)
+            timings.append(time.perf_counter() - start)
+        print(f"  {label:<18} {min(timings) * 1000:7.2f} ms")
+
+if __name__ == "__main__":
+    main()
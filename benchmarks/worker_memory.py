@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: memory per worker of the production server (gunicorn.conf.py).
+
+Starts gunicorn with N uvicorn workers twice - PRELOAD_MODEL=true (model
+loaded once in the master, shared copy-on-write) and false (each worker
+loads its own) - against a throwaway database, waits until every worker
+answers, then reports RSS, PSS and USS per process from
+/proc/<pid>/smaps_rollup. PSS splits shared pages between the processes
+sharing them, so the PSS total is the real footprint. Helper processes the
+workers start (PDF render pool) are summed separately. Linux only.
+
+Usage:
+    python benchmarks/worker_memory.py [--workers 4] [--port 8765]
+    python benchmarks/worker_memory.py --pid <gunicorn master pid>
+"""
+
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from app.instrumentation import child_pids, process_memory
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIB = 2**20
+
+def report(master: int, label: str) -> int:
+    """Print the process table; returns total PSS in bytes"""
+    workers = child_pids(master)
+    print(f"\n{label}: master {master}, {len(workers)} workers")
+    print(f"  {'process':<16} {'RSS':>9} {'PSS':>9} {'USS':>9} {'shared':>9}  (MiB)")
+    totals = {"rss": 0, "pss": 0, "uss": 0}
+    helpers = {"rss": 0, "pss": 0, "uss": 0}
+    for role, pid in [("master", master)] + [("worker", pid) for pid in workers]:
+        usage = process_memory(pid)
+        for key in totals:
+            totals[key] += usage.get(key, 0)
+        print(f"  {role + ' ' + str(pid):<16} {usage.get('rss', 0) / MIB:9.1f} {usage.get('pss', 0) / MIB:9.1f} "
+              f"{usage.get('uss', 0) / MIB:9.1f} {usage.get('shared', 0) / MIB:9.1f}")
+        for helper in child_pids(pid) if role == "worker" else ():
+            usage = process_memory(helper)
+            for key in helpers:
+                helpers[key] += usage.get(key, 0)
+    print(f"  {'total':<16} {totals['rss'] / MIB:9.1f} {totals['pss'] / MIB:9.1f} {totals['uss'] / MIB:9.1f}")
+    if helpers["rss"]:
+        print(f"  {'helper procs':<16} {helpers['rss'] / MIB:9.1f} {helpers['pss'] / MIB:9.1f} {helpers['uss'] / MIB:9.1f}")
+    if workers:
+        print(f"  PSS per worker  {sum(process_memory(pid).get('pss', 0) for pid in workers) / len(workers) / MIB:9.1f}")
+    return totals["pss"] + helpers["pss"]
+
+def wait_ready(master: subprocess.Popen, url: str, workers: int, timeout: float = 300):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if master.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {master.returncode}")
+        if len(child_pids(master.pid)) >= workers:
+            try:
+                # Enough requests to reach every worker through the shared socket
+                if all(httpx.get(url, timeout=5).status_code == 200 for _ in range(workers * 5)):
+                    return
+            except httpx.HTTPError:
+                pass
+        time.sleep(1)
+    raise TimeoutError("Workers did not become ready")
+
+def run(preload: bool, workers: int, port: int) -> int:
+    env = dict(
+        os.environ,
+        PRELOAD_MODEL="true" if preload else "false",
+        API_WORKERS=str(workers),
+        API_HOST="127.0.0.1",
+        API_PORT=str(port),
+        DATABASE_URL="sqlite:///" + os.path.join(tempfile.mkdtemp(), "worker_memory.db"),
+    )
+    master = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "app.main:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(master, f"http://127.0.0.1:{port}/health", workers)
+        time.sleep(2)  # Let startup work settle
+        return report(master.pid, f"PRELOAD_MODEL={env['PRELOAD_MODEL']}")
+    finally:
+        master.send_signal(signal.SIGTERM)
+        master.wait(timeout=60)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pid", type=int, help="Report on a running gunicorn master instead")
+    args = parser.parse_args()
+
+    if args.pid:
+        report(args.pid, "Running server")
+        return
+    shared = run(True, args.workers, args.port)
+    separate = run(False, args.workers, args.port)
+    print(f"\nTotal PSS with {args.workers} workers: {shared / MIB:.0f} MiB preloaded vs {separate / MIB:.0f} MiB "
+          f"without ({(separate - shared) / MIB:.0f} MiB saved)")
+
+if __name__ == "__main__":
+    main()
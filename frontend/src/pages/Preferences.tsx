@@ -19,6 +19,7 @@ export default function Preferences() {
         locations: [],
         min_salary: 0,
         max_salary: 0,
+        salary_currency: 'INR',
         industries: [],
         required_skills: [],
         nice_to_have_skills: []
@@ -145,12 +146,24 @@ export default function Preferences() {
                         </div>
                     </div>
 
-                    <div className="grid gap-4 md:grid-cols-2">
+                    <div className="grid gap-4 md:grid-cols-3">
+                        <div className="space-y-2">
+                            <label className="text-sm font-medium">Currency</label>
+                            <select
+                                className="flex h-10 w-full rounded-md border border-input bg-background px-3 py-2 text-sm"
+                                value={formData.salary_currency}
+                                onChange={e => setFormData({ ...formData, salary_currency: e.target.value })}
+                            >
+                                {['INR', 'USD', 'EUR', 'GBP', 'CAD', 'AUD'].map(currency => (
+                                    <option key={currency} value={currency}>{currency}</option>
+                                ))}
+                            </select>
+                        </div>
                         <div className="space-y-2">
                             <label className="text-sm font-medium">Min Salary (Annual)</label>
                             <Input
                                 type="number"
-                                placeholder="0"
+                                placeholder="0 (any)"
                                 value={formData.min_salary}
                                 onChange={e => setFormData({ ...formData, min_salary: Number(e.target.value) })}
                             />
@@ -159,7 +172,7 @@ export default function Preferences() {
                             <label className="text-sm font-medium">Max Salary (Annual)</label>
                             <Input
                                 type="number"
-                                placeholder="0"
+                                placeholder="0 (any)"
                                 value={formData.max_salary}
                                 onChange={e => setFormData({ ...formData, max_salary: Number(e.target.value) })}
                             />
@@ -1,7 +1,17 @@
 import axios from 'axios';
-import type { JobPreferences } from '../types';
+import type { Job, JobPreferences } from '../types';
 
 const API_Base = 'http://localhost:8000/api';
+const SESSION_TOKEN_KEY = 'job_hunter_session_token';
+
+// Every request identifies its user with the token issued at resume upload
+axios.interceptors.request.use((requestConfig) => {
+    const token = localStorage.getItem(SESSION_TOKEN_KEY);
+    if (token) {
+        requestConfig.headers.Authorization = `Bearer ${token}`;
+    }
+    return requestConfig;
+});
 
 export const api = {
     uploadResume: async (file: File) => {
@@ -10,6 +20,9 @@ export const api = {
         const response = await axios.post(`${API_Base}/resume/upload`, formData, {
             headers: { 'Content-Type': 'multipart/form-data' },
         });
+        if (response.data.session_token) {
+            localStorage.setItem(SESSION_TOKEN_KEY, response.data.session_token);
+        }
         return response.data;
     },
 
@@ -34,8 +47,24 @@ export const api = {
         return response.data;
     },
 
-    generateResume: async (jobTitle: string) => {
-        const response = await axios.post(`${API_Base}/resume/generate?job_title=${jobTitle}`);
+    // Background match: submit, then poll getMatchTask(task_id) until status is done/failed/cancelled
+    startMatch: async (query: string) => {
+        const response = await axios.post(`${API_Base}/match-tasks`, null, { params: { query } });
+        return response.data;
+    },
+
+    getMatchTask: async (taskId: string) => {
+        const response = await axios.get(`${API_Base}/match-tasks/${taskId}`);
+        return response.data;
+    },
+
+    cancelMatchTask: async (taskId: string) => {
+        const response = await axios.delete(`${API_Base}/match-tasks/${taskId}`);
+        return response.data;
+    },
+
+    generateResume: async (jobTitle: string, template: 'ats' | 'compact' | 'two-column' = 'ats') => {
+        const response = await axios.post(`${API_Base}/resume/generate?job_title=${jobTitle}&template=${template}`);
         return response.data;
     },
 
@@ -44,5 +73,55 @@ export const api = {
             `${API_Base}/cover-letter/generate?job_title=${jobTitle}&company_name=${companyName}`
         );
         return response.data;
+    },
+
+    // LLM cover letter over Server-Sent Events; resolves with the "done" payload
+    streamCoverLetter: async (jobTitle: string, companyName: string, onToken: (text: string) => void) => {
+        const params = new URLSearchParams({ job_title: jobTitle, company_name: companyName });
+        const token = localStorage.getItem(SESSION_TOKEN_KEY);
+        const response = await fetch(`${API_Base}/cover-letter/stream?${params.toString()}`, {
+            method: 'POST',
+            headers: token ? { Authorization: `Bearer ${token}` } : {},
+        });
+        if (!response.ok || !response.body) {
+            throw new Error((await response.json()).error || 'Cover letter generation failed');
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                const event = block.match(/^event: (.*)$/m)?.[1];
+                const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] || '{}');
+                if (event === 'token') onToken(data.text);
+                else if (event === 'done') return data;
+                else if (event === 'error') throw new Error(data.error);
+            }
+        }
+        throw new Error('Cover letter stream ended early');
+    },
+
+    saveJobStatus: async (payload: {
+        job_id: string;
+        status: 'shortlisted' | 'applied' | 'rejected';
+        match_score?: number;
+        matched_skills?: string[];
+        missing_skills?: string[];
+        job?: Job;
+    }) => {
+        const response = await axios.post(`${API_Base}/applications`, payload);
+        return response.data;
+    },
+
+    getApplicationHistory: async (filters: { status?: string; limit?: number; cursor?: string } = {}) => {
+        const response = await axios.get(`${API_Base}/applications`, { params: filters });
+        return response.data;
     }
 };
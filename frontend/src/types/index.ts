@@ -16,6 +16,7 @@ export interface JobPreferences {
     locations: string[];
     min_salary: number;
     max_salary: number;
+    salary_currency: string;
     industries: string[];
     required_skills: string[];
     nice_to_have_skills: string[];
@@ -0,0 +1,58 @@
+# Production server: a gunicorn master forking uvicorn workers
+#   python run.py --production
+#   gunicorn app.main:app          (reads this file from the working directory)
+# With PRELOAD_MODEL the master imports the app and loads the embedding
+# model before forking, so the API_WORKERS workers share those pages
+# copy-on-write instead of each loading its own copy; gc.freeze() keeps the
+# collector from touching (and so copying) them afterwards. Measure with
+# benchmarks/worker_memory.py, or the job_hunter_process_*_bytes metrics.
+# Keep MATCH_WORKER_BACKEND=asyncio to share the model: "process" workers
+# load their own. Signals to the master:
+#   HUP        start new workers, then stop the old ones gracefully (settings
+#              are re-read; preloaded application code is not)
+#   TERM       graceful stop: in-flight requests get WORKER_GRACEFUL_TIMEOUT_SECONDS
+#   USR2, then WINCH and QUIT to the old master: zero-downtime code upgrade
+#   TTIN/TTOU  one worker more/fewer
+
+from app.config import config as settings  # "config" is itself a gunicorn setting
+from app import instrumentation
+import gc
+import os
+
+# A production server unless .env or the environment says otherwise; workers
+# inherit both. The app then refuses to start with the default SECRET_KEY.
+if "APP_ENV" not in os.environ:
+    os.environ["APP_ENV"] = settings.APP_ENV = "production"
+
+bind = f"{settings.API_HOST}:{settings.API_PORT}"
+workers = settings.API_WORKERS
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = settings.PRELOAD_MODEL
+timeout = settings.WORKER_TIMEOUT_SECONDS
+graceful_timeout = settings.WORKER_GRACEFUL_TIMEOUT_SECONDS
+max_requests = settings.WORKER_MAX_REQUESTS
+max_requests_jitter = settings.WORKER_MAX_REQUESTS_JITTER if settings.WORKER_MAX_REQUESTS else 0
+keepalive = 5
+
+def on_starting(server):
+    """Without preloading, create the schema here so workers don't race to create it"""
+    if preload_app:
+        return
+    from app.database.database import engine, init_db
+    init_db()
+    engine.dispose()
+
+def when_ready(server):
+    """Master is up and (with preload_app) has imported the app; workers fork next"""
+    if not preload_app:
+        return
+    from app.api import routes
+    routes.preload()
+    gc.collect()
+    gc.freeze()
+    rss = instrumentation.process_memory().get("rss", 0)
+    server.log.info("Preloaded app and embedding model; master resident memory %.0f MiB", rss / 2**20)
+
+def post_worker_init(worker):
+    uss = instrumentation.process_memory().get("uss", 0)
+    worker.log.info("Worker %s booted; private memory %.0f MiB", worker.pid, uss / 2**20)
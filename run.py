@@ -2,6 +2,8 @@
 """
 AI Job Hunter - Start Script
 Run this to start the application
+    python run.py                  development server with auto-reload
+    python run.py --production     multi-worker server (gunicorn.conf.py)
 """
 
 import subprocess
@@ -36,6 +38,32 @@ def check_ollama_models():
         pass
     return False
 
+def server_command():
+    """
+    Development: one uvicorn process with --reload.
+    --production: gunicorn.conf.py - a master that preloads the embedding
+    model and forks API_WORKERS uvicorn workers sharing it (Linux/macOS).
+    """
+    if "--production" not in sys.argv:
+        return [sys.executable, "-m", "uvicorn", "app.main:app", "--reload", "--host", "0.0.0.0", "--port", "8000"]
+    
+    from app.config import config
+    # Production unless .env or the environment says otherwise
+    os.environ.setdefault("APP_ENV", "production")
+    try:
+        import gunicorn  # noqa: F401
+        if os.name == "posix":
+            return [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "app.main:app"]
+    except ImportError:
+        pass
+    # No fork (Windows) or no gunicorn: plain worker processes, each loading its own model
+    print("gunicorn unavailable - starting uvicorn workers without a preloaded model")
+    return [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--workers", str(config.API_WORKERS), "--host", config.API_HOST, "--port", str(config.API_PORT),
+        "--timeout-graceful-shutdown", str(config.WORKER_GRACEFUL_TIMEOUT_SECONDS)
+    ]
+
 def main():
     print("=" * 60)
     print("AI JOB HUNTER - Free Local LLM Version")
@@ -75,10 +103,7 @@ def main():
     print()
     
     try:
-        subprocess.run(
-            [sys.executable, "-m", "uvicorn", "app.main:app", "--reload", "--host", "0.0.0.0", "--port", "8000"],
-            check=False
-        )
+        subprocess.run(server_command(), check=False)
     except KeyboardInterrupt:
         print()
         print("Server stopped.")